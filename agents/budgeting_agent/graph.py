@@ -1,12 +1,15 @@
 from typing import Any
-from langgraph.graph import StateGraph
+from langgraph.graph import END, START, StateGraph
 from langgraph.graph.state import CompiledStateGraph
 from agents.budgeting_agent.nodes import (
     budget_calculation_node,
     loan_qualification_node,
+    price_data_cache,
+    price_data_cache_key,
     price_data_query_node,
 )
 from agents.budgeting_agent.state import BudgetingState
+from agents.graph_registry import graph_registry
 
 
 def initialize_graph() -> StateGraph[
@@ -21,14 +24,27 @@ def initialize_graph() -> StateGraph[
     graph.add_node(node="loan_qualification", action=loan_qualification_node)
     graph.add_node(node="price_data_query", action=price_data_query_node)
 
-    graph.set_entry_point(key="budget_calculation")
-    graph.add_edge(start_key="budget_calculation", end_key="loan_qualification")
-    graph.add_edge(start_key="loan_qualification", end_key="price_data_query")
-    graph.set_finish_point(key="price_data_query")
+    # the three tool calls are independent, so they run in the same step
+    graph.add_conditional_edges(
+        source=START,
+        path=route_tool_calls,
+        path_map=["budget_calculation", "loan_qualification", "price_data_query"],
+    )
+    graph.add_edge(start_key="budget_calculation", end_key=END)
+    graph.add_edge(start_key="loan_qualification", end_key=END)
+    graph.add_edge(start_key="price_data_query", end_key=END)
 
     return graph
 
 
+def route_tool_calls(state: BudgetingState) -> list[str]:
+    """Fan out to every tool call, skipping the price query when it is cached."""
+    nodes: list[str] = ["budget_calculation", "loan_qualification"]
+    if not state.get("price_data"):
+        nodes.append("price_data_query")
+    return nodes
+
+
 def compile_graph() -> CompiledStateGraph[
     BudgetingState, None, BudgetingState, BudgetingState
 ]:
@@ -38,6 +54,9 @@ def compile_graph() -> CompiledStateGraph[
     return graph.compile()
 
 
+graph_registry.register(name="budgeting", compile_fn=compile_graph)
+
+
 async def run_budgeting_agent(user_data: dict[str, Any]) -> dict[str, Any] | Any:
     initial_state: dict[str, Any] = {
         "income": user_data["income"],
@@ -47,14 +66,20 @@ async def run_budgeting_agent(user_data: dict[str, Any]) -> dict[str, Any] | Any
         "residential_units": user_data["residential_units"],
         "budget_result": None,
         "loan_result": None,
-        "price_data": None,
+        "price_data": user_data.get("price_data")
+        or price_data_cache.get(
+            key=price_data_cache_key(
+                zip_code=user_data["zip_code"],
+                residential_units=user_data["residential_units"],
+            )
+        ),
         "monthly_budget": None,
         "max_loan": None,
         "usage_metadata": {},
     }
 
     agent: CompiledStateGraph[BudgetingState, None, BudgetingState, BudgetingState] = (
-        compile_graph()
+        graph_registry.get(name="budgeting")
     )
     result: dict[str, Any] | Any = await agent.ainvoke(input=initial_state)
 
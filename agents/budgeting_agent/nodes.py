@@ -6,24 +6,35 @@ from mcp_kit.tools import (
     loan_qualification,
     query_price_data_by_zip_and_units,
 )
+from utils.cache import KeyedLock, TTLCache, ttl_from_env
 from utils.convenience import get_logger
 
 logger: Logger = get_logger(name=__name__)
 
+# sale price aggregates only change when the sales table is reloaded
+price_data_cache = TTLCache(
+    maxsize=4096, ttl=ttl_from_env(name="PRICE_DATA_CACHE_TTL", default=3600)
+)
+price_data_flights = KeyedLock()
+
+
+def price_data_cache_key(zip_code: str, residential_units: int) -> tuple[str, int]:
+    return (str(zip_code), int(residential_units))
+
 
-async def budget_calculation_node(state: BudgetingState) -> BudgetingState:
+async def budget_calculation_node(state: BudgetingState) -> dict[str, Any]:
     budget_result: Any = await calculate_budget.ainvoke(
         input={"income": state["income"]}
     )
     logger.info(f"Budget calculation result: {budget_result}")
 
-    state["monthly_budget"] = budget_result.get("budget", 0)
-    state["budget_result"] = budget_result
+    return {
+        "monthly_budget": budget_result.get("budget", 0),
+        "budget_result": budget_result,
+    }
 
-    return state
 
-
-async def loan_qualification_node(state: BudgetingState) -> BudgetingState:
+async def loan_qualification_node(state: BudgetingState) -> dict[str, Any]:
     """Calculate maximum loan amount based on income and credit score"""
 
     loan_result: Any = await loan_qualification.ainvoke(
@@ -31,23 +42,33 @@ async def loan_qualification_node(state: BudgetingState) -> BudgetingState:
     )
     logger.info(f"Loan qualification result: {loan_result}")
 
-    state["max_loan"] = loan_result.get("max_loan", 0)
-    state["loan_result"] = loan_result
-
-    return state
+    return {
+        "max_loan": loan_result.get("max_loan", 0),
+        "loan_result": loan_result,
+    }
 
 
-async def price_data_query_node(state: BudgetingState) -> BudgetingState:
+async def price_data_query_node(state: BudgetingState) -> dict[str, Any]:
     """Query comprehensive price data by zip code and residential units"""
 
-    price_data_result: Any = await query_price_data_by_zip_and_units.ainvoke(
-        input={
-            "zip_code": state["zip_code"],
-            "residential_units": state["residential_units"],
-        }
+    key: tuple[str, int] = price_data_cache_key(
+        zip_code=state["zip_code"], residential_units=state["residential_units"]
     )
-    logger.info(f"Price data query result: {price_data_result}")
+    # concurrent profiles for one zip/units share a single query
+    async with price_data_flights.hold(key=key):
+        cached: dict[str, Any] | None = price_data_cache.get(key=key)
+        if cached is not None:
+            return {"price_data": cached}
+
+        price_data_result: Any = await query_price_data_by_zip_and_units.ainvoke(
+            input={
+                "zip_code": state["zip_code"],
+                "residential_units": state["residential_units"],
+            }
+        )
+        logger.info(f"Price data query result: {price_data_result}")
 
-    state["price_data"] = price_data_result
+        if isinstance(price_data_result, dict) and "error" not in price_data_result:
+            price_data_cache.set(key=key, value=price_data_result)
 
-    return state
+    return {"price_data": price_data_result}
@@ -0,0 +1,37 @@
+from typing import Any
+from utils.cache import ResultCache, shared_result_backend, ttl_from_env
+
+# every GeoScoutState field the nodes produce; all depend on the zip code alone
+GEOSCOUT_OUTPUT_FIELDS: tuple[str, ...] = (
+    "zip_code",
+    "transit_score",
+    "transit_summary",
+    "crime_summary",
+    "crime_score",
+    "school_summary",
+    "school_score",
+    "total_summary",
+)
+
+# neighborhood summaries change slowly, so they outlive the planner's entries
+geoscout_cache = ResultCache(
+    namespace="geoscout",
+    backend=shared_result_backend(),
+    ttl=ttl_from_env(name="GEOSCOUT_CACHE_TTL", default=7 * 86400),
+)
+
+
+def zip_cache_key(model: str, zip_code: str | None) -> dict[str, Any]:
+    return {"model": model, "zip_code": str(zip_code or "").strip()}
+
+
+def is_complete_summary(result: dict[str, Any]) -> bool:
+    """Whether a run is worth caching: no tool errors and a non-empty summary."""
+    return not result.get("error_count") and bool(
+        str(result.get("total_summary") or "").strip()
+    )
+
+
+def geoscout_entry(result: dict[str, Any]) -> dict[str, Any]:
+    """The per-zip outputs of a geoscout run, without per-run bookkeeping."""
+    return {field: result.get(field) for field in GEOSCOUT_OUTPUT_FIELDS}
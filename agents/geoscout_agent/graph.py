@@ -1,13 +1,22 @@
 from typing import Any
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.state import CompiledStateGraph
+from agents.geoscout_agent.cache import (
+    geoscout_cache,
+    geoscout_entry,
+    is_complete_summary,
+    zip_cache_key,
+)
 from agents.geoscout_agent.nodes import (
+    gemini_model,
     node_commute_score,
     node_crime_rate,
     node_school_rate,
     node_synthesizer,
 )
 from agents.geoscout_agent.state import GeoScoutState
+from agents.graph_registry import graph_registry
+from utils.cache import KeyedLock
 
 
 def initialize_graph() -> GeoScoutState:
@@ -18,10 +27,14 @@ def initialize_graph() -> GeoScoutState:
     graph.add_node(node="node_school_rate", action=node_school_rate)
     graph.add_node(node="node_synthesizer", action=node_synthesizer)
 
+    # commute, crime and school are independent: fan out, then join at the synthesizer
     graph.add_edge(start_key=START, end_key="node_commute_score")
-    graph.add_edge(start_key="node_commute_score", end_key="node_crime_rate")
-    graph.add_edge(start_key="node_crime_rate", end_key="node_school_rate")
-    graph.add_edge(start_key="node_school_rate", end_key="node_synthesizer")
+    graph.add_edge(start_key=START, end_key="node_crime_rate")
+    graph.add_edge(start_key=START, end_key="node_school_rate")
+    graph.add_edge(
+        start_key=["node_commute_score", "node_crime_rate", "node_school_rate"],
+        end_key="node_synthesizer",
+    )
     graph.add_edge(start_key="node_synthesizer", end_key=END)
 
     return graph
@@ -34,7 +47,38 @@ def compile_graph() -> CompiledStateGraph[
     return graph.compile()
 
 
-async def run_geoscout_agent(user_data: dict[Any, Any]) -> dict[str, Any] | Any:
+graph_registry.register(name="geoscout", compile_fn=compile_graph)
+
+geoscout_flights = KeyedLock()
+
+
+async def run_geoscout_agent(
+    user_data: dict[Any, Any], refresh: bool = False
+) -> dict[str, Any] | Any:
+    """Geoscout summary for `user_data["zip_code"]`, served from the per-zip cache
+    unless `refresh` is set."""
+    key: dict[str, Any] = zip_cache_key(
+        model=gemini_model, zip_code=user_data.get("zip_code")
+    )
+    # profiles in the same zip analyzed together wait for one geoscout run
+    async with geoscout_flights.hold(key=str(user_data.get("zip_code") or "").strip()):
+        return await _geoscout_for_zip(user_data=user_data, key=key, refresh=refresh)
+
+
+async def _geoscout_for_zip(
+    user_data: dict[Any, Any], key: dict[str, Any], refresh: bool
+) -> dict[str, Any] | Any:
+    if not refresh:
+        cached: dict[str, Any] | None = await geoscout_cache.aget(key=key)
+        if cached is not None:
+            return {
+                **cached,
+                "current_step": "cached",
+                "step_count": 0,
+                "error_count": 0,
+                "usage_metadata": {},
+            }
+
     initial_state: dict[str, Any] = {
         "current_step": "start",
         "step_count": 0,
@@ -51,8 +95,11 @@ async def run_geoscout_agent(user_data: dict[Any, Any]) -> dict[str, Any] | Any:
     }
 
     agent: CompiledStateGraph[GeoScoutState, None, GeoScoutState, GeoScoutState] = (
-        compile_graph()
+        graph_registry.get(name="geoscout")
     )
     result: dict[str, Any] | Any = await agent.ainvoke(input=initial_state)
+    # a degraded summary would otherwise be served for the whole TTL
+    if is_complete_summary(result=result):
+        await geoscout_cache.aset(key=key, value=geoscout_entry(result=result))
 
     return result
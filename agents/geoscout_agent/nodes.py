@@ -1,6 +1,5 @@
 from typing import Any
 from langchain_core.messages.base import BaseMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
 from agents.geoscout_agent.prompts import (
     CommuteStructure,
     CrimeStructure,
@@ -13,25 +12,16 @@ from agents.geoscout_agent.prompts import (
 from agents.geoscout_agent.state import GeoScoutState
 from mcp_kit.tools import get_transit_score
 from utils.convenience import get_gemini_model
-from utils.token_tracking import token_usage_tracking
+from utils.llm_clients import get_gemini_chat
 
 gemini_model: str = get_gemini_model()
 
 
-async def node_commute_score(state: GeoScoutState) -> GeoScoutState:
+async def node_commute_score(state: GeoScoutState) -> dict[str, Any]:
     transit_score: dict[str, Any] = await get_transit_score.ainvoke(
         input={"zip_code": state["zip_code"]}
     )
-    state.update(
-        {
-            "current_step": "commute_score",
-            "step_count": 1,
-            "error_count": 0,
-            "transit_score": transit_score.get("transit_score", 0),
-            "transit_summary": transit_score.get("summary", ""),
-        }
-    )
-    llm = ChatGoogleGenerativeAI(model=gemini_model, stream_usage=True)
+    llm = get_gemini_chat(model=gemini_model, stream_usage=True)
     structured_llm = llm.with_structured_output(
         schema=CommuteStructure,
         method="json_mode",
@@ -48,21 +38,19 @@ async def node_commute_score(state: GeoScoutState) -> GeoScoutState:
             usage = ev["data"]["output"].usage_metadata
         elif ev["event"] == "on_chain_end" and ev["name"] == "RunnableSequence":
             structured = ev["data"]["output"]
-    updated_token_usage: dict[str, Any] = token_usage_tracking(
-        token_history=state.get("usage_metadata"),
-        usage_data=usage,
-    )
-    state.update(
-        {
-            "transit_summary": structured.transit_summary,
-            "usage_metadata": updated_token_usage,
-        }
-    )
-    return state
+    return {
+        "current_step": "commute_score",
+        "step_count": 1,
+        # the summaries still get written, but without transit data
+        "error_count": 1 if "error" in transit_score else 0,
+        "transit_score": transit_score.get("transit_score", 0),
+        "transit_summary": structured.transit_summary,
+        "usage_metadata": usage,
+    }
 
 
-async def node_crime_rate(state: GeoScoutState) -> GeoScoutState:
-    llm = ChatGoogleGenerativeAI(model=gemini_model, stream_usage=True)
+async def node_crime_rate(state: GeoScoutState) -> dict[str, Any]:
+    llm = get_gemini_chat(model=gemini_model, stream_usage=True)
     prompt: str = get_crime_score_prompt(zipcode=state["zip_code"])
     structured_llm = llm.with_structured_output(
         schema=CrimeStructure,
@@ -77,22 +65,15 @@ async def node_crime_rate(state: GeoScoutState) -> GeoScoutState:
             usage = ev["data"]["output"].usage_metadata
         elif ev["event"] == "on_chain_end" and ev["name"] == "RunnableSequence":
             structured = ev["data"]["output"]
-    updated_token_usage: dict[str, Any] = token_usage_tracking(
-        token_history=state.get("usage_metadata"),
-        usage_data=usage,
-    )
-    state.update(
-        {
-            "crime_summary": structured.crime_summary,
-            "crime_score": structured.crime_score,
-            "usage_metadata": updated_token_usage,
-        }
-    )
-    return state
+    return {
+        "crime_summary": structured.crime_summary,
+        "crime_score": structured.crime_score,
+        "usage_metadata": usage,
+    }
 
 
-async def node_school_rate(state: GeoScoutState) -> GeoScoutState:
-    llm = ChatGoogleGenerativeAI(model=gemini_model, stream_usage=True)
+async def node_school_rate(state: GeoScoutState) -> dict[str, Any]:
+    llm = get_gemini_chat(model=gemini_model, stream_usage=True)
     prompt: str = get_school_score_prompt(zipcode=state["zip_code"])
     structured_llm = llm.with_structured_output(
         schema=SchoolStructure,
@@ -107,32 +88,18 @@ async def node_school_rate(state: GeoScoutState) -> GeoScoutState:
             usage = ev["data"]["output"].usage_metadata
         elif ev["event"] == "on_chain_end" and ev["name"] == "RunnableSequence":
             structured = ev["data"]["output"]
-    updated_token_usage: dict[str, Any] = token_usage_tracking(
-        token_history=state.get("usage_metadata"),
-        usage_data=usage,
-    )
-    state.update(
-        {
-            "school_summary": structured.school_summary,
-            "school_score": structured.school_score,
-            "usage_metadata": updated_token_usage,
-        }
-    )
-    return state
+    return {
+        "school_summary": structured.school_summary,
+        "school_score": structured.school_score,
+        "usage_metadata": usage,
+    }
 
 
-async def node_synthesizer(state: GeoScoutState) -> GeoScoutState:
-    llm = ChatGoogleGenerativeAI(model=gemini_model)
+async def node_synthesizer(state: GeoScoutState) -> dict[str, Any]:
+    llm = get_gemini_chat(model=gemini_model)
     prompt: str = get_synthesizer_prompt(commute_state=state)
     response: BaseMessage = await llm.ainvoke(input=prompt)
-    updated_token_usage: dict[str, Any] = token_usage_tracking(
-        token_history=state.get("usage_metadata"),
-        usage_data=response.usage_metadata,
-    )
-    state.update(
-        {
-            "total_summary": response.content,
-            "usage_metadata": updated_token_usage,
-        }
-    )
-    return state
+    return {
+        "total_summary": response.content,
+        "usage_metadata": response.usage_metadata,
+    }
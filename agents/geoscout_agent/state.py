@@ -1,5 +1,6 @@
-from typing import Any, Optional
+from typing import Annotated, Any, Optional
 from typing_extensions import TypedDict
+from utils.token_tracking import merge_token_usage
 
 
 class GeoScoutState(TypedDict):
@@ -26,4 +27,5 @@ class GeoScoutState(TypedDict):
     # synthesizer node output
     total_summary: str
 
-    usage_metadata: Optional[dict[str, Any]]
+    # commute, crime and school run in parallel, so their usage is summed
+    usage_metadata: Annotated[Optional[dict[str, Any]], merge_token_usage]
@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import json
+import time
+from logging import Logger
+from typing import Any
+from agents.geoscout_agent.cache import (
+    geoscout_cache,
+    is_complete_summary,
+    zip_cache_key,
+)
+from agents.geoscout_agent.graph import run_geoscout_agent
+from agents.geoscout_agent.nodes import gemini_model
+from mcp_kit.tools import mcp_adapter
+from utils.cache import MemoryBackend
+from utils.convenience import get_logger
+from utils.llm_clients import close_llm_clients
+
+logger: Logger = get_logger(name=__name__)
+
+
+async def warm_zip_codes(
+    zip_codes: list[str], concurrency: int = 4, refresh: bool = False
+) -> dict[str, int]:
+    """Run geoscout for every zip not cached yet (every zip with `refresh`)."""
+    stats: dict[str, int] = {"warmed": 0, "cached": 0, "failed": 0}
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def warm(zip_code: str) -> None:
+        async with semaphore:
+            if not refresh and await geoscout_cache.aget(
+                key=zip_cache_key(model=gemini_model, zip_code=zip_code)
+            ):
+                stats["cached"] += 1
+                return
+            try:
+                result: dict[str, Any] = await run_geoscout_agent(
+                    user_data={"zip_code": zip_code}, refresh=True
+                )
+                if not is_complete_summary(result=result):
+                    stats["failed"] += 1
+                    logger.info(f"Geoscout summary for {zip_code} incomplete")
+                    return
+                stats["warmed"] += 1
+                logger.info(f"Warmed geoscout summary for {zip_code}")
+            except Exception as e:
+                stats["failed"] += 1
+                logger.info(f"Geoscout failed for {zip_code}: {e}")
+
+    await asyncio.gather(*[warm(zip_code=zip_code) for zip_code in zip_codes])
+    return stats
+
+
+async def _run(args: argparse.Namespace) -> dict[str, Any]:
+    await mcp_adapter.connect_all()
+    try:
+        zip_codes: list[str] = args.zips
+        if not zip_codes:
+            listed: dict[str, Any] = await mcp_adapter.supabase.list_zip_codes()
+            if "error" in listed:
+                return {"error": listed["error"]}
+            zip_codes = listed["zip_codes"]
+        return {
+            "zip_codes": len(zip_codes),
+            **await warm_zip_codes(
+                zip_codes=zip_codes,
+                concurrency=args.concurrency,
+                refresh=args.refresh,
+            ),
+        }
+    finally:
+        await mcp_adapter.disconnect_all()
+        await close_llm_clients()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Pre-compute geoscout summaries into the per-zip cache"
+    )
+    parser.add_argument(
+        "--zips", nargs="*", default=[], help="Zip codes (default: every sales zip)"
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--refresh", action="store_true", help="Recompute zips already cached"
+    )
+    args = parser.parse_args()
+
+    if isinstance(geoscout_cache.backend, MemoryBackend):
+        logger.info(
+            "RESULT_CACHE_URL is not set: warmed summaries only live in this process"
+        )
+    started: float = time.perf_counter()
+    result: dict[str, Any] = asyncio.run(main=_run(args=args))
+    print(json.dumps({**result, "seconds": round(time.perf_counter() - started, 2)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import threading
+import time
+from typing import Any, Callable
+from langgraph.graph.state import CompiledStateGraph
+
+
+class GraphRegistry:
+    """Compiles each agent graph once and shares the compiled graph across requests.
+
+    Compiled graphs hold no per-run state (no checkpointer is attached), so a
+    single instance can serve any number of concurrent `ainvoke` calls.
+    """
+
+    def __init__(self) -> None:
+        self._compilers: dict[str, Callable[[], CompiledStateGraph]] = {}
+        self._graphs: dict[str, CompiledStateGraph] = {}
+        self._lock = threading.Lock()
+        self.compile_times_ms: dict[str, float] = {}
+
+    def register(self, name: str, compile_fn: Callable[[], CompiledStateGraph]) -> None:
+        self._compilers[name] = compile_fn
+
+    def get(self, name: str) -> CompiledStateGraph | Any:
+        graph: CompiledStateGraph | None = self._graphs.get(name)
+        if graph is not None:
+            return graph
+
+        with self._lock:
+            graph = self._graphs.get(name)
+            if graph is None:
+                started: float = time.perf_counter()
+                graph = self._compilers[name]()
+                self.compile_times_ms[name] = round(
+                    (time.perf_counter() - started) * 1000, 2
+                )
+                self._graphs[name] = graph
+        return graph
+
+    def compile_all(self) -> dict[str, float]:
+        """Eagerly compile every registered graph and return compile times in ms."""
+        for name in self._compilers:
+            self.get(name=name)
+        return dict(self.compile_times_ms)
+
+
+graph_registry = GraphRegistry()
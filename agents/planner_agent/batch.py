@@ -0,0 +1,203 @@
+import argparse
+import asyncio
+import csv
+import json
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator
+from logging import Logger
+from pathlib import Path
+from typing import Any, TextIO
+
+from agents.planner_agent.cache import cache_stats
+from agents.planner_agent.graph import AGENT_EVENTS, run_planner_agent
+from mcp_kit.tools import load_program_index, mcp_adapter
+from utils.convenience import get_logger
+from utils.llm_clients import close_llm_clients
+from utils.token_tracking import merge_token_usage
+
+logger: Logger = get_logger(name=__name__)
+
+REQUIRED_FIELDS: tuple[str, ...] = ("income", "credit_score", "zip_code")
+PROFILE_DEFAULTS: dict[str, Any] = {
+    "residential_units": 1,
+    "current_debt": 0.0,
+    "state": "New York",
+    "building_class": "Any - All building types",
+    "who_i_am": [],
+    "what_looking_for": [],
+}
+NUMERIC_FIELDS: dict[str, type] = {
+    "income": float,
+    "credit_score": int,
+    "residential_units": int,
+    "current_debt": float,
+}
+LIST_FIELDS: tuple[str, ...] = ("who_i_am", "what_looking_for")
+
+
+def iter_profiles(path: Path) -> Iterator[dict[str, Any]]:
+    """Rows of a .csv file (list cells separated by "|") or of a JSONL file,
+    read lazily so a large input is never held in memory."""
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.suffix.lower() == ".csv":
+            yield from (dict(row) for row in csv.DictReader(file))
+        else:
+            yield from (json.loads(line) for line in file if line.strip())
+
+
+def batch_user_data(row: dict[str, Any]) -> dict[str, Any]:
+    """Planner input from a profile row, with the form's defaults filled in.
+
+    Raises:
+        ValueError: A required field is missing or a number does not parse
+    """
+    missing: list[str] = [
+        field for field in REQUIRED_FIELDS if row.get(field) in (None, "")
+    ]
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+
+    user_data: dict[str, Any] = {
+        **PROFILE_DEFAULTS,
+        **{key: value for key, value in row.items() if value not in (None, "")},
+    }
+    for field, cast in NUMERIC_FIELDS.items():
+        user_data[field] = cast(float(user_data[field]))
+    for field in LIST_FIELDS:
+        if isinstance(user_data[field], str):
+            user_data[field] = [
+                item.strip() for item in user_data[field].split("|") if item.strip()
+            ]
+    user_data["zip_code"] = str(user_data["zip_code"]).strip()
+    return user_data
+
+
+def batch_record(result: dict[str, Any]) -> dict[str, Any]:
+    """The per-agent results a streaming client gets, plus the analysis."""
+    return {
+        **{node: event_data(result) for node, event_data in AGENT_EVENTS.items()},
+        "final_analysis": result.get("final_analysis"),
+        "usage_metadata": result.get("usage_metadata"),
+    }
+
+
+async def analyze_profile(index: int, row: dict[str, Any]) -> dict[str, Any]:
+    """The batch record of one profile row; failures become error records."""
+    record: dict[str, Any] = {"index": index, "id": row.get("id")}
+    try:
+        result: dict[str, Any] = await run_planner_agent(
+            user_data=batch_user_data(row=row)
+        )
+        return {**record, "status": "success", "data": batch_record(result=result)}
+    except Exception as e:
+        logger.info(f"Batch profile {index} failed: {e}")
+        return {**record, "status": "error", "message": str(e)}
+
+
+async def stream_batch(
+    profiles: Iterable[dict[str, Any]], concurrency: int = 8
+) -> AsyncIterator[dict[str, Any]]:
+    """Analyze `profiles` at most `concurrency` at a time, yielding one record
+    per profile in completion order.
+
+    A fixed pool of workers pulls rows from `profiles` as they free up, so
+    only `concurrency` rows are in flight however long the input is.
+    Profiles sharing a zip, a program bucket, a zip/units price query or the
+    whole profile share that work through the agents' caches, so a batch costs
+    far less than the same profiles sent one by one.
+
+    Raises:
+        Exception: Whatever `profiles` raised (e.g. a malformed input line),
+            once the rows already in flight have been yielded
+    """
+    workers_count: int = max(concurrency, 1)
+    rows: Iterator[tuple[int, dict[str, Any]]] = enumerate(profiles)
+    records: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue(maxsize=workers_count)
+    failures: list[Exception] = []
+
+    async def worker() -> None:
+        try:
+            # next() never awaits, so workers sharing the iterator never race
+            for index, row in rows:
+                await records.put(await analyze_profile(index=index, row=row))
+        except Exception as e:
+            # a failed iterator is exhausted, so the other workers wind down too
+            failures.append(e)
+        await records.put(None)
+
+    workers: list[asyncio.Task] = [
+        asyncio.create_task(worker()) for _ in range(workers_count)
+    ]
+    try:
+        running: int = workers_count
+        while running:
+            record: dict[str, Any] | None = await records.get()
+            if record is None:
+                running -= 1
+            else:
+                yield record
+        if failures:
+            raise failures[0]
+    finally:
+        for task in workers:
+            task.cancel()
+
+
+def write_record(file: TextIO, record: dict[str, Any]) -> None:
+    file.write(json.dumps(record, default=str) + "\n")
+    file.flush()
+
+
+async def run_batch(
+    profiles: Iterable[dict[str, Any]], output: Path, concurrency: int = 8
+) -> dict[str, Any]:
+    """Write a JSONL record per profile to `output` as each analysis finishes."""
+    stats: dict[str, Any] = {"profiles": 0, "succeeded": 0, "failed": 0}
+    usage: dict[str, Any] = {}
+    file: TextIO = await asyncio.to_thread(open, output, "w", encoding="utf-8")
+    try:
+        async for record in stream_batch(profiles=profiles, concurrency=concurrency):
+            await asyncio.to_thread(write_record, file, record)
+            stats["profiles"] += 1
+            if record["status"] == "success":
+                stats["succeeded"] += 1
+                usage = merge_token_usage(
+                    left=usage, right=record["data"]["usage_metadata"]
+                )
+            else:
+                stats["failed"] += 1
+    finally:
+        await asyncio.to_thread(file.close)
+    return {**stats, "usage_metadata": usage, "caches": cache_stats()}
+
+
+async def _run(args: argparse.Namespace) -> dict[str, Any]:
+    await mcp_adapter.connect_all()
+    try:
+        logger.info(f"Program vector index: {await load_program_index()}")
+        return await run_batch(
+            profiles=iter_profiles(path=args.input),
+            output=args.output,
+            concurrency=args.concurrency,
+        )
+    finally:
+        await mcp_adapter.disconnect_all()
+        await close_llm_clients()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Analyze a JSONL or CSV file of profiles into a JSONL file"
+    )
+    parser.add_argument("--input", type=Path, required=True)
+    parser.add_argument("--output", type=Path, required=True)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    started: float = time.perf_counter()
+    result: dict[str, Any] = asyncio.run(main=_run(args=args))
+    print(json.dumps({**result, "seconds": round(time.perf_counter() - started, 2)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+from typing import Any
+from utils.cache import ResultCache, shared_result_backend, ttl_from_env
+
+PROFILE_FIELDS: tuple[str, ...] = (
+    "income",
+    "credit_score",
+    "zip_code",
+    "residential_units",
+    "who_i_am",
+    "state",
+    "what_looking_for",
+    "building_class",
+    "current_debt",
+)
+BUDGETING_FIELDS: tuple[str, ...] = (
+    "income",
+    "credit_score",
+    "zip_code",
+    "residential_units",
+)
+
+# whole analyses and per-branch results share one backend, each with its own TTL;
+# geoscout caches its per-zip results itself (agents/geoscout_agent/cache.py)
+planner_cache = ResultCache(
+    namespace="planner",
+    backend=shared_result_backend(),
+    ttl=ttl_from_env(name="PLANNER_CACHE_TTL", default=900),
+)
+budgeting_cache = ResultCache(
+    namespace="budgeting",
+    backend=shared_result_backend(),
+    ttl=ttl_from_env(name="BUDGETING_CACHE_TTL", default=3600),
+)
+program_cache = ResultCache(
+    namespace="programs",
+    backend=shared_result_backend(),
+    ttl=ttl_from_env(name="PROGRAM_RESULT_CACHE_TTL", default=3600),
+)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, (list, tuple, set)):
+        return sorted(_normalize(value=item) for item in value)
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    return value
+
+
+def normalize_user_data(
+    user_data: dict[str, Any], fields: tuple[str, ...] = PROFILE_FIELDS
+) -> dict[str, Any]:
+    """Canonical form of the `fields` a result depends on.
+
+    Strings are trimmed and lowercased, lists sorted and numbers made floats,
+    so a resubmitted form or a reordered checkbox list maps to the same entry.
+    """
+    return {field: _normalize(value=user_data.get(field)) for field in fields}
+
+
+def has_error(result: Any) -> bool:
+    """True when `result`, or a tool result nested in it, reports an error."""
+    if not isinstance(result, dict):
+        return False
+    if result.get("error"):
+        return True
+    return any(has_error(result=value) for value in result.values())
+
+
+def cache_stats() -> dict[str, dict[str, Any]]:
+    return {
+        cache.namespace: cache.stats()
+        for cache in (planner_cache, budgeting_cache, program_cache)
+    }
@@ -1,22 +1,53 @@
-from typing import Any
+from typing import Any, AsyncIterator, Callable
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.state import CompiledStateGraph
+from agents.geoscout_agent.cache import geoscout_entry
+from agents.geoscout_agent.nodes import gemini_model
+from agents.graph_registry import graph_registry
+from agents.planner_agent.cache import has_error, normalize_user_data, planner_cache
 from agents.planner_agent.nodes import (
-    run_nodes,
+    openai_model,
+    run_budgeting_agent_node,
+    run_geoscout_agent_node,
+    run_program_agent_node,
     synthesis_node,
 )
 from agents.planner_agent.state import PlannerState
+from utils.cache import cached_result
+
+
+# agent node -> the part of its state update a streaming client is sent
+AGENT_EVENTS: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    "budgeting": lambda update: {
+        "monthly_budget": update.get("monthly_budget"),
+        "max_loan": update.get("max_loan"),
+        "price_data": update.get("price_data"),
+    },
+    "programs": lambda update: {
+        "filtered_programs": (update.get("program_agent_results") or {}).get(
+            "filtered_programs"
+        )
+    },
+    "geoscout": lambda update: geoscout_entry(
+        result=update.get("geoscout_agent_results") or {}
+    ),
+}
+AGENT_NODES: tuple[str, ...] = tuple(AGENT_EVENTS)
 
 
 def initialize_graph() -> StateGraph:
     graph: StateGraph[PlannerState, None, PlannerState, PlannerState] = StateGraph(
         state_schema=PlannerState
     )
-    graph.add_node(node="run_nodes", action=run_nodes)
+    graph.add_node(node="budgeting", action=run_budgeting_agent_node)
+    graph.add_node(node="programs", action=run_program_agent_node)
+    graph.add_node(node="geoscout", action=run_geoscout_agent_node)
     graph.add_node(node="synthesis", action=synthesis_node)
 
-    graph.add_edge(start_key=START, end_key="run_nodes")
-    graph.add_edge(start_key="run_nodes", end_key="synthesis")
+    # the agents are independent: fan out, so each result streams as it lands
+    for agent in AGENT_NODES:
+        graph.add_edge(start_key=START, end_key=agent)
+    graph.add_edge(start_key=list(AGENT_NODES), end_key="synthesis")
     graph.add_edge(start_key="synthesis", end_key=END)
     return graph
 
@@ -30,8 +61,11 @@ def compile_graph() -> CompiledStateGraph[
     return graph.compile()
 
 
-async def run_planner_agent(user_data) -> dict[str, Any] | Any:
-    initial_state: dict[str, Any] = {
+graph_registry.register(name="planner", compile_fn=compile_graph)
+
+
+def planner_initial_state(user_data: dict[str, Any]) -> dict[str, Any]:
+    return {
         "current_step": "starting",
         "income": user_data["income"],
         "credit_score": user_data["credit_score"],
@@ -48,9 +82,86 @@ async def run_planner_agent(user_data) -> dict[str, Any] | Any:
         "final_analysis": None,
         "usage_metadata": {},
     }
+
+
+def planner_cache_key(user_data: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "model": openai_model,
+        "geoscout_model": gemini_model,
+        **normalize_user_data(user_data=user_data),
+    }
+
+
+def is_cacheable_analysis(result: dict[str, Any]) -> bool:
+    """A complete analysis whose budgeting and program inputs did not fail."""
+    return (
+        bool(result.get("final_analysis"))
+        and not str(result.get("final_analysis")).startswith("Analysis unavailable")
+        and not has_error(result=result.get("budgeting_agent_results"))
+        and not has_error(result=result.get("program_agent_results"))
+    )
+
+
+async def run_planner_agent(user_data) -> dict[str, Any] | Any:
     agent: CompiledStateGraph[PlannerState, None, PlannerState, PlannerState] = (
-        compile_graph()
+        graph_registry.get(name="planner")
+    )
+    # identical resubmits and shared profiles skip every agent and LLM call
+    result: dict[str, Any] | Any = await cached_result(
+        cache=planner_cache,
+        key=planner_cache_key(user_data=user_data),
+        compute=lambda: agent.ainvoke(input=planner_initial_state(user_data=user_data)),
+        cacheable=is_cacheable_analysis,
     )
-    result: dict[str, Any] | Any = await agent.ainvoke(input=initial_state)
 
     return result
+
+
+async def stream_planner_agent(
+    user_data: dict[str, Any],
+) -> AsyncIterator[dict[str, Any]]:
+    """Planner run as events: one per agent as it completes, in completion
+    order, then the synthesis as "token" deltas and a closing "final" event."""
+    key: dict[str, Any] = planner_cache_key(user_data=user_data)
+    cached: dict[str, Any] | None = await planner_cache.aget(key=key)
+    if cached is not None:
+        for node, event_data in AGENT_EVENTS.items():
+            yield {"event": node, "data": event_data(cached)}
+        yield {
+            "event": "final",
+            "data": {
+                "final_analysis": cached.get("final_analysis"),
+                "usage_metadata": {},
+            },
+        }
+        return
+
+    agent: CompiledStateGraph[PlannerState, None, PlannerState, PlannerState] = (
+        graph_registry.get(name="planner")
+    )
+    final_state: dict[str, Any] = {}
+    async for mode, chunk in agent.astream(
+        input=planner_initial_state(user_data=user_data),
+        stream_mode=["updates", "messages", "values"],
+    ):
+        if mode == "updates":
+            for node, update in chunk.items():
+                if node in AGENT_EVENTS and update:
+                    yield {"event": node, "data": AGENT_EVENTS[node](update)}
+        elif mode == "messages":
+            message, metadata = chunk
+            # sub-agents' own LLM calls stream here too; only synthesis is user-facing
+            if metadata.get("langgraph_node") == "synthesis" and message.content:
+                yield {"event": "token", "data": message.content}
+        else:
+            final_state = chunk
+
+    if is_cacheable_analysis(result=final_state):
+        await planner_cache.aset(key=key, value=final_state)
+    yield {
+        "event": "final",
+        "data": {
+            "final_analysis": final_state.get("final_analysis"),
+            "usage_metadata": final_state.get("usage_metadata"),
+        },
+    }
@@ -1,167 +1,121 @@
-import asyncio
-from copy import deepcopy
 from logging import Logger
 from typing import Any
-from langchain_core.messages.base import BaseMessage
-from langchain_openai import ChatOpenAI
+from langchain_core.messages import BaseMessageChunk
 from agents.budgeting_agent.graph import run_budgeting_agent
 from agents.geoscout_agent.graph import run_geoscout_agent
+from agents.planner_agent.cache import (
+    BUDGETING_FIELDS,
+    budgeting_cache,
+    has_error,
+    normalize_user_data,
+    program_cache,
+)
 from agents.planner_agent.prompts import get_comprehensive_analysis_prompt
 from agents.planner_agent.state import PlannerState
 from agents.program_agent.graph import run_program_agent
+from utils.cache import cached_result
 from utils.convenience import get_logger, get_openai_model
-from utils.token_tracking import token_usage_tracking
+from utils.llm_clients import get_openai_chat
+from utils.token_tracking import merge_token_usage
 
 logger: Logger = get_logger(name=__name__)
 openai_model: str = get_openai_model()
 
 
-async def run_budgeting_agent_node(state: PlannerState) -> PlannerState:
-    agent_state = deepcopy(state)
-    current_step: str = agent_state.get("current_step", "unknown")
-    logger.info(f"STEP: {current_step} -> Calling budgeting agent...")
+async def run_budgeting_agent_node(state: PlannerState) -> dict[str, Any]:
+    logger.info("STEP: fan-out -> Calling budgeting agent...")
 
     user_data: dict[str, Any] = {
-        "income": agent_state["income"],
-        "credit_score": agent_state["credit_score"],
-        "zip_code": agent_state["zip_code"],
-        "residential_units": agent_state["residential_units"],
-        "usage_metadata": agent_state.get("usage_metadata"),
+        "income": state["income"],
+        "credit_score": state["credit_score"],
+        "zip_code": state["zip_code"],
+        "residential_units": state["residential_units"],
     }
 
-    budgeting_results: Any = await run_budgeting_agent(user_data=user_data)
-
-    agent_state["budgeting_agent_results"] = budgeting_results
-
-    agent_state["monthly_budget"] = budgeting_results.get("monthly_budget")
-    agent_state["max_loan"] = budgeting_results.get("max_loan")
-    agent_state["price_data"] = budgeting_results.get("price_data")
-
-    agent_state["current_step"] = "budgeting_complete"
-    agent_state["usage_metadata"] = budgeting_results.get("usage_metadata")
+    budgeting_results: Any = await cached_result(
+        cache=budgeting_cache,
+        key=normalize_user_data(user_data=user_data, fields=BUDGETING_FIELDS),
+        compute=lambda: run_budgeting_agent(user_data=user_data),
+        cacheable=lambda result: not has_error(result=result),
+    )
 
-    return agent_state
+    return {
+        "budgeting_agent_results": budgeting_results,
+        "monthly_budget": budgeting_results.get("monthly_budget"),
+        "max_loan": budgeting_results.get("max_loan"),
+        "price_data": budgeting_results.get("price_data"),
+        "usage_metadata": budgeting_results.get("usage_metadata"),
+    }
 
 
-async def run_program_agent_node(state: PlannerState) -> PlannerState:
-    agent_state = deepcopy(state)
-    current_step: str = agent_state.get("current_step", "unknown")
-    logger.info(f"STEP: {current_step} -> Calling program agent...")
+async def run_program_agent_node(state: PlannerState) -> dict[str, Any]:
+    logger.info("STEP: fan-out -> Calling program agent...")
 
     user_data: dict[str, Any] = {
-        "who_i_am": agent_state.get("who_i_am", []),
-        "state": agent_state.get("state"),
-        "what_looking_for": agent_state.get("what_looking_for", []),
-        "income": agent_state.get("income"),
-        "credit_score": agent_state.get("credit_score"),
-        "zip_code": agent_state.get("zip_code"),
-        "building_class": agent_state.get("building_class"),
-        "current_debt": agent_state.get("current_debt"),
-        "residential_units": agent_state.get("residential_units"),
-        "usage_metadata": agent_state.get("usage_metadata"),
+        "who_i_am": state.get("who_i_am", []),
+        "state": state.get("state"),
+        "what_looking_for": state.get("what_looking_for", []),
+        "income": state.get("income"),
+        "credit_score": state.get("credit_score"),
+        "zip_code": state.get("zip_code"),
+        "building_class": state.get("building_class"),
+        "current_debt": state.get("current_debt"),
+        "residential_units": state.get("residential_units"),
     }
 
-    program_results: Any = await run_program_agent(user_data=user_data)
-
-    agent_state["program_agent_results"] = program_results
-    agent_state["usage_metadata"] = program_results.get("usage_metadata")
-
-    agent_state["current_step"] = "program_agent_complete"
+    program_results: Any = await cached_result(
+        cache=program_cache,
+        key={"model": openai_model, **normalize_user_data(user_data=user_data)},
+        compute=lambda: run_program_agent(user_data=user_data),
+        cacheable=lambda result: not has_error(result=result),
+    )
 
-    return agent_state
+    return {
+        "program_agent_results": program_results,
+        "usage_metadata": program_results.get("usage_metadata"),
+    }
 
 
-async def run_geoscout_agent_node(state: PlannerState) -> PlannerState:
-    agent_state = deepcopy(state)
-    current_step: str = agent_state.get("current_step", "unknown")
-    logger.info(f"STEP: {current_step} -> Calling geoscout agent...")
+async def run_geoscout_agent_node(state: PlannerState) -> dict[str, Any]:
+    logger.info("STEP: fan-out -> Calling geoscout agent...")
 
     user_data: dict[str, Any] = {
-        "income": agent_state["income"],
-        "credit_score": agent_state["credit_score"],
-        "zip_code": agent_state["zip_code"],
-        "usage_metadata": agent_state.get("usage_metadata"),
+        "income": state["income"],
+        "credit_score": state["credit_score"],
+        "zip_code": state["zip_code"],
     }
 
+    # geoscout serves repeat zips from its own per-zip cache
     geoscout_results: dict[str, Any] = await run_geoscout_agent(user_data=user_data)
 
-    agent_state["geoscout_agent_results"] = geoscout_results
-    agent_state["usage_metadata"] = geoscout_results.get("usage_metadata")
-    agent_state["current_step"] = "geoscout_complete"
-
-    return agent_state
-
-
-async def run_nodes(state: PlannerState) -> PlannerState:
-    budget_state, program_state, geoscout_state = await asyncio.gather(
-        run_budgeting_agent_node(state=state),
-        run_program_agent_node(state=state),
-        run_geoscout_agent_node(state=state),
-    )
-    state.update(
-        {
-            "budgeting_agent_results": budget_state,
-            "monthly_budget": budget_state.get("monthly_budget"),
-            "max_loan": budget_state.get("max_loan"),
-            "price_data": budget_state.get("price_data"),
-            "property_data": budget_state.get("property_data"),
-        }
-    )
-
-    state.update(
-        {
-            "geoscout_agent_results": geoscout_state,
-        }
-    )
-
-    state.update(
-        {
-            "program_agent_results": program_state,
-        }
-    )
-    budget_token = budget_state.get("usage_metadata", {})
-    program_token = program_state.get("usage_metadata", {})
-    geoscout_token = geoscout_state.get("usage_metadata", {})
-    total_token_usage = token_usage_tracking(
-        token_history=state.get("usage_metadata"),
-        usage_data=budget_token,
-    )
-    total_token_usage = token_usage_tracking(
-        token_history=total_token_usage,
-        usage_data=program_token,
-    )
-    total_token_usage = token_usage_tracking(
-        token_history=total_token_usage,
-        usage_data=geoscout_token,
-    )
-    state["usage_metadata"] = total_token_usage
-
-    return state
+    return {
+        "geoscout_agent_results": geoscout_results,
+        "usage_metadata": geoscout_results.get("usage_metadata"),
+    }
 
 
-async def synthesis_node(state: PlannerState) -> PlannerState:
-    current_step: str = state.get("current_step", "unknown")
-    logger.info(f"STEP: {current_step} -> Generating final analysis...")
+async def synthesis_node(state: PlannerState) -> dict[str, Any]:
+    logger.info("STEP: agents complete -> Generating final analysis...")
 
     budgeting_results: dict[str, Any] = state.get("budgeting_agent_results", {})
+    usage: dict[str, Any] | None = None
 
     if budgeting_results:
         logger.info("   Calling LLM for analysis...")
-        model = ChatOpenAI(
-            model=openai_model,
-            timeout=30,
-            max_retries=2,
+        model = get_openai_chat(
+            model=openai_model, timeout=30, max_retries=2, stream_usage=True
         )
 
         analysis_prompt: str = get_comprehensive_analysis_prompt(state=state)
 
         try:
-            response: BaseMessage = await model.ainvoke(input=analysis_prompt)
-            updated_token_usage: dict[str, Any] = token_usage_tracking(
-                token_history=state.get("usage_metadata"),
-                usage_data=response.usage_metadata,
-            )
-            analysis: str = response.content
+            # streamed so the planner's "messages" stream carries tokens as they
+            # arrive; the chunks add up to the full message, usage included
+            response: BaseMessageChunk | None = None
+            async for chunk in model.astream(input=analysis_prompt):
+                response = chunk if response is None else response + chunk
+            usage = response.usage_metadata if response is not None else None
+            analysis: str = response.content if response is not None else ""
             logger.info("   LLM analysis completed")
         except Exception as e:
             logger.info(f"   LLM analysis failed: {e}")
@@ -169,12 +123,10 @@ async def synthesis_node(state: PlannerState) -> PlannerState:
     else:
         analysis = "No budgeting results available for analysis."
 
-    state["final_analysis"] = analysis
-    state["usage_metadata"] = updated_token_usage
-    state["current_step"] = "synthesis_complete"
     logger.info(
-        f"Total token usage for all agents and synthesis: {state['usage_metadata']}"
+        "Total token usage for all agents and synthesis: "
+        f"{merge_token_usage(left=state.get('usage_metadata'), right=usage)}"
     )
     logger.info("Workflow complete.")
 
-    return state
+    return {"final_analysis": analysis, "usage_metadata": usage}
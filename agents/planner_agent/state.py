@@ -1,5 +1,6 @@
-from typing import Any, Optional
+from typing import Annotated, Any, Optional
 from typing_extensions import TypedDict
+from utils.token_tracking import merge_token_usage
 
 
 class PlannerState(TypedDict):
@@ -25,4 +26,5 @@ class PlannerState(TypedDict):
 
     final_analysis: Optional[str]
 
-    usage_metadata: Optional[dict[str, Any]]
+    # the three agents run in parallel, so each node's usage is summed
+    usage_metadata: Annotated[Optional[dict[str, Any]], merge_token_usage]
@@ -0,0 +1,106 @@
+import hashlib
+import os
+from bisect import bisect_right
+from typing import Any, Hashable
+from agents.program_agent.eligibility import STATEWIDE_AREAS, parse_eligibility
+from agents.program_agent.prompts import format_program_summary
+from utils.cache import TTLCache
+
+# band edges; credit edges sit on the minimums the program corpus uses
+CREDIT_BANDS: tuple[int, ...] = (500, 580, 620, 640, 680, 740)
+INCOME_BAND: int = 10_000
+DEBT_BAND: int = 25_000
+MAX_UNITS: int = 5
+# the LLM's own reason cites one applicant's figures, so a bucket hit gets this
+CACHED_REASON: str = (
+    "Meets the program's criteria for your income, credit and status band"
+)
+
+
+def _band(value: float | None, width: int) -> int | None:
+    return None if value is None else int(value // width)
+
+
+def profile_bucket(state: dict[str, Any], local: bool) -> tuple[Hashable, ...]:
+    """The coarse profile attributes an eligibility decision depends on.
+
+    The zip code only matters, and only joins the bucket, for programs
+    limited to a locality.
+    """
+    credit_score: int | None = state.get("credit_score")
+    units: int | None = state.get("residential_units")
+    return (
+        tuple(sorted(state.get("who_i_am") or [])),
+        (state.get("state") or "").strip().lower(),
+        _band(value=state.get("income"), width=INCOME_BAND),
+        None if credit_score is None else bisect_right(CREDIT_BANDS, credit_score),
+        _band(value=state.get("current_debt"), width=DEBT_BAND),
+        (state.get("building_class") or "").strip().upper(),
+        None if units is None else min(units, MAX_UNITS),
+        str(state.get("zip_code") or "").strip() if local else None,
+    )
+
+
+def program_fingerprint(program: dict[str, Any]) -> str:
+    """Hash of the program text the LLM judges; editing the program changes it."""
+    return hashlib.sha256(
+        format_program_summary(program=program).encode(encoding="utf-8")
+    ).hexdigest()
+
+
+class EligibilityDecisionCache:
+    """LLM eligibility verdicts keyed on (profile bucket, program).
+
+    Only the verdict is kept: the LLM's reason text quotes the applicant it
+    was written for and must not reach others in the bucket.
+
+    A program is identified by a hash of its prompt text, so entries for a
+    program go stale as soon as the corpus changes it. `model` is part of
+    every key so switching models does not serve the old model's decisions.
+
+    Args:
+        maxsize (int): Decisions kept before the least recently used is evicted
+        ttl (float | None): Seconds a decision is served for, None to never expire
+        model (str): Model whose decisions are cached
+    """
+
+    def __init__(
+        self, maxsize: int = 4096, ttl: float | None = 86400, model: str = ""
+    ) -> None:
+        self.model: str = model
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @classmethod
+    def from_env(cls, model: str = "") -> "EligibilityDecisionCache":
+        ttl: float = float(os.getenv("ELIGIBILITY_CACHE_TTL", "86400"))
+        return cls(
+            maxsize=int(os.getenv("ELIGIBILITY_CACHE_SIZE", "4096")),
+            ttl=ttl if ttl > 0 else None,
+            model=model,
+        )
+
+    def key(self, program: dict[str, Any], state: dict[str, Any]) -> tuple:
+        area: str | None = parse_eligibility(
+            eligibility=str(program.get("eligibility") or "")
+        ).area
+        local: bool = area is not None and area not in STATEWIDE_AREAS
+        return (
+            self.model,
+            program_fingerprint(program=program),
+            profile_bucket(state=state, local=local),
+        )
+
+    def get(self, program: dict[str, Any], state: dict[str, Any]) -> bool | None:
+        """Whether `program` was judged eligible, None on a miss."""
+        return self.memory.get(key=self.key(program=program, state=state))
+
+    def set(
+        self, program: dict[str, Any], state: dict[str, Any], eligible: bool
+    ) -> None:
+        self.memory.set(key=self.key(program=program, state=state), value=eligible)
+
+    def clear(self) -> None:
+        self.memory.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return self.memory.stats()
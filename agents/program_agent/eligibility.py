@@ -0,0 +1,296 @@
+import json
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+from utils.hybrid_retriever import matches_state, program_state
+
+ELIGIBLE: str = "eligible"
+INELIGIBLE: str = "ineligible"
+AMBIGUOUS: str = "ambiguous"
+
+# 4-person area median income the AMI caps are measured against; HUD scales
+# the limit from 70% (1 person) to 132% (8 people) of it by household size
+AREA_MEDIAN_INCOME: float = float(os.getenv("AREA_MEDIAN_INCOME", "162000"))
+HOUSEHOLD_AMI_RANGE: tuple[float, float] = (0.70, 1.32)
+
+# 3-digit zip prefixes lying entirely inside NYC; 110 is split with Nassau
+NYC_ZIP_PREFIXES: frozenset[str] = frozenset(
+    {"100", "101", "102", "103", "104", "111", "112", "113", "114", "116"}
+)
+SPLIT_NYC_ZIP_PREFIXES: frozenset[str] = frozenset({"110"})
+
+# geo -> zip prefixes a home in it must have; a match still needs the LLM
+# (or the program's site) to confirm the exact town or target area
+AREA_ZIP_PREFIXES: dict[str, tuple[str, ...]] = {
+    "county_nassau": ("110", "115", "117", "118"),
+    "county_suffolk": ("063", "117", "119"),
+    "nassau_or_suffolk": ("063", "110", "115", "117", "118", "119"),
+    "town_babylon_suffolk": ("117",),
+    "town_brookhaven_suffolk": ("117", "119"),
+    "city_buffalo": ("142",),
+    "east_buffalo_target_area": ("142",),
+    "city_rochester": ("146",),
+    "city_new_rochelle": ("108",),
+}
+STATEWIDE_AREAS: frozenset[str] = frozenset({"statewide", "nationwide"})
+
+# keys that gate eligibility but that no rule here checks (SONYMA's own
+# income/price tables, "requires:sonyma_first_mortgage", ...): a program
+# carrying one is never ruled eligible without the LLM
+GATING_KEYS: frozenset[str] = frozenset(
+    {"employer_participation_required", "ny_program_check_rules_site"}
+)
+GATING_KEY_PREFIXES: tuple[str, ...] = ("income", "price", "requires", "needs_")
+
+VETERAN: str = "Veteran"
+RECENT_GRADUATE: str = "Recent Graduate"
+
+
+@dataclass(frozen=True)
+class EligibilityRules:
+    """The machine-checkable part of a program's `eligibility` string."""
+
+    area: str | None = None
+    credit_min: int | None = None
+    income_cap_ami: float | None = None
+    veteran_only: bool = False
+    recent_grad_only: bool = False
+    voucher_required: bool = False
+    job_gate: str | None = None
+    unchecked: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class EligibilityDecision:
+    status: str
+    reasons: tuple[str, ...]
+
+    @property
+    def reason(self) -> str:
+        return "; ".join(self.reasons)
+
+
+def _number(value: str) -> float | None:
+    match = re.search(pattern=r"\d+(?:\.\d+)?", string=value)
+    return float(match.group()) if match else None
+
+
+@lru_cache(maxsize=4096)
+def parse_eligibility(eligibility: str) -> EligibilityRules:
+    """Parse `fit:key:value;flag;... || sig:...` into `EligibilityRules`.
+
+    Cached on the string, so each program is parsed once per process.
+    Unknown keys (benefit caps, occupancy terms, ...) do not gate
+    eligibility and are ignored; unknown gating keys (see `GATING_KEYS`) are
+    kept verbatim in `unchecked`.
+    """
+    fields: dict[str, Any] = {}
+    credit_tiers: list[int] = []
+    unchecked: list[str] = []
+    for token in eligibility.split("||")[0].split(";"):
+        token = token.strip().removeprefix("fit:")
+        key, _, value = token.partition(":")
+        if key == "statewide":
+            fields["area"] = "statewide"
+        elif key == "nationwide_ny_ok":
+            fields["area"] = "nationwide"
+        elif key == "area":
+            fields["area"] = "nyc" if value.startswith("nyc") else value
+        elif key == "geo":
+            fields["area"] = value
+        elif key in ("ny_except_nyc", "statewide_select_areas"):
+            fields["area"] = key
+        elif key == "credit_overlay_min" and _number(value=value) is not None:
+            fields["credit_min"] = int(_number(value=value))
+        elif key == "credit_tiers":
+            # ">=580_3.5%|500-579_10%": the lowest score any tier accepts
+            credit_tiers = [int(score) for score in re.findall(r"\d{3}", value)]
+        elif key in ("income_cap_ami", "ami_cap"):
+            fields["income_cap_ami"] = _number(value=value)
+        elif key == "veteran_only":
+            fields["veteran_only"] = value == "true"
+        elif key == "recent_grad":
+            fields["recent_grad_only"] = value == "true"
+        elif key == "voucher_hcv_required":
+            fields["voucher_required"] = value == "true"
+        elif key == "job_gate" and value not in ("", "none"):
+            fields["job_gate"] = value
+        elif key in GATING_KEYS or key.startswith(GATING_KEY_PREFIXES):
+            unchecked.append(token)
+    if credit_tiers and "credit_min" not in fields:
+        fields["credit_min"] = min(credit_tiers)
+    return EligibilityRules(**fields, unchecked=tuple(unchecked))
+
+
+def zip_in_nyc(zip_code: str | None) -> bool | None:
+    """True/False when the zip decides it, None when it is missing or split."""
+    prefix: str = str(zip_code or "").strip()[:3]
+    if len(prefix) < 3 or prefix in SPLIT_NYC_ZIP_PREFIXES:
+        return None
+    return prefix in NYC_ZIP_PREFIXES
+
+
+def _check_area(area: str | None, zip_code: str | None) -> tuple[str, str] | None:
+    if area is None or area in STATEWIDE_AREAS:
+        return None
+    in_nyc: bool | None = zip_in_nyc(zip_code=zip_code)
+    if area in ("nyc", "ny_except_nyc"):
+        wants_nyc: bool = area == "nyc"
+        label: str = "limited to NYC" if wants_nyc else "excludes NYC"
+        if in_nyc is None:
+            return AMBIGUOUS, f"{label}, zip code does not settle it"
+        if in_nyc != wants_nyc:
+            return INELIGIBLE, f"{label}, zip {zip_code} does not qualify"
+        return ELIGIBLE, f"zip {zip_code} {'is' if in_nyc else 'is not'} in NYC"
+    prefixes: tuple[str, ...] | None = AREA_ZIP_PREFIXES.get(area)
+    if prefixes and zip_code and not str(zip_code).strip().startswith(prefixes):
+        return INELIGIBLE, f"limited to {area}, zip {zip_code} is outside it"
+    return AMBIGUOUS, f"limited to {area}"
+
+
+def _check_income(cap_ami: float, income: float | None) -> tuple[str, str]:
+    if income is None:
+        return AMBIGUOUS, f"income cap {cap_ami:g}% AMI, income unknown"
+    smallest, largest = (
+        cap_ami / 100 * AREA_MEDIAN_INCOME * share for share in HOUSEHOLD_AMI_RANGE
+    )
+    if income <= smallest:
+        return ELIGIBLE, f"income ${income:,.0f} within the {cap_ami:g}% AMI cap"
+    if income > largest:
+        return INELIGIBLE, f"income ${income:,.0f} over the {cap_ami:g}% AMI cap"
+    return AMBIGUOUS, f"income cap {cap_ami:g}% AMI depends on household size"
+
+
+def evaluate_program(
+    program: dict[str, Any], state: dict[str, Any]
+) -> EligibilityDecision:
+    """Decide a program against a `ProgramAgentState` with rules alone.
+
+    INELIGIBLE as soon as one rule fails, AMBIGUOUS when no rule fails but
+    some constraint cannot be checked from the profile (occupation, voucher,
+    exact locality, household size, a gating key the parser does not know)
+    or there is no constraint to check at all, ELIGIBLE otherwise.
+    """
+    rules: EligibilityRules = parse_eligibility(
+        eligibility=str(program.get("eligibility") or "")
+    )
+    who_i_am: list[str] = state.get("who_i_am") or []
+    checks: list[tuple[str, str]] = []
+
+    if not matches_state(program=program, state=state.get("state")):
+        code: str = (program_state(program=program) or "").upper()
+        checks.append((INELIGIBLE, f"{code} program, user is in {state.get('state')}"))
+    area_check: tuple[str, str] | None = _check_area(
+        area=rules.area, zip_code=state.get("zip_code")
+    )
+    if area_check:
+        checks.append(area_check)
+
+    credit_score: int | None = state.get("credit_score")
+    if rules.credit_min is not None:
+        if credit_score is None:
+            checks.append((AMBIGUOUS, f"requires credit {rules.credit_min}+"))
+        elif credit_score < rules.credit_min:
+            checks.append(
+                (
+                    INELIGIBLE,
+                    f"credit score {credit_score} below the {rules.credit_min} minimum",
+                )
+            )
+        else:
+            checks.append(
+                (
+                    ELIGIBLE,
+                    f"credit score {credit_score} meets the {rules.credit_min} minimum",
+                )
+            )
+
+    if rules.income_cap_ami is not None:
+        checks.append(
+            _check_income(cap_ami=rules.income_cap_ami, income=state.get("income"))
+        )
+    if rules.veteran_only:
+        checks.append(
+            (ELIGIBLE, "veteran")
+            if VETERAN in who_i_am
+            else (INELIGIBLE, "veterans only")
+        )
+    if rules.recent_grad_only:
+        checks.append(
+            (ELIGIBLE, "recent graduate")
+            if RECENT_GRADUATE in who_i_am
+            else (INELIGIBLE, "recent graduates only")
+        )
+    if rules.voucher_required:
+        checks.append((AMBIGUOUS, "requires a Housing Choice Voucher"))
+    if rules.job_gate:
+        checks.append((AMBIGUOUS, f"requires occupation/employer: {rules.job_gate}"))
+    for constraint in rules.unchecked:
+        checks.append((AMBIGUOUS, f"unchecked constraint {constraint}"))
+
+    if not checks:
+        # nothing to go on; let the LLM read the program's own terms
+        return EligibilityDecision(
+            status=AMBIGUOUS, reasons=("no machine-checkable criteria",)
+        )
+    for status in (INELIGIBLE, AMBIGUOUS):
+        reasons: tuple[str, ...] = tuple(r for s, r in checks if s == status)
+        if reasons:
+            return EligibilityDecision(status=status, reasons=reasons)
+    return EligibilityDecision(status=ELIGIBLE, reasons=tuple(r for _, r in checks))
+
+
+def eligible_entry(program: dict[str, Any], decision: EligibilityDecision) -> dict:
+    """The element shape `create_batch_eligibility_prompt` asks the LLM for."""
+    return {
+        "program_name": program.get("program_name", ""),
+        "jurisdiction": program.get("jurisdiction", ""),
+        "assistance_type": program.get("assistance_type", ""),
+        "max_benefit": program.get("max_benefit", ""),
+        "source": program.get("source", ""),
+        "reason": decision.reason,
+    }
+
+
+def _name_key(name: Any) -> str:
+    return " ".join(str(name or "").lower().split())
+
+
+def match_llm_decisions(
+    programs: list[dict[str, Any]], items: list[Any]
+) -> list[tuple[dict[str, Any], dict[str, Any]]]:
+    """(program, element) for each program the LLM gave a well-formed decision:
+    an element naming it (case and spacing aside) with a boolean "eligible"."""
+    by_name: dict[str, dict[str, Any]] = {
+        _name_key(name=item.get("program_name")): item
+        for item in items
+        if isinstance(item, dict) and isinstance(item.get("eligible"), bool)
+    }
+    return [
+        (program, by_name[_name_key(name=program.get("program_name"))])
+        for program in programs
+        if _name_key(name=program.get("program_name")) in by_name
+    ]
+
+
+def llm_eligible_entries(items: list[Any]) -> list[dict[str, Any]]:
+    """Elements the LLM did not mark ineligible, without the verdict field."""
+    return [
+        {key: value for key, value in item.items() if key != "eligible"}
+        for item in items
+        if isinstance(item, dict) and item.get("eligible", True) is not False
+    ]
+
+
+def parse_llm_programs(text: str) -> list[dict[str, Any]] | None:
+    """The JSON array in an eligibility response, None if there is none."""
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end < start:
+        return None
+    try:
+        parsed: Any = json.loads(text[start : end + 1])
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, list) else None
@@ -1,6 +1,7 @@
 from typing import Any
 from langgraph.graph import StateGraph
 from langgraph.graph.state import CompiledStateGraph
+from agents.graph_registry import graph_registry
 from agents.program_agent.nodes import filter_programs_node, rag_search_programs_node
 from agents.program_agent.state import ProgramAgentState
 
@@ -29,6 +30,9 @@ def compile_graph() -> CompiledStateGraph[
     return graph.compile()
 
 
+graph_registry.register(name="program", compile_fn=compile_graph)
+
+
 async def run_program_agent(user_data) -> Any:
     initial_state: dict[str, Any] = {
         "who_i_am": user_data["who_i_am"],
@@ -47,7 +51,7 @@ async def run_program_agent(user_data) -> Any:
 
     agent: CompiledStateGraph[
         ProgramAgentState, None, ProgramAgentState, ProgramAgentState
-    ] = compile_graph()
+    ] = graph_registry.get(name="program")
     result: Any = await agent.ainvoke(input=initial_state)
 
     return result
@@ -1,20 +1,49 @@
+import json
+import os
+from functools import lru_cache
 from logging import Logger
 from typing import Any
 from langchain_core.messages.base import BaseMessage
-from langchain_openai import ChatOpenAI
+from agents.program_agent.decision_cache import (
+    CACHED_REASON,
+    EligibilityDecisionCache,
+)
+from agents.program_agent.eligibility import (
+    AMBIGUOUS,
+    ELIGIBLE,
+    EligibilityDecision,
+    eligible_entry,
+    evaluate_program,
+    llm_eligible_entries,
+    match_llm_decisions,
+    parse_llm_programs,
+)
 from agents.program_agent.prompts import (
     create_batch_eligibility_prompt,
-    format_program_summary,
+    format_programs_text,
     format_user_profile,
 )
 from agents.program_agent.state import ProgramAgentState
 from mcp_kit.tools import search_programs_rag
+from utils.cache import KeyedLock
 from utils.convenience import get_logger, get_openai_model
 from utils.embedder import NYProgramsEmbedder
+from utils.embedding_cache import EmbeddingCache
+from utils.llm_clients import get_openai_chat
 from utils.token_tracking import token_usage_tracking
 
 logger: Logger = get_logger(name=__name__)
 openai_model: str = get_openai_model()
+# hybrid retrieval is precise enough that the LLM filter only needs a short list
+search_limit: int = int(os.getenv("PROGRAMS_SEARCH_LIMIT", "5"))
+decision_cache = EligibilityDecisionCache.from_env(model=openai_model)
+decision_flights = KeyedLock()
+
+
+@lru_cache(maxsize=1)
+def get_query_embedder() -> NYProgramsEmbedder:
+    """Process-wide embedder whose cache lets repeat profiles skip the embeddings API."""
+    return NYProgramsEmbedder(cache=EmbeddingCache.from_env())
 
 
 async def rag_search_programs_node(state: ProgramAgentState) -> ProgramAgentState:
@@ -34,15 +63,26 @@ async def rag_search_programs_node(state: ProgramAgentState) -> ProgramAgentStat
     )
 
     try:
-        embedder = NYProgramsEmbedder()
-        query_embedding: list[float] = embedder.generate_embedding(text=search_query)
+        embedder: NYProgramsEmbedder = get_query_embedder()
+        query_embedding: list[float] = await embedder.agenerate_embedding(
+            text=search_query
+        )
 
         rag_result = await search_programs_rag.ainvoke(
-            input={"embedding": query_embedding, "limit": 10}
+            input={
+                "embedding": query_embedding,
+                "limit": search_limit,
+                "query_terms": [
+                    *(state.get("who_i_am") or []),
+                    *(state.get("what_looking_for") or []),
+                ],
+                "state": state.get("state"),
+            }
         )
 
         if "error" in rag_result:
             state["program_matcher_results"] = []
+            state["error"] = f"Program search failed: {rag_result['error']}"
             logger.info(f"RAG search error: {rag_result['error']}")
         else:
             programs = rag_result.get("programs", [])
@@ -53,8 +93,9 @@ async def rag_search_programs_node(state: ProgramAgentState) -> ProgramAgentStat
             else:
                 logger.info("RAG search result: No programs found")
 
-    except Exception:
+    except Exception as e:
         state["program_matcher_results"] = []
+        state["error"] = f"Program search failed: {e}"
 
     state["current_step"] = "search_complete"
     return state
@@ -67,37 +108,117 @@ async def filter_programs_node(state: ProgramAgentState) -> ProgramAgentState:
         state["current_step"] = "filter_complete"
         return state
 
-    user_profile: str = format_user_profile(state=state)
+    decisions: list[EligibilityDecision] = [
+        evaluate_program(program=program, state=state) for program in programs
+    ]
+    eligible: list[dict[str, Any]] = [
+        eligible_entry(program=program, decision=decision)
+        for program, decision in zip(programs, decisions)
+        if decision.status == ELIGIBLE
+    ]
+    # only programs the rules cannot settle cost LLM tokens
+    ambiguous: list[dict[str, Any]] = [
+        program
+        for program, decision in zip(programs, decisions)
+        if decision.status == AMBIGUOUS
+    ]
+    logger.info(
+        f"Eligibility rules: {len(eligible)} eligible, "
+        f"{len(programs) - len(eligible) - len(ambiguous)} ineligible, "
+        f"{len(ambiguous)} ambiguous"
+    )
 
-    programs_text: str = "\n\n".join(
-        [
-            f"Program {i + 1}:\n{format_program_summary(program=program)}"
-            for i, program in enumerate(programs)
-        ]
+    # profiles sharing a bucket reuse earlier LLM decisions
+    cached_eligible, pending = split_cached_decisions(programs=ambiguous, state=state)
+    eligible.extend(cached_eligible)
+    logger.info(
+        f"Eligibility cache: {len(ambiguous) - len(pending)} of "
+        f"{len(ambiguous)} ambiguous programs served from cache"
     )
 
+    programs_text: str = format_programs_text(programs=programs)
+    state["programs_text"] = programs_text
+    state["filtered_programs"] = json.dumps(eligible)
+
+    if pending:
+        # one flight per (bucket, program) decision: a concurrent profile waits
+        # only on the programs it shares with a call already in flight, then
+        # finds those decisions in the cache and asks about the rest
+        async with decision_flights.hold_all(
+            keys=[decision_cache.key(program=p, state=state) for p in pending]
+        ):
+            cached_eligible, pending = split_cached_decisions(
+                programs=pending, state=state
+            )
+            eligible.extend(cached_eligible)
+            state["filtered_programs"] = json.dumps(eligible)
+            if pending:
+                await decide_with_llm(state=state, eligible=eligible, pending=pending)
+
+    state["current_step"] = "filter_complete"
+    return state
+
+
+def split_cached_decisions(
+    programs: list[dict[str, Any]], state: ProgramAgentState
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """(eligible entries cached for `programs`, programs with no cached decision)"""
+    eligible: list[dict[str, Any]] = []
+    pending: list[dict[str, Any]] = []
+    for program in programs:
+        cached: bool | None = decision_cache.get(program=program, state=state)
+        if cached is None:
+            pending.append(program)
+        elif cached:
+            eligible.append(
+                eligible_entry(
+                    program=program,
+                    decision=EligibilityDecision(
+                        status=ELIGIBLE, reasons=(CACHED_REASON,)
+                    ),
+                )
+            )
+    return eligible, pending
+
+
+async def decide_with_llm(
+    state: ProgramAgentState,
+    eligible: list[dict[str, Any]],
+    pending: list[dict[str, Any]],
+) -> None:
+    """Ask the LLM about `pending` programs, adding its picks to filtered_programs."""
+    ambiguous_text: str = format_programs_text(programs=pending)
     batch_prompt: str = create_batch_eligibility_prompt(
-        user_profile=user_profile, programs_text=programs_text
+        user_profile=format_user_profile(state=state), programs_text=ambiguous_text
     )
 
     try:
-        model = ChatOpenAI(model=openai_model, temperature=0, timeout=30, max_retries=2)
+        model = get_openai_chat(
+            model=openai_model, temperature=0, timeout=30, max_retries=2
+        )
         response: BaseMessage = await model.ainvoke(input=batch_prompt)
         updated_token_usage: dict[str, Any] = token_usage_tracking(
             token_history=state.get("usage_metadata"),
             usage_data=response.usage_metadata,
         )
         decisions_text: str = response.content.strip()
+        llm_items: list[Any] | None = parse_llm_programs(text=decisions_text)
 
-        state["filtered_programs"] = decisions_text
-
-        state["programs_text"] = programs_text
+        if llm_items is None:
+            state["filtered_programs"] = f"{json.dumps(eligible)}\n{decisions_text}"
+        else:
+            state["filtered_programs"] = json.dumps(
+                eligible + llm_eligible_entries(items=llm_items)
+            )
+            # programs the reply skipped or misnamed are asked about again next time
+            for program, item in match_llm_decisions(programs=pending, items=llm_items):
+                decision_cache.set(
+                    program=program, state=state, eligible=item["eligible"]
+                )
 
         state["usage_metadata"] = updated_token_usage
 
     except Exception as e:
         logger.info(f"Error in batch filtering: {e}")
-        state["filtered_programs"] = programs_text
-
-    state["current_step"] = "filter_complete"
-    return state
+        state["error"] = f"Eligibility filtering failed: {e}"
+        state["filtered_programs"] = f"{json.dumps(eligible)}\n\n{ambiguous_text}"
@@ -31,6 +31,15 @@ def format_program_summary(program) -> str:
     """
 
 
+def format_programs_text(programs) -> str:
+    return "\n\n".join(
+        [
+            f"Program {i + 1}:\n{format_program_summary(program=program)}"
+            for i, program in enumerate(programs)
+        ]
+    )
+
+
 def create_batch_eligibility_prompt(user_profile, programs_text) -> str:
     return f"""
     You are an expert in government assistance programs. Evaluate the programs below for user eligibility.
@@ -48,12 +57,12 @@ def create_batch_eligibility_prompt(user_profile, programs_text) -> str:
     - Debt-to-income considerations
     - Any other eligibility criteria mentioned
     
-    Respond with a JSON array containing ONLY the programs the user is eligible for. Each element should have:
-    {{"program_name": "Program Name", "jurisdiction": "State/National", "assistance_type": "Type of assistance", "max_benefit": "Benefit amount", "source": "URL", "reason": "concise explanation with key eligibility details"}}
+    Respond with a JSON array containing one element for EVERY program above, using its exact program name. Each element should have:
+    {{"program_name": "Program Name", "eligible": true or false, "jurisdiction": "State/National", "assistance_type": "Type of assistance", "max_benefit": "Benefit amount", "source": "URL", "reason": "concise explanation with key eligibility details"}}
     
     Example:
     [
-        {{"program_name": "FHA Loan", "jurisdiction": "National", "assistance_type": "Mortgage Insurance", "max_benefit": "Up to $500,000", "source": "https://hud.gov/fha", "reason": "Credit score 650 meets 580+ requirement, income $75k sufficient"}},
-        {{"program_name": "NYS First-Time Homebuyer", "jurisdiction": "New York State", "assistance_type": "Down Payment Assistance", "max_benefit": "Up to $15,000", "source": "https://nyshcr.org", "reason": "First-time buyer in NY with income within limits"}}
+        {{"program_name": "FHA Loan", "eligible": true, "jurisdiction": "National", "assistance_type": "Mortgage Insurance", "max_benefit": "Up to $500,000", "source": "https://hud.gov/fha", "reason": "Credit score 650 meets 580+ requirement, income $75k sufficient"}},
+        {{"program_name": "NYS First-Time Homebuyer", "eligible": false, "jurisdiction": "New York State", "assistance_type": "Down Payment Assistance", "max_benefit": "Up to $15,000", "source": "https://nyshcr.org", "reason": "Income above the program limit"}}
     ]
     """
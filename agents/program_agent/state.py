@@ -20,3 +20,4 @@ class ProgramAgentState(TypedDict):
     filtered_programs: Optional[str]
 
     usage_metadata: Optional[dict[str, Any]]
+    error: Optional[str]  # search or LLM failure; results are not cached
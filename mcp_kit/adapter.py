@@ -1,4 +1,7 @@
+import asyncio
+import time
 from typing import Any
+from mcp_kit.clients.base_client import BaseMCPClient
 from mcp_kit.clients.finance_client import FinanceClient
 from mcp_kit.clients.location_client import LocationClient
 from mcp_kit.clients.supabase_client import SupabaseClient
@@ -10,30 +13,58 @@ class Adapter:
         self.finance = FinanceClient()
         self.location = LocationClient()
         self.connected: dict[str, Any] = {}
+        self.timings: dict[str, dict[str, Any]] = {}
+
+    @property
+    def clients(self) -> dict[str, BaseMCPClient]:
+        return {
+            "supabase": self.supabase,
+            "finance": self.finance,
+            "location": self.location,
+        }
 
     async def connect_all(self) -> dict[str, Any]:
-        try:
-            await self.supabase.connect()
-            self.connected["supabase"] = "connected"
-        except Exception as e:
-            self.connected["supabase"] = f"failed: {e}"
+        await asyncio.gather(
+            *[
+                self._connect(name=name, client=client)
+                for name, client in self.clients.items()
+            ]
+        )
+        return self.connected
 
+    async def _connect(self, name: str, client: BaseMCPClient) -> None:
+        """Connect and warm up one server, recording how long each phase took."""
+        started: float = time.perf_counter()
         try:
-            await self.finance.connect()
-            self.connected["finance"] = "connected"
+            await client.connect()
         except Exception as e:
-            self.connected["finance"] = f"failed: {e}"
+            self.connected[name] = f"failed: {e}"
+            self.timings[name] = {
+                "failed_after_ms": round((time.perf_counter() - started) * 1000, 1)
+            }
+            return
+
+        connected_at: float = time.perf_counter()
+        self.connected[name] = "connected"
+        self.timings[name] = {"connect_ms": round((connected_at - started) * 1000, 1)}
 
         try:
-            await self.location.connect()
-            self.connected["location"] = "connected"
+            await client.warm_up()
         except Exception as e:
-            self.connected["location"] = f"failed: {e}"
-
-        return self.connected
+            self.timings[name]["warm_up_error"] = str(e)
+        self.timings[name]["warm_up_ms"] = round(
+            (time.perf_counter() - connected_at) * 1000, 1
+        )
 
     async def check_running(self) -> dict[str, Any]:
-        return self.connected
+        return {
+            name: {
+                "status": self.connected.get(name, "not connected"),
+                **self.timings.get(name, {}),
+                **client.status(),
+            }
+            for name, client in self.clients.items()
+        }
 
     async def get_available_tools(self) -> dict[str, Any]:
         tools: dict[str, Any] = {}
@@ -46,22 +77,12 @@ class Adapter:
         return tools
 
     async def disconnect_all(self) -> dict[str, Any]:
-        try:
-            await self.supabase.disconnect()
-            self.connected["supabase"] = "disconnected"
-        except Exception:
-            pass
-
-        try:
-            await self.finance.disconnect()
-            self.connected["finance"] = "disconnected"
-        except Exception:
-            pass
-
-        try:
-            await self.location.disconnect()
-            self.connected["location"] = "disconnected"
-        except Exception:
-            pass
+        results: list[Any] = await asyncio.gather(
+            *[client.disconnect() for client in self.clients.values()],
+            return_exceptions=True,
+        )
+        for name, result in zip(self.clients, results):
+            if not isinstance(result, BaseException):
+                self.connected[name] = "disconnected"
 
         return self.connected
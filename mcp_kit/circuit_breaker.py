@@ -0,0 +1,81 @@
+import time
+from logging import Logger
+from typing import Any
+from utils.convenience import get_logger
+
+logger: Logger = get_logger(name=__name__)
+
+
+class MCPUnavailableError(RuntimeError):
+    """Raised when an MCP server cannot serve a call (down, timed out or tripped)."""
+
+
+class CircuitOpenError(MCPUnavailableError):
+    """Raised without touching the transport while a server's breaker is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one MCP server.
+
+    closed    -> calls go through; `failure_threshold` failures in a row open it
+    open      -> calls fail immediately until `reset_timeout` has elapsed
+    half_open -> a single trial call is let through; success closes the
+                 breaker, failure opens it again for another `reset_timeout`
+    """
+
+    CLOSED: str = "closed"
+    OPEN: str = "open"
+    HALF_OPEN: str = "half_open"
+
+    def __init__(
+        self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0
+    ) -> None:
+        self.name: str = name
+        self.failure_threshold: int = max(failure_threshold, 1)
+        self.reset_timeout: float = reset_timeout
+        self.failures: int = 0
+        self.opened_at: float | None = None
+        self._trial_in_flight: bool = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_call(self) -> None:
+        state: str = self.state
+        if state == self.OPEN or (state == self.HALF_OPEN and self._trial_in_flight):
+            retry_in: float = self.reset_timeout - (time.monotonic() - self.opened_at)
+            raise CircuitOpenError(
+                f"{self.name} MCP server unavailable (circuit open, retry in {max(retry_in, 0):.0f}s)"
+            )
+        if state == self.HALF_OPEN:
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info(f"{self.name} MCP circuit closed")
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        trial_failed: bool = self._trial_in_flight
+        self._trial_in_flight = False
+        if trial_failed or self.failures >= self.failure_threshold:
+            if self.opened_at is None or trial_failed:
+                logger.info(
+                    f"{self.name} MCP circuit opened after {self.failures} failures"
+                )
+            self.opened_at = time.monotonic()
+
+    def release_trial(self) -> None:
+        """End a call that neither proved nor disproved the server (cancelled)."""
+        self._trial_in_flight = False
+
+    def stats(self) -> dict[str, Any]:
+        return {"state": self.state, "failures": self.failures}
@@ -0,0 +1,189 @@
+import asyncio
+import os
+from contextlib import AbstractAsyncContextManager
+from logging import Logger
+from typing import Any
+from mcp import ListToolsResult, StdioServerParameters
+from mcp.types import CallToolResult
+from mcp_kit.circuit_breaker import CircuitBreaker, MCPUnavailableError
+from mcp_kit.pool import PoolConfig, SessionPool, TransportStreams, is_transport_error
+from mcp_kit.settings import mcp_number, mcp_setting
+from mcp_kit.transports import (
+    HTTP,
+    INPROCESS,
+    SSE,
+    STDIO,
+    TRANSPORTS,
+    http_transport,
+    inprocess_transport,
+    sse_transport,
+    stdio_transport,
+)
+from utils.convenience import get_logger
+
+logger: Logger = get_logger(name=__name__)
+
+
+class BaseMCPClient:
+    """Transport lifecycle, reconnects, deadlines and circuit breaking for one MCP server.
+
+    Subclasses only describe how to launch their server and how to turn tool
+    results into domain data. Every call goes through `call_tool`, which:
+      - fails immediately while the server's circuit breaker is open,
+      - (re)connects lazily if the pool is down, retrying with exponential
+        backoff when a session's transport breaks,
+      - bounds the whole attempt, reconnects included, by a per-call deadline.
+
+    Settings are read from `<NAME>_MCP_<KEY>` / `MCP_<KEY>` environment
+    variables: TRANSPORT (stdio, http, sse or inprocess), CALL_TIMEOUT,
+    RETRY_ATTEMPTS, RETRY_BACKOFF, BREAKER_FAILURE_THRESHOLD and
+    BREAKER_RESET_TIMEOUT. Network transports connect to `<NAME>_MCP_URL`,
+    defaulting to the server's compose container; `inprocess` binds to the
+    FastMCP object in `server_module` for pure-Python servers, and servers
+    without one fall back to stdio.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        server_params: StdioServerParameters,
+        container_name: str,
+        port: int,
+        server_module: str | None = None,
+    ) -> None:
+        self.name: str = name
+        self.server_key: str = name.lower()
+        self.server_params: StdioServerParameters = server_params
+        self.transport: str = mcp_setting(
+            server=self.server_key, key="TRANSPORT", default=STDIO
+        ).lower()
+        if self.transport not in TRANSPORTS:
+            raise ValueError(
+                f"Unknown {name} MCP transport '{self.transport}', expected one of {TRANSPORTS}"
+            )
+        if self.transport == INPROCESS and server_module is None:
+            # a global MCP_TRANSPORT=inprocess must not break the other servers
+            logger.warning(
+                f"{name} MCP server cannot run in-process, using {STDIO} instead"
+            )
+            self.transport = STDIO
+        self.server_module: str | None = server_module
+        path: str = "/sse" if self.transport == SSE else "/mcp"
+        self.url: str = os.getenv(
+            f"{name.upper()}_MCP_URL", f"http://{container_name}:{port}{path}"
+        )
+        self.call_timeout: float = mcp_number(
+            server=self.server_key, key="CALL_TIMEOUT", default=30.0
+        )
+        self.retry_attempts: int = int(
+            mcp_number(server=self.server_key, key="RETRY_ATTEMPTS", default=3)
+        )
+        self.retry_backoff: float = mcp_number(
+            server=self.server_key, key="RETRY_BACKOFF", default=0.2
+        )
+        self.breaker: CircuitBreaker = CircuitBreaker(
+            name=name,
+            failure_threshold=int(
+                mcp_number(
+                    server=self.server_key, key="BREAKER_FAILURE_THRESHOLD", default=5
+                )
+            ),
+            reset_timeout=mcp_number(
+                server=self.server_key, key="BREAKER_RESET_TIMEOUT", default=30.0
+            ),
+        )
+        self.pool: SessionPool = SessionPool(
+            name=name,
+            transport_factory=self._transport,
+            config=PoolConfig.from_env(server=self.server_key),
+        )
+        self._connect_lock = asyncio.Lock()
+
+    def _transport(self) -> AbstractAsyncContextManager[TransportStreams]:
+        if self.transport == HTTP:
+            return http_transport(url=self.url)
+        if self.transport == SSE:
+            return sse_transport(url=self.url)
+        if self.transport == INPROCESS:
+            return inprocess_transport(server_module=self.server_module)
+        return stdio_transport(server_params=self.server_params)
+
+    async def connect(self) -> None:
+        async with self._connect_lock:
+            await self.pool.start()
+
+    async def disconnect(self) -> None:
+        await self.pool.close()
+
+    async def get_tools(self) -> list[str]:
+        async with self.pool.session() as session:
+            tools_response: ListToolsResult = await session.list_tools()
+        return [tool.name for tool in tools_response.tools]
+
+    async def warm_up(self) -> None:
+        """Prime the server: list its tools, then run a cheap probe call."""
+        await self.get_tools()
+        await self._probe()
+
+    async def _probe(self) -> None:
+        async with self.pool.session() as session:
+            await session.send_ping()
+
+    async def call_tool(
+        self, name: str, arguments: dict[str, Any], timeout: float | None = None
+    ) -> CallToolResult:
+        """Call a tool on the server, raising MCPUnavailableError on outage."""
+        self.breaker.before_call()
+        deadline: float = timeout if timeout is not None else self.call_timeout
+
+        try:
+            result: CallToolResult = await asyncio.wait_for(
+                self._call_with_retries(name=name, arguments=arguments),
+                timeout=deadline,
+            )
+        except TimeoutError:
+            self.breaker.record_failure()
+            raise MCPUnavailableError(
+                f"{self.name} MCP call '{name}' exceeded its {deadline}s deadline"
+            )
+        except MCPUnavailableError:
+            self.breaker.record_failure()
+            raise
+        except Exception:
+            # the server answered, with an error of its own
+            self.breaker.record_success()
+            raise
+        except BaseException:
+            # cancelled: says nothing about the server, but frees a half-open trial
+            self.breaker.release_trial()
+            raise
+
+        self.breaker.record_success()
+        return result
+
+    async def _call_with_retries(
+        self, name: str, arguments: dict[str, Any]
+    ) -> CallToolResult:
+        last_error: BaseException | None = None
+        for attempt in range(max(self.retry_attempts, 1)):
+            if attempt:
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            try:
+                if not self.pool.started:
+                    await self.connect()
+                async with self.pool.session() as session:
+                    return await session.call_tool(name=name, arguments=arguments)
+            except Exception as e:
+                if not (is_transport_error(error=e) or not self.pool.started):
+                    raise
+                last_error = e
+                logger.info(
+                    f"{self.name} MCP call '{name}' failed (attempt {attempt + 1}): {e}"
+                )
+
+        raise MCPUnavailableError(
+            f"{self.name} MCP server unavailable: {last_error}"
+        ) from last_error
+
+    def status(self) -> dict[str, Any]:
+        return {"pool": self.pool.stats(), "breaker": self.breaker.stats()}
@@ -1,13 +1,10 @@
-import asyncio
-from contextlib import _AsyncGeneratorContextManager
 from logging import Logger
 from typing import Any
-from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
 from dotenv import load_dotenv
-from mcp import ClientSession, ListToolsResult, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from mcp.shared.message import SessionMessage
+from mcp import StdioServerParameters
 from mcp.types import CallToolResult
+from mcp_kit.circuit_breaker import MCPUnavailableError
+from mcp_kit.clients.base_client import BaseMCPClient
 from utils.convenience import get_logger
 
 logger: Logger = get_logger(name=__name__)
@@ -15,85 +12,42 @@ logger: Logger = get_logger(name=__name__)
 load_dotenv()
 
 
-class FinanceClient:
+class FinanceClient(BaseMCPClient):
     def __init__(self, container_name="finance-mcp-server") -> None:
         self.container_name: str = container_name
-        self.server_params = StdioServerParameters(
+        server_params: StdioServerParameters = StdioServerParameters(
             command="docker", args=["exec", "-i", container_name, "python", "server.py"]
         )
-        self.session = None
-        self._stdio_context = None
-        self._session_context = None
-
-    async def connect(self) -> None:
-        if self.session:
-            return
-
-        self._stdio_context: _AsyncGeneratorContextManager[
-            tuple[
-                MemoryObjectReceiveStream[SessionMessage | Exception],
-                MemoryObjectSendStream[SessionMessage],
-            ],
-            None,
-        ] = stdio_client(server=self.server_params)
-        read_stream, write_stream = await self._stdio_context.__aenter__()
-
-        self._session_context = ClientSession(
-            read_stream=read_stream, write_stream=write_stream
+        super().__init__(
+            name="Finance",
+            server_params=server_params,
+            container_name=container_name,
+            port=8001,
+            server_module="mcp_kit.servers.finance.server",
         )
-        self.session: ClientSession = await self._session_context.__aenter__()
 
-        await self.session.initialize()
-        logger.info("Connected to Finance MCP server")
-
-    async def disconnect(self) -> None:
-        if not self.session:
-            return
-
-        try:
-            if self._session_context:
-                await self._session_context.__aexit__(
-                    exc_type=None, exc_val=None, exc_tb=None
-                )
-        except (Exception, asyncio.CancelledError):
-            pass
-
-        try:
-            if self._stdio_context:
-                await self._stdio_context.__aexit__(
-                    typ=None, value=None, traceback=None
-                )
-        except (Exception, asyncio.CancelledError):
-            pass
-
-        self.session = None
-        self._session_context = None
-        self._stdio_context = None
-        logger.info("Disconnected from Finance MCP server")
-
-    async def get_tools(self) -> list[str]:
-        if not self.session:
-            raise RuntimeError("Not connected. Call connect() first.")
-        tools_response: ListToolsResult = await self.session.list_tools()
-        return [tool.name for tool in tools_response.tools]
+    async def _probe(self) -> None:
+        await self.call_tool(name="calculate_budget", arguments={"income": 1.0})
 
     async def calculate_budget(self, income: float) -> dict[str, Any]:
-        if not self.session:
-            raise RuntimeError("Not connected. Call connect() first.")
-        result: CallToolResult = await self.session.call_tool(
-            name="calculate_budget", arguments={"income": income}
-        )
+        try:
+            result: CallToolResult = await self.call_tool(
+                name="calculate_budget", arguments={"income": income}
+            )
+        except MCPUnavailableError as e:
+            return {"error": str(e)}
         return self._parse_budget_data(result=result, income=income)
 
     async def loan_qualification(
         self, income: float, credit_score: int
     ) -> dict[str, Any]:
-        if not self.session:
-            raise RuntimeError("Not connected. Call connect() first.")
-        result: CallToolResult = await self.session.call_tool(
-            name="loan_qualification",
-            arguments={"income": income, "credit_score": credit_score},
-        )
+        try:
+            result: CallToolResult = await self.call_tool(
+                name="loan_qualification",
+                arguments={"income": income, "credit_score": credit_score},
+            )
+        except MCPUnavailableError as e:
+            return {"error": str(e)}
         return self._parse_loan_data(result=result)
 
     def _parse_budget_data(
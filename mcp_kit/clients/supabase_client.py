@@ -1,15 +1,12 @@
-import asyncio
 import json
 import os
-from contextlib import _AsyncGeneratorContextManager
 from logging import Logger
 from typing import Any
-from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
 from dotenv import load_dotenv
-from mcp import ClientSession, ListToolsResult, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from mcp.shared.message import SessionMessage
+from mcp import StdioServerParameters
 from mcp.types import CallToolResult
+from mcp_kit.circuit_breaker import MCPUnavailableError
+from mcp_kit.clients.base_client import BaseMCPClient
 from utils.convenience import get_logger
 
 logger: Logger = get_logger(name=__name__)
@@ -17,10 +14,10 @@ logger: Logger = get_logger(name=__name__)
 load_dotenv()
 
 
-class SupabaseClient:
+class SupabaseClient(BaseMCPClient):
     def __init__(self, container_name: str = "supabase-mcp-server") -> None:
         self.container_name: str = container_name
-        self.server_params: StdioServerParameters = StdioServerParameters(
+        server_params: StdioServerParameters = StdioServerParameters(
             command="docker",
             args=[
                 "exec",
@@ -34,82 +31,33 @@ class SupabaseClient:
                 "--access-token=" + os.getenv("SUPABASE_ACCESS_TOKEN", "your-token"),
             ],
         )
-        self.session = None
-        self._stdio_context = None
-        self._session_context = None
-
-    async def connect(self) -> None:
-        if self.session:
-            return
-
-        self._stdio_context: _AsyncGeneratorContextManager[
-            tuple[
-                MemoryObjectReceiveStream[SessionMessage | Exception],
-                MemoryObjectSendStream[SessionMessage],
-            ],
-            None,
-        ] = stdio_client(server=self.server_params)
-        read_stream, write_stream = await self._stdio_context.__aenter__()
-
-        self._session_context = ClientSession(
-            read_stream=read_stream, write_stream=write_stream
+        super().__init__(
+            name="Supabase",
+            server_params=server_params,
+            container_name=container_name,
+            port=8003,
         )
-        self.session: ClientSession = await self._session_context.__aenter__()
 
-        await self.session.initialize()
-        logger.info("Connected to Supabase MCP server")
-
-    async def disconnect(self) -> None:
-        if not self.session:
-            return
-
-        try:
-            if self._session_context:
-                await self._session_context.__aexit__(
-                    exc_type=None, exc_val=None, exc_tb=None
-                )
-        except (Exception, asyncio.CancelledError):
-            pass
-
-        try:
-            if self._stdio_context:
-                await self._stdio_context.__aexit__(
-                    typ=None, value=None, traceback=None
-                )
-        except (Exception, asyncio.CancelledError):
-            pass
-
-        self.session = None
-        self._session_context = None
-        self._stdio_context = None
-        logger.info("Disconnected from Supabase MCP server")
-
-    async def get_tools(self) -> list[str]:
-        if not self.session:
-            raise RuntimeError("Not connected. Call connect() first.")
-        tools_response: ListToolsResult = await self.session.list_tools()
-        return [tool.name for tool in tools_response.tools]
+    async def _probe(self) -> None:
+        await self.call_tool(name="execute_sql", arguments={"query": "SELECT 1;"})
 
     async def query_home_by_id(self, home_id: str) -> dict[str, Any]:
-        if not self.session:
-            raise RuntimeError("Not connected. Call connect() first.")
-
         query: str = (
             f'SELECT * FROM public.nyc_property_sales WHERE "HOME_ID" = {home_id};'
         )
 
-        result: CallToolResult = await self.session.call_tool(
-            name="execute_sql", arguments={"query": query}
-        )
+        try:
+            result: CallToolResult = await self.call_tool(
+                name="execute_sql", arguments={"query": query}
+            )
+        except MCPUnavailableError as e:
+            return {"error": str(e)}
 
         return self._parse_property_data(result=result)
 
     async def query_price_data_by_zip_and_units(
         self, zip_code: str, residential_units: int
     ) -> dict[str, Any]:
-        if not self.session:
-            raise RuntimeError("Not connected. Call connect() first.")
-
         query: str = f"""
         SELECT 
             AVG(CAST("SALE PRICE" AS NUMERIC)) as average_sale_price,
@@ -125,16 +73,16 @@ class SupabaseClient:
         GROUP BY "ZIP CODE", "RESIDENTIAL UNITS";
         """
 
-        result: CallToolResult = await self.session.call_tool(
-            name="execute_sql", arguments={"query": query}
-        )
+        try:
+            result: CallToolResult = await self.call_tool(
+                name="execute_sql", arguments={"query": query}
+            )
+        except MCPUnavailableError as e:
+            return {"error": str(e)}
 
         return self._parse_price_data(result=result)
 
     async def search_programs_rag(self, embedding, limit=10) -> dict[str, Any]:
-        if not self.session:
-            raise RuntimeError("Not connected. Call connect() first.")
-
         embedding_str: str = json.dumps(embedding)
 
         query_sql: str = f"""
@@ -152,12 +100,94 @@ class SupabaseClient:
         LIMIT {limit};
         """
 
-        result: CallToolResult = await self.session.call_tool(
-            name="execute_sql", arguments={"query": query_sql}
-        )
+        try:
+            result: CallToolResult = await self.call_tool(
+                name="execute_sql", arguments={"query": query_sql}
+            )
+        except MCPUnavailableError as e:
+            return {"error": str(e)}
 
         return self._parse_programs_rag_results(result=result)
 
+    async def fetch_programs_snapshot(self) -> dict[str, Any]:
+        """Fetch every program with its embedding to build a local vector index."""
+        query_sql: str = """
+        SELECT 
+            program_name,
+            formatted_text,
+            jurisdiction,
+            assistance_type,
+            max_benefit,
+            eligibility,
+            source,
+            embedding_vector
+        FROM public.nyc_programs_rag;
+        """
+
+        try:
+            result: CallToolResult = await self.call_tool(
+                name="execute_sql", arguments={"query": query_sql}
+            )
+        except MCPUnavailableError as e:
+            return {"error": str(e)}
+
+        return self._parse_programs_snapshot(result=result)
+
+    async def list_zip_codes(self) -> dict[str, Any]:
+        """Every zip code with property sales, e.g. to warm the geoscout cache."""
+        query_sql: str = """
+        SELECT DISTINCT "ZIP CODE" as zip_code
+        FROM public.nyc_property_sales
+        WHERE "ZIP CODE" ~ '^[0-9]{5}$'
+        ORDER BY zip_code;
+        """
+
+        try:
+            result: CallToolResult = await self.call_tool(
+                name="execute_sql", arguments={"query": query_sql}
+            )
+        except MCPUnavailableError as e:
+            return {"error": str(e)}
+
+        rows: dict[str, Any] = self._parse_rows(result=result)
+        if "error" in rows:
+            return rows
+        return {"zip_codes": [str(row["zip_code"]) for row in rows["rows"]]}
+
+    def _parse_programs_snapshot(self, result: CallToolResult) -> dict[str, Any]:
+        rows: dict[str, Any] = self._parse_rows(result=result)
+        if "error" in rows:
+            return rows
+        return {"programs": rows["rows"], "total_found": len(rows["rows"])}
+
+    def _parse_rows(self, result: CallToolResult) -> dict[str, Any]:
+        """Rows may contain arrays, so the JSON ends at the last "]" before the end marker."""
+        if not result or not hasattr(result, "content") or not result.content:
+            return {"error": "No results found"}
+
+        try:
+            content_text: str = result.content[0].text
+            start_idx: int = content_text.find("<untrusted-data-")
+            end_idx: int = content_text.find("</untrusted-data-")
+            if start_idx == -1 or end_idx == -1 or start_idx >= end_idx:
+                return {"error": "No data found in response"}
+
+            json_start: int = content_text.find("[", start_idx, end_idx)
+            json_end: int = content_text.rfind("]", start_idx, end_idx)
+            if json_start == -1 or json_end == -1 or json_start >= json_end:
+                return {"error": "No JSON data found"}
+
+            json_str: str = content_text[json_start : json_end + 1]
+            json_str = json_str.replace('\\"', '"')
+            rows: Any = json.loads(json_str)
+            if not isinstance(rows, list):
+                return {"error": "Invalid data format"}
+
+            return {"rows": rows}
+        except (json.JSONDecodeError, IndexError, TypeError, AttributeError) as e:
+            logger.info(f"Row parsing failed with error: {e}")
+            return {"error": f"Failed to parse results: {str(e)}"}
+
     def _parse_programs_rag_results(self, result: CallToolResult) -> dict[str, Any]:
         """Parse MCP result and return clean program search data"""
         if not result or not hasattr(result, "content") or not result.content:
@@ -0,0 +1,376 @@
+import asyncio
+import time
+import anyio
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from dataclasses import dataclass
+from logging import Logger
+from typing import Any, AsyncIterator, Callable
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+from mcp.shared.message import SessionMessage
+from mcp.types import CONNECTION_CLOSED
+from mcp_kit.settings import mcp_number
+from utils.convenience import get_logger
+
+logger: Logger = get_logger(name=__name__)
+
+TransportStreams = tuple[
+    MemoryObjectReceiveStream[SessionMessage | Exception],
+    MemoryObjectSendStream[SessionMessage],
+]
+TransportFactory = Callable[[], AbstractAsyncContextManager[TransportStreams]]
+
+
+def is_transport_error(error: BaseException) -> bool:
+    """True when the error means the session's pipe/connection is gone.
+
+    A TimeoutError (an OSError subclass) only means one call was slow; the
+    multiplexed session may still be serving other calls.
+    """
+    if isinstance(error, McpError):
+        return error.error.code == CONNECTION_CLOSED
+    if isinstance(error, TimeoutError):
+        return False
+    return isinstance(
+        error,
+        (
+            anyio.ClosedResourceError,
+            anyio.BrokenResourceError,
+            anyio.EndOfStream,
+            ConnectionError,
+            OSError,
+        ),
+    )
+
+
+@dataclass
+class PoolConfig:
+    min_sessions: int = 1
+    max_sessions: int = 4
+    # a new session is opened once every live session has this many calls in flight
+    max_in_flight_per_session: int = 4
+    idle_timeout: float = 300.0
+    health_check_interval: float = 30.0
+    connect_timeout: float = 60.0
+    ping_timeout: float = 5.0
+
+    @classmethod
+    def from_env(cls, server: str) -> "PoolConfig":
+        defaults = cls()
+        min_sessions = int(
+            mcp_number(
+                server=server, key="POOL_MIN_SESSIONS", default=defaults.min_sessions
+            )
+        )
+        max_sessions = int(
+            mcp_number(
+                server=server, key="POOL_MAX_SESSIONS", default=defaults.max_sessions
+            )
+        )
+        return cls(
+            min_sessions=max(min_sessions, 0),
+            max_sessions=max(max_sessions, min_sessions, 1),
+            max_in_flight_per_session=int(
+                mcp_number(
+                    server=server,
+                    key="POOL_MAX_IN_FLIGHT",
+                    default=defaults.max_in_flight_per_session,
+                )
+            ),
+            idle_timeout=mcp_number(
+                server=server, key="POOL_IDLE_TIMEOUT", default=defaults.idle_timeout
+            ),
+            health_check_interval=mcp_number(
+                server=server,
+                key="POOL_HEALTH_CHECK_INTERVAL",
+                default=defaults.health_check_interval,
+            ),
+            connect_timeout=mcp_number(
+                server=server,
+                key="POOL_CONNECT_TIMEOUT",
+                default=defaults.connect_timeout,
+            ),
+            ping_timeout=mcp_number(
+                server=server, key="POOL_PING_TIMEOUT", default=defaults.ping_timeout
+            ),
+        )
+
+
+class PooledSession:
+    """One MCP session plus the task that owns its transport.
+
+    The transport and session context managers are entered and exited inside a
+    dedicated task, because the stdio/anyio contexts must be closed by the same
+    task that opened them, while the pool opens and reaps sessions from request
+    tasks and its maintenance task.
+    """
+
+    def __init__(self, name: str, transport_factory: TransportFactory) -> None:
+        self.name: str = name
+        self.session: ClientSession | None = None
+        self.in_flight: int = 0
+        self.total_calls: int = 0
+        self.last_used: float = time.monotonic()
+        self._transport_factory: TransportFactory = transport_factory
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._error: BaseException | None = None
+
+    @property
+    def alive(self) -> bool:
+        return (
+            self.session is not None
+            and not self._closing.is_set()
+            and self._task is not None
+            and not self._task.done()
+        )
+
+    async def open(self, timeout: float) -> None:
+        self._task = asyncio.create_task(self._run(), name=f"mcp-session-{self.name}")
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+        except TimeoutError:
+            await self.close()
+            raise TimeoutError(
+                f"Timed out after {timeout}s connecting to {self.name} MCP server"
+            )
+        if self._error is not None:
+            raise self._error
+
+    async def _run(self) -> None:
+        try:
+            async with self._transport_factory() as (read_stream, write_stream):
+                async with ClientSession(
+                    read_stream=read_stream, write_stream=write_stream
+                ) as session:
+                    await session.initialize()
+                    self.session = session
+                    self._ready.set()
+                    await self._closing.wait()
+        except Exception as e:
+            self._error = e
+            if self._ready.is_set():
+                logger.info(f"{self.name} MCP session terminated: {e}")
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def ping(self, timeout: float) -> bool:
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    async def close(self, timeout: float = 5.0) -> None:
+        self._closing.set()
+        if self._task is None or self._task.done():
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout=timeout)
+        except Exception:
+            self._task.cancel()
+            try:
+                await self._task
+            except (Exception, asyncio.CancelledError):
+                pass
+
+
+class SessionPool:
+    """Pool of MCP sessions for one server with least-loaded dispatch.
+
+    A `ClientSession` multiplexes concurrent requests over its transport, so
+    calls are spread over the live session with the fewest calls in flight and
+    new sessions are opened (up to `max_sessions`) only once every session is
+    saturated. A maintenance task pings idle sessions, drops the ones that
+    fail, reaps sessions idle for longer than `idle_timeout` and tops the pool
+    back up to `min_sessions`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        transport_factory: TransportFactory,
+        config: PoolConfig | None = None,
+    ) -> None:
+        self.name: str = name
+        self.config: PoolConfig = config or PoolConfig()
+        self._transport_factory: TransportFactory = transport_factory
+        self._sessions: list[PooledSession] = []
+        self._opening: int = 0
+        self._lock = asyncio.Lock()
+        self._maintenance_task: asyncio.Task[None] | None = None
+        self.started: bool = False
+
+    async def start(self) -> None:
+        if self.started:
+            return
+        self.started = True
+        opened: list[Any] = await asyncio.gather(
+            *[self._open_session() for _ in range(max(self.config.min_sessions, 1))],
+            return_exceptions=True,
+        )
+        errors: list[BaseException] = [
+            result for result in opened if isinstance(result, BaseException)
+        ]
+        if len(errors) == len(opened):
+            self.started = False
+            raise errors[0]
+
+        self._maintenance_task = asyncio.create_task(
+            self._maintain(), name=f"mcp-pool-{self.name}"
+        )
+        logger.info(f"Connected to {self.name} MCP server ({self.size} sessions)")
+
+    async def close(self) -> None:
+        if not self.started:
+            return
+        self.started = False
+        if self._maintenance_task:
+            self._maintenance_task.cancel()
+            try:
+                await self._maintenance_task
+            except (Exception, asyncio.CancelledError):
+                pass
+            self._maintenance_task = None
+
+        sessions: list[PooledSession] = self._sessions
+        self._sessions = []
+        await asyncio.gather(
+            *[pooled.close() for pooled in sessions], return_exceptions=True
+        )
+        logger.info(f"Disconnected from {self.name} MCP server")
+
+    @property
+    def size(self) -> int:
+        return len([pooled for pooled in self._sessions if pooled.alive])
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[ClientSession]:
+        """Lease the least-loaded session for the duration of one call."""
+        pooled: PooledSession = await self._acquire()
+        pooled.in_flight += 1
+        pooled.total_calls += 1
+        try:
+            yield pooled.session
+        except Exception as e:
+            if is_transport_error(error=e):
+                logger.info(f"Dropping broken {self.name} MCP session: {e}")
+                await self._discard(pooled=pooled)
+            raise
+        finally:
+            pooled.in_flight -= 1
+            pooled.last_used = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "sessions": self.size,
+            "opening": self._opening,
+            "in_flight": sum(pooled.in_flight for pooled in self._sessions),
+            "total_calls": sum(pooled.total_calls for pooled in self._sessions),
+            "min_sessions": self.config.min_sessions,
+            "max_sessions": self.config.max_sessions,
+        }
+
+    async def _acquire(self) -> PooledSession:
+        if not self.started:
+            raise RuntimeError("Not connected. Call connect() first.")
+
+        self._sessions = [pooled for pooled in self._sessions if pooled.alive]
+        least_loaded: PooledSession | None = min(
+            self._sessions, key=lambda pooled: pooled.in_flight, default=None
+        )
+        if (
+            least_loaded is not None
+            and least_loaded.in_flight < self.config.max_in_flight_per_session
+        ):
+            return least_loaded
+
+        if len(self._sessions) + self._opening < self.config.max_sessions:
+            try:
+                return await self._open_session()
+            except Exception as e:
+                if least_loaded is None:
+                    raise
+                logger.info(f"{self.name} MCP pool could not grow: {e}")
+
+        while least_loaded is None:
+            # the pool is at capacity and every session is still being opened
+            if self._opening == 0:
+                return await self._open_session()
+            await asyncio.sleep(0.05)
+            least_loaded = min(
+                [pooled for pooled in self._sessions if pooled.alive],
+                key=lambda pooled: pooled.in_flight,
+                default=None,
+            )
+        return least_loaded
+
+    async def _open_session(self) -> PooledSession:
+        self._opening += 1
+        pooled = PooledSession(
+            name=self.name, transport_factory=self._transport_factory
+        )
+        try:
+            await pooled.open(timeout=self.config.connect_timeout)
+        finally:
+            self._opening -= 1
+        async with self._lock:
+            self._sessions.append(pooled)
+        return pooled
+
+    async def _maintain(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.health_check_interval)
+            try:
+                await self._check_health()
+                await self._reap_idle()
+                await self._replenish()
+            except Exception as e:
+                logger.info(f"{self.name} MCP pool maintenance failed: {e}")
+
+    async def _check_health(self) -> None:
+        idle: list[PooledSession] = [
+            pooled for pooled in self._sessions if pooled.in_flight == 0
+        ]
+        results: list[bool] = await asyncio.gather(
+            *[pooled.ping(timeout=self.config.ping_timeout) for pooled in idle]
+        )
+        for pooled, healthy in zip(idle, results):
+            if not healthy:
+                logger.info(f"Dropping unhealthy {self.name} MCP session")
+                await self._discard(pooled=pooled)
+
+    async def _reap_idle(self) -> None:
+        now: float = time.monotonic()
+        idle: list[PooledSession] = sorted(
+            [
+                pooled
+                for pooled in self._sessions
+                if pooled.in_flight == 0
+                and now - pooled.last_used > self.config.idle_timeout
+            ],
+            key=lambda pooled: pooled.last_used,
+        )
+        for pooled in idle:
+            if self.size <= self.config.min_sessions:
+                break
+            await self._discard(pooled=pooled)
+
+    async def _replenish(self) -> None:
+        missing: int = self.config.min_sessions - self.size - self._opening
+        if missing <= 0:
+            return
+        await asyncio.gather(
+            *[self._open_session() for _ in range(missing)], return_exceptions=True
+        )
+
+    async def _discard(self, pooled: PooledSession) -> None:
+        async with self._lock:
+            if pooled in self._sessions:
+                self._sessions.remove(pooled)
+        await pooled.close()
@@ -1,4 +1,5 @@
 from fastmcp import FastMCP
+from utils.mcp_server import run_server
 
 server: FastMCP = FastMCP(name="Finance")
 
@@ -25,4 +26,4 @@ def loan_qualification(income: float, credit_score: int) -> float:
 
 
 if __name__ == "__main__":
-    server.run(transport="stdio")
+    run_server(server=server)
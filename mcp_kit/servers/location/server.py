@@ -3,19 +3,20 @@ import httpx
 from typing import Any
 from dotenv import load_dotenv
 from fastmcp import FastMCP
+from utils.mcp_server import run_server
 
 load_dotenv()
 
 server: FastMCP = FastMCP(name="Location")
 
 
-def _get_zip_coordinates(zip_code: str) -> tuple[float, float]:
+async def _get_zip_coordinates(zip_code: str) -> tuple[float, float]:
     """Convert ZIP code to lat/lon coordinates"""
     try:
         url = f"https://api.zippopotam.us/us/{zip_code}"
 
-        with httpx.Client() as client:
-            response: httpx.Response = client.get(url=url, timeout=10.0)
+        async with httpx.AsyncClient() as client:
+            response: httpx.Response = await client.get(url=url, timeout=10.0)
             response.raise_for_status()
             data: Any = response.json()
 
@@ -32,7 +33,7 @@ def _get_zip_coordinates(zip_code: str) -> tuple[float, float]:
 
 
 @server.tool()
-def get_transit_score(zip_code: str) -> dict[str, Any]:
+async def get_transit_score(zip_code: str) -> dict[str, Any]:
     """
     Get transit score and summary for a specific ZIP code
 
@@ -43,7 +44,7 @@ def get_transit_score(zip_code: str) -> dict[str, Any]:
         dictionary containing transit score, description, and route summary
     """
     try:
-        lat, lon = _get_zip_coordinates(zip_code=zip_code)
+        lat, lon = await _get_zip_coordinates(zip_code=zip_code)
 
         api_key = os.getenv("WALKSCORE_API_KEY")
         if not api_key:
@@ -55,8 +56,8 @@ def get_transit_score(zip_code: str) -> dict[str, Any]:
 
         params: dict[str, Any] = {"lat": lat, "lon": lon, "wsapikey": api_key}
 
-        with httpx.Client() as client:
-            response: httpx.Response = client.get(
+        async with httpx.AsyncClient() as client:
+            response: httpx.Response = await client.get(
                 url="https://transit.walkscore.com/transit/score/",
                 params=params,
                 timeout=10.0,
@@ -96,4 +97,4 @@ def get_transit_score(zip_code: str) -> dict[str, Any]:
 
 
 if __name__ == "__main__":
-    server.run(transport="stdio")
+    run_server(server=server)
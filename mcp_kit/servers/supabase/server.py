@@ -0,0 +1,27 @@
+import os
+from dotenv import load_dotenv
+from fastmcp import FastMCP
+from fastmcp.client.transports import StdioTransport
+from utils.mcp_server import run_server
+
+load_dotenv()
+
+# Stand-in that fronts the stdio-only `@supabase/mcp-server-supabase` with a
+# network transport. keep_alive reuses one npx child across proxied sessions.
+server: FastMCP = FastMCP.as_proxy(
+    backend=StdioTransport(
+        command="npx",
+        args=[
+            "@supabase/mcp-server-supabase@latest",
+            "--read-only",
+            "--project-ref=" + os.getenv("SUPABASE_PROJECT_REF", "YOUR_PROJECT_REF"),
+            "--access-token=" + os.getenv("SUPABASE_ACCESS_TOKEN", "your-token"),
+        ],
+        keep_alive=True,
+    ),
+    name="Supabase",
+)
+
+
+if __name__ == "__main__":
+    run_server(server=server)
@@ -0,0 +1,15 @@
+import os
+
+
+def mcp_setting(server: str, key: str, default: str) -> str:
+    """Read `<SERVER>_MCP_<KEY>`, falling back to `MCP_<KEY>` and then `default`."""
+    value: str | None = os.getenv(f"{server.upper()}_MCP_{key}") or os.getenv(
+        f"MCP_{key}"
+    )
+    if value is None or value == "":
+        return default
+    return value
+
+
+def mcp_number(server: str, key: str, default: float) -> float:
+    return float(mcp_setting(server=server, key=key, default=str(default)))
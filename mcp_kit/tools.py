@@ -1,10 +1,40 @@
+import asyncio
+import os
+from logging import Logger
 from typing import Any
 from langchain_core.tools import tool
 from mcp_kit.adapter import Adapter
+from utils.convenience import get_logger
+from utils.hybrid_retriever import filter_by_state, hybrid_retriever
+from utils.vector_index import program_index
+
+logger: Logger = get_logger(name=__name__)
 
 mcp_adapter = Adapter()
 
 
+async def load_program_index() -> dict[str, Any]:
+    """Load the local program index from PROGRAMS_INDEX_PATH (a saved index
+    directory or a program CSV), else from a Supabase snapshot."""
+    path: str | None = os.getenv("PROGRAMS_INDEX_PATH")
+    try:
+        if path and os.path.exists(path):
+            await asyncio.to_thread(program_index.load_path, path)
+        else:
+            snapshot: dict[
+                str, Any
+            ] = await mcp_adapter.supabase.fetch_programs_snapshot()
+            if "error" in snapshot:
+                logger.info(f"Program index not loaded: {snapshot['error']}")
+            else:
+                await asyncio.to_thread(
+                    program_index.load_rows, snapshot["programs"], "supabase"
+                )
+    except Exception as e:
+        logger.info(f"Program index not loaded: {e}")
+    return program_index.stats()
+
+
 @tool
 async def calculate_budget(income: float) -> dict[str, Any]:
     """Calculate 30% budget from income using Finance MCP"""
@@ -53,9 +83,27 @@ async def query_price_data_by_zip_and_units(
 
 
 @tool
-async def search_programs_rag(embedding: list, limit: int = 10) -> dict[str, Any]:
-    """Search government programs using vector similarity search with RAG using embedding"""
-    result: dict[str, Any] = await mcp_adapter.supabase.search_programs_rag(
+async def search_programs_rag(
+    embedding: list,
+    limit: int = 10,
+    query_terms: list[str] | None = None,
+    state: str | None = None,
+) -> dict[str, Any]:
+    """Search government programs using hybrid keyword + vector similarity search with RAG using embedding, optionally restricted to a state"""
+    if program_index.ready:
+        if query_terms or state:
+            result: dict[str, Any] = hybrid_retriever.search(
+                embedding=embedding,
+                query_terms=query_terms or [],
+                state=state,
+                limit=limit,
+            )
+        else:
+            result = program_index.search(embedding=embedding, limit=limit)
+        if "error" not in result:
+            return result
+        logger.info(f"Local program search failed, using Supabase: {result['error']}")
+    result = await mcp_adapter.supabase.search_programs_rag(
         embedding=embedding, limit=limit
     )
-    return result
+    return filter_by_state(result=result, state=state)
@@ -0,0 +1,66 @@
+import importlib
+import anyio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+from mcp import StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.memory import create_client_server_memory_streams
+from mcp_kit.pool import TransportStreams
+
+STDIO: str = "stdio"
+HTTP: str = "http"
+SSE: str = "sse"
+INPROCESS: str = "inprocess"
+TRANSPORTS: tuple[str, ...] = (STDIO, HTTP, SSE, INPROCESS)
+
+
+@asynccontextmanager
+async def stdio_transport(
+    server_params: StdioServerParameters,
+) -> AsyncIterator[TransportStreams]:
+    """Spawn the server as a child process (`docker exec -i ...`) per session."""
+    async with stdio_client(server=server_params) as (read_stream, write_stream):
+        yield read_stream, write_stream
+
+
+@asynccontextmanager
+async def http_transport(url: str) -> AsyncIterator[TransportStreams]:
+    """Connect to a long-running server over streamable HTTP."""
+    async with streamablehttp_client(url=url) as (read_stream, write_stream, _):
+        yield read_stream, write_stream
+
+
+@asynccontextmanager
+async def sse_transport(url: str) -> AsyncIterator[TransportStreams]:
+    """Connect to a long-running server over the legacy SSE transport."""
+    async with sse_client(url=url) as (read_stream, write_stream):
+        yield read_stream, write_stream
+
+
+@asynccontextmanager
+async def inprocess_transport(server_module: str) -> AsyncIterator[TransportStreams]:
+    """Bind to the FastMCP `server` object of `server_module` in this process.
+
+    Requests still go through the MCP protocol (initialize, list_tools,
+    call_tool), but over in-memory streams instead of a pipe or socket.
+    """
+    server: Any = importlib.import_module(name=server_module).server
+    async with create_client_server_memory_streams() as (
+        client_streams,
+        server_streams,
+    ):
+        server_read, server_write = server_streams
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(
+                lambda: server._mcp_server.run(
+                    server_read,
+                    server_write,
+                    server._mcp_server.create_initialization_options(),
+                )
+            )
+            try:
+                yield client_streams
+            finally:
+                tg.cancel_scope.cancel()
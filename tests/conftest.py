@@ -1,5 +1,6 @@
 import pytest
 from langsmith import Client
+from mcp_kit.transports import inprocess_transport
 
 
 @pytest.fixture
@@ -10,3 +11,8 @@ def anyio_backend():
 @pytest.fixture
 def langsmith_client():
     return Client()
+
+
+@pytest.fixture
+def finance_transport():
+    return lambda: inprocess_transport(server_module="mcp_kit.servers.finance.server")
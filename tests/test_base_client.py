@@ -0,0 +1,145 @@
+import asyncio
+import pytest
+from mcp import StdioServerParameters
+from mcp_kit.adapter import Adapter
+from mcp_kit.circuit_breaker import CircuitBreaker, CircuitOpenError
+from mcp_kit.clients.finance_client import FinanceClient
+from mcp_kit.clients.supabase_client import SupabaseClient
+
+
+class InMemoryFinanceClient(FinanceClient):
+    def __init__(self, transport_factory) -> None:
+        super().__init__()
+        self.pool._transport_factory = transport_factory
+
+
+class UnreachableFinanceClient(FinanceClient):
+    def __init__(self) -> None:
+        super().__init__()
+        self.server_params = StdioServerParameters(command="missing-mcp-binary")
+        self.retry_backoff = 0.0
+        self.breaker = CircuitBreaker(name="Finance", failure_threshold=2)
+
+
+@pytest.mark.anyio
+async def test_client_reconnects_after_session_dies(finance_transport) -> None:
+    client = InMemoryFinanceClient(transport_factory=finance_transport)
+    await client.connect()
+    try:
+        assert (await client.calculate_budget(income=1200.0))["budget"] == 30.0
+
+        for pooled in list(client.pool._sessions):
+            await pooled.close()
+        assert client.pool.size == 0
+
+        result = await client.loan_qualification(income=1000.0, credit_score=760)
+        assert result == {"max_loan": 5000.0}
+        assert client.breaker.state == CircuitBreaker.CLOSED
+    finally:
+        await client.disconnect()
+
+
+@pytest.mark.anyio
+async def test_breaker_fails_fast_when_server_is_down() -> None:
+    client = UnreachableFinanceClient()
+
+    first = await client.calculate_budget(income=1000.0)
+    second = await client.calculate_budget(income=1000.0)
+    assert "unavailable" in first["error"]
+    assert "unavailable" in second["error"]
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        await client.call_tool(name="calculate_budget", arguments={"income": 1.0})
+    assert "circuit open" in (await client.calculate_budget(income=1.0))["error"]
+
+
+def test_breaker_half_open_trial() -> None:
+    breaker = CircuitBreaker(name="Supabase", failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.anyio
+async def test_adapter_connects_concurrently_and_reports_timings(
+    finance_transport,
+) -> None:
+    adapter = Adapter()
+    adapter.finance = InMemoryFinanceClient(transport_factory=finance_transport)
+    adapter.supabase = UnreachableFinanceClient()
+    adapter.location = UnreachableFinanceClient()
+
+    connected = await adapter.connect_all()
+    try:
+        assert connected["finance"] == "connected"
+        assert connected["supabase"].startswith("failed")
+
+        running = await adapter.check_running()
+        assert running["finance"]["connect_ms"] >= 0
+        assert "warm_up_error" not in running["finance"]
+        assert running["finance"]["pool"]["sessions"] == 1
+        assert "failed_after_ms" in running["location"]
+    finally:
+        await adapter.disconnect_all()
+
+
+@pytest.mark.anyio
+async def test_finance_client_inprocess_mode(monkeypatch) -> None:
+    monkeypatch.setenv("FINANCE_MCP_TRANSPORT", "inprocess")
+    client = FinanceClient()
+    await client.connect()
+    try:
+        assert sorted(await client.get_tools()) == [
+            "calculate_budget",
+            "loan_qualification",
+        ]
+        assert (await client.calculate_budget(income=120000.0))["budget"] == 3000.0
+    finally:
+        await client.disconnect()
+
+
+def test_supabase_client_falls_back_from_inprocess_mode(monkeypatch) -> None:
+    monkeypatch.setenv("MCP_TRANSPORT", "inprocess")
+    assert SupabaseClient().transport == "stdio"
+    assert FinanceClient().transport == "inprocess"
+
+
+def half_open_client(monkeypatch, error: BaseException) -> FinanceClient:
+    client = FinanceClient()
+    client.breaker = CircuitBreaker(
+        name="Finance", failure_threshold=1, reset_timeout=0.0
+    )
+    client.breaker.record_failure()
+
+    async def failing_call(name: str, arguments: dict) -> None:
+        raise error
+
+    monkeypatch.setattr(client, "_call_with_retries", failing_call)
+    return client
+
+
+@pytest.mark.anyio
+async def test_half_open_trial_closes_when_the_tool_itself_errors(monkeypatch) -> None:
+    client = half_open_client(monkeypatch=monkeypatch, error=ValueError("bad input"))
+
+    with pytest.raises(ValueError):
+        await client.call_tool(name="calculate_budget", arguments={"income": 1.0})
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.anyio
+async def test_cancelled_half_open_trial_is_released(monkeypatch) -> None:
+    client = half_open_client(monkeypatch=monkeypatch, error=asyncio.CancelledError())
+
+    with pytest.raises(asyncio.CancelledError):
+        await client.call_tool(name="calculate_budget", arguments={"income": 1.0})
+    assert client.breaker.state == CircuitBreaker.HALF_OPEN
+    assert client.breaker.failures == 1
+    client.breaker.before_call()
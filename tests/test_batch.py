@@ -0,0 +1,179 @@
+import asyncio
+import importlib
+import json
+import os
+from contextlib import aclosing
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+import pytest
+from utils.cache import MemoryBackend, ResultCache
+
+PROFILE: dict[str, Any] = {
+    "id": "a",
+    "income": 90000,
+    "credit_score": 720,
+    "zip_code": "10002",
+    "who_i_am": ["First Time Home Buyer"],
+}
+
+
+def batch_module(monkeypatch: pytest.MonkeyPatch) -> ModuleType:
+    # the agent modules resolve their model names at import time
+    monkeypatch.setenv("OPENAI_MODEL", os.environ.get("OPENAI_MODEL", "gpt-4o-mini"))
+    monkeypatch.setenv("GEMINI_MODEL", os.environ.get("GEMINI_MODEL", "gemini-test"))
+    batch: ModuleType = importlib.import_module(name="agents.planner_agent.batch")
+    graph: ModuleType = importlib.import_module(name="agents.planner_agent.graph")
+    monkeypatch.setattr(
+        graph,
+        "planner_cache",
+        ResultCache(namespace="planner", backend=MemoryBackend()),
+    )
+    return batch
+
+
+def test_batch_user_data_reads_csv_cells(monkeypatch: pytest.MonkeyPatch) -> None:
+    batch = batch_module(monkeypatch=monkeypatch)
+    user_data: dict[str, Any] = batch.batch_user_data(
+        row={
+            "income": "85000",
+            "credit_score": "700.0",
+            "zip_code": " 10009",
+            "who_i_am": "Veteran | First Time Home Buyer",
+            "current_debt": "",
+        }
+    )
+
+    assert user_data["income"] == 85000.0
+    assert user_data["credit_score"] == 700
+    assert user_data["zip_code"] == "10009"
+    assert user_data["who_i_am"] == ["Veteran", "First Time Home Buyer"]
+    assert user_data["current_debt"] == 0.0
+    assert user_data["residential_units"] == 1
+
+    with pytest.raises(ValueError, match="credit_score"):
+        batch.batch_user_data(row={"income": "85000", "zip_code": "10009"})
+
+
+def test_iter_profiles_from_csv_and_jsonl(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    batch = batch_module(monkeypatch=monkeypatch)
+    csv_path: Path = tmp_path / "profiles.csv"
+    csv_path.write_text("id,income,credit_score,zip_code\na,90000,720,10002\n")
+    jsonl_path: Path = tmp_path / "profiles.jsonl"
+    jsonl_path.write_text(json.dumps(PROFILE) + "\n\n")
+
+    assert list(batch.iter_profiles(path=csv_path)) == [
+        {"id": "a", "income": "90000", "credit_score": "720", "zip_code": "10002"}
+    ]
+    assert list(batch.iter_profiles(path=jsonl_path)) == [PROFILE]
+
+
+@pytest.mark.anyio
+async def test_run_batch_streams_records_and_shares_duplicate_profiles(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    batch = batch_module(monkeypatch=monkeypatch)
+    graph: ModuleType = importlib.import_module(name="agents.planner_agent.graph")
+    runs: list[str] = []
+
+    class FakePlanner:
+        async def ainvoke(self, input: dict[str, Any]) -> dict[str, Any]:
+            runs.append(input["zip_code"])
+            await asyncio.sleep(0.01)
+            return {
+                **input,
+                "max_loan": 400000,
+                "final_analysis": f"Analysis for {input['zip_code']}",
+                "usage_metadata": {"total_tokens": 100},
+            }
+
+    monkeypatch.setattr(graph.graph_registry, "get", lambda name: FakePlanner())
+    profiles: list[dict[str, Any]] = [
+        PROFILE,
+        {**PROFILE, "id": "b", "who_i_am": ["first time home buyer"]},
+        {**PROFILE, "id": "c", "zip_code": "10009"},
+        {"id": "d", "income": 90000},
+    ]
+    output: Path = tmp_path / "results.jsonl"
+    stats: dict[str, Any] = await batch.run_batch(
+        profiles=profiles, output=output, concurrency=2
+    )
+
+    records: dict[str, dict[str, Any]] = {
+        record["id"]: record
+        for record in map(json.loads, output.read_text().splitlines())
+    }
+    # "a" and "b" normalize to the same profile, so only one of them is analyzed
+    assert sorted(runs) == ["10002", "10009"]
+    assert stats["succeeded"] == 3 and stats["failed"] == 1
+    assert stats["usage_metadata"]["total_tokens"] == 200
+    assert records["b"]["data"]["final_analysis"] == "Analysis for 10002"
+    assert records["c"]["data"]["budgeting"]["max_loan"] == 400000
+    assert records["d"]["status"] == "error"
+
+
+@pytest.mark.anyio
+async def test_stream_batch_pulls_rows_only_as_workers_free_up(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    batch = batch_module(monkeypatch=monkeypatch)
+    pulled: list[int] = []
+    running: list[int] = []
+    peak: list[int] = [0]
+
+    async def analyze_profile(index: int, row: dict[str, Any]) -> dict[str, Any]:
+        running.append(index)
+        peak[0] = max(peak[0], len(running))
+        await asyncio.sleep(0.01)
+        running.remove(index)
+        return {"index": index, "status": "success"}
+
+    def profiles() -> Any:
+        for index in range(10):
+            pulled.append(index)
+            yield {"id": str(index)}
+
+    monkeypatch.setattr(batch, "analyze_profile", analyze_profile)
+    records: list[dict[str, Any]] = [
+        record
+        async for record in batch.stream_batch(profiles=profiles(), concurrency=2)
+    ]
+
+    assert sorted(record["index"] for record in records) == list(range(10))
+    assert peak[0] == 2
+
+    pulled.clear()
+    async with aclosing(
+        batch.stream_batch(profiles=profiles(), concurrency=2)
+    ) as stream:
+        async for _ in stream:
+            break
+    # stopping early leaves the rest of the input unread
+    assert len(pulled) < 10
+
+
+@pytest.mark.anyio
+async def test_stream_batch_raises_on_a_malformed_input_line(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    batch = batch_module(monkeypatch=monkeypatch)
+
+    async def analyze_profile(index: int, row: dict[str, Any]) -> dict[str, Any]:
+        return {"index": index, "status": "success"}
+
+    monkeypatch.setattr(batch, "analyze_profile", analyze_profile)
+    path: Path = tmp_path / "profiles.jsonl"
+    path.write_text(json.dumps(PROFILE) + "\n{not json\n" + json.dumps(PROFILE) + "\n")
+    records: list[dict[str, Any]] = []
+
+    async def consume() -> None:
+        async for record in batch.stream_batch(
+            profiles=batch.iter_profiles(path=path), concurrency=2
+        ):
+            records.append(record)
+
+    with pytest.raises(json.JSONDecodeError):
+        await asyncio.wait_for(consume(), timeout=5)
+    assert [record["index"] for record in records] == [0]
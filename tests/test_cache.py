@@ -0,0 +1,122 @@
+import asyncio
+import time
+from pathlib import Path
+from typing import Any
+import pytest
+from agents.planner_agent.cache import normalize_user_data
+from utils.cache import (
+    MemoryBackend,
+    ResultCache,
+    SQLiteBackend,
+    TTLCache,
+    cached_result,
+    make_cache_backend,
+    ttl_from_env,
+)
+
+
+def test_ttl_cache_evicts_least_recently_used() -> None:
+    cache = TTLCache(maxsize=2)
+    cache.set(key="a", value=1)
+    cache.set(key="b", value=2)
+    assert cache.get(key="a") == 1
+    cache.set(key="c", value=3)
+
+    assert cache.get(key="b") is None
+    assert cache.get(key="a") == 1
+    assert cache.get(key="c") == 3
+    assert cache.stats()["hits"] == 3
+
+
+def test_ttl_cache_expires_entries() -> None:
+    cache = TTLCache(maxsize=8, ttl=0.01)
+    cache.set(key=("10002", 1), value={"average_sale_price": 1.0})
+    cache.set(key=("10009", 1), value={"average_sale_price": 2.0}, ttl=60)
+    time.sleep(0.02)
+
+    assert cache.get(key=("10002", 1)) is None
+    assert cache.get(key=("10009", 1)) == {"average_sale_price": 2.0}
+
+
+def test_ttl_from_env_treats_zero_as_never_expire(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("PRICE_DATA_CACHE_TTL", "0")
+    assert ttl_from_env(name="PRICE_DATA_CACHE_TTL", default=3600) is None
+    monkeypatch.delenv("PRICE_DATA_CACHE_TTL")
+    assert ttl_from_env(name="PRICE_DATA_CACHE_TTL", default=3600) == 3600
+
+
+def test_result_cache_backends_round_trip_json(tmp_path: Path) -> None:
+    for url in ("memory", f"sqlite:///{tmp_path / 'results.db'}"):
+        backend = make_cache_backend(url=url)
+        cache = ResultCache(namespace="budgeting", backend=backend, ttl=60)
+        cache.set(key={"zip_code": "10002", "income": 1.0}, value={"max_loan": 2.5})
+
+        assert cache.get(key={"income": 1.0, "zip_code": "10002"}) == {"max_loan": 2.5}
+        assert cache.get(key={"income": 2.0, "zip_code": "10002"}) is None
+        assert (
+            ResultCache(namespace="geoscout", backend=backend).get(
+                key={"income": 1.0, "zip_code": "10002"}
+            )
+            is None
+        )
+        backend.close()
+
+
+def test_sqlite_backend_expires_and_persists(tmp_path: Path) -> None:
+    path: str = str(tmp_path / "results.db")
+    backend = SQLiteBackend(path=path)
+    backend.set(key="short", value="1", ttl=0.01)
+    backend.set(key="long", value="2", ttl=None)
+    backend.close()
+    time.sleep(0.02)
+
+    reopened = SQLiteBackend(path=path)
+    assert reopened.get(key="short") is None
+    assert reopened.get(key="long") == "2"
+    reopened.close()
+
+
+@pytest.mark.anyio
+async def test_cached_result_computes_once_per_normalized_profile() -> None:
+    cache = ResultCache(namespace="planner", backend=MemoryBackend())
+    calls: list[int] = []
+
+    async def compute() -> dict[str, Any]:
+        calls.append(1)
+        return {"final_analysis": "ok", "usage_metadata": {"total_tokens": 10}}
+
+    first: dict[str, Any] = {"who_i_am": ["Veteran", "Senior"], "zip_code": "10002 "}
+    second: dict[str, Any] = {"who_i_am": ["senior", "veteran"], "zip_code": "10002"}
+    fresh = await cached_result(
+        cache=cache, key=normalize_user_data(user_data=first), compute=compute
+    )
+    cached = await cached_result(
+        cache=cache, key=normalize_user_data(user_data=second), compute=compute
+    )
+
+    assert len(calls) == 1
+    assert fresh["usage_metadata"] == {"total_tokens": 10}
+    assert cached == {"final_analysis": "ok", "usage_metadata": {}}
+
+
+@pytest.mark.anyio
+async def test_cached_result_collapses_concurrent_misses() -> None:
+    cache = ResultCache(namespace="budgeting", backend=MemoryBackend())
+    calls: list[int] = []
+
+    async def compute() -> dict[str, Any]:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"max_loan": 400000, "usage_metadata": {"total_tokens": 10}}
+
+    results: list[dict[str, Any]] = await asyncio.gather(
+        *[
+            cached_result(cache=cache, key={"zip_code": "10002"}, compute=compute)
+            for _ in range(5)
+        ]
+    )
+
+    assert len(calls) == 1
+    assert [result["usage_metadata"] for result in results].count({}) == 4
@@ -0,0 +1,115 @@
+import importlib
+import os
+from types import ModuleType
+from typing import Any, AsyncIterator
+import pytest
+from utils.semantic_cache import SemanticCache
+
+
+class FakeStreamingChat:
+    def __init__(self, chunks: list[str]) -> None:
+        self.chunks: list[str] = chunks
+        self.calls: int = 0
+
+    async def astream(self, input: Any) -> AsyncIterator[Any]:
+        self.calls += 1
+        for chunk in self.chunks:
+            yield type("Chunk", (), {"content": chunk})()
+
+
+def chat_interface(monkeypatch: pytest.MonkeyPatch, chat: Any) -> ModuleType:
+    # the UI and agent modules resolve their model names at import time
+    monkeypatch.setenv("OPENAI_MODEL", os.environ.get("OPENAI_MODEL", "gpt-4o-mini"))
+    monkeypatch.setenv("GEMINI_MODEL", os.environ.get("GEMINI_MODEL", "gemini-test"))
+    interface: ModuleType = importlib.import_module(name="web_server.gr_interface")
+    monkeypatch.setattr(interface, "chat_cache", SemanticCache())
+    monkeypatch.setattr(interface, "get_openai_chat", lambda **kwargs: chat)
+
+    async def embed_question(message: str) -> list[float]:
+        return [1.0, 0.0] if "FHA" in message else [0.0, 1.0]
+
+    monkeypatch.setattr(interface, "embed_question", embed_question)
+    return interface
+
+
+@pytest.mark.anyio
+async def test_handle_chatbot_streams_reply_and_caches_it(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    chat = FakeStreamingChat(chunks=["FHA loans ", "are insured ", "by HUD."])
+    interface = chat_interface(monkeypatch=monkeypatch, chat=chat)
+
+    replies: list[str] = []
+    async for history, cleared, _ in interface.handle_chatbot(
+        message="What does FHA mean?", history=[], analysis_context="Max loan $300k"
+    ):
+        replies.append(history[-1]["content"])
+        assert cleared == ""
+    assert replies == [
+        "",
+        "FHA loans ",
+        "FHA loans are insured ",
+        "FHA loans are insured by HUD.",
+    ]
+
+    history: list[dict[str, str]] = []
+    async for history, _, _ in interface.handle_chatbot(
+        message="What's FHA?", history=[], analysis_context="Max loan $300k"
+    ):
+        pass
+    assert history[-1]["content"] == "FHA loans are insured by HUD."
+    assert chat.calls == 1
+
+    # a follow-up depends on the conversation, so it always reaches the model
+    async for follow_up, _, _ in interface.handle_chatbot(
+        message="What's FHA?", history=history, analysis_context="Max loan $300k"
+    ):
+        pass
+    assert follow_up[-1]["content"] == "FHA loans are insured by HUD."
+    assert chat.calls == 2
+
+
+@pytest.mark.anyio
+async def test_run_planner_with_ui_streams_synthesis_into_output(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    interface = chat_interface(monkeypatch=monkeypatch, chat=None)
+
+    async def stream_planner_agent(
+        user_data: dict[str, Any],
+    ) -> AsyncIterator[dict[str, Any]]:
+        yield {"event": "budgeting", "data": {"max_loan": 400000}}
+        yield {"event": "geoscout", "data": {"total_summary": "Lively"}}
+        yield {"event": "token", "data": "## Budget\n"}
+        yield {"event": "token", "data": "You can afford it."}
+        yield {
+            "event": "final",
+            "data": {"final_analysis": "## Budget\nYou can afford it."},
+        }
+
+    monkeypatch.setattr(interface, "stream_planner_agent", stream_planner_agent)
+    outputs: list[tuple[Any, Any]] = [
+        output
+        async for output in interface.run_planner_with_ui(
+            income=90000,
+            credit_score=720,
+            who_i_am=[],
+            state="New York",
+            what_looking_for=[],
+            zip_code="10002",
+            building_class="A1",
+            current_debt=0,
+            analysis_context=None,
+        )
+    ]
+
+    assert [markdown for markdown, _ in outputs] == [
+        "*Analyzing... budget ready*",
+        "*Analyzing... budget, neighborhood ready*",
+        "## Budget\n",
+        "## Budget\nYou can afford it.",
+        "## Budget\nYou can afford it.",
+    ]
+    # the chat only sees the analysis once it is complete
+    assert outputs[-2][1] is None
+    assert outputs[-1][1] == "## Budget\nYou can afford it."
@@ -0,0 +1,62 @@
+from typing import Any
+from agents.program_agent.decision_cache import (
+    EligibilityDecisionCache,
+    profile_bucket,
+)
+
+STATEWIDE: dict[str, Any] = {
+    "program_name": "SONYMA Low Interest Rate",
+    "eligibility": "fit:statewide:ny;credit_overlay_min:620 || sig:sonyma::ny::v3-fit",
+}
+LOCAL: dict[str, Any] = {
+    "program_name": "City of Buffalo Down Payment",
+    "eligibility": "fit:geo:city_buffalo;job_gate:none || sig:buffalo::ny::v3-fit",
+}
+PROFILE: dict[str, Any] = {
+    "who_i_am": ["Veteran", "First Time Home Buyer"],
+    "state": "New York",
+    "income": 72000.0,
+    "credit_score": 700,
+    "zip_code": "14201",
+    "building_class": "a1",
+    "current_debt": 5000.0,
+    "residential_units": 1,
+}
+
+
+def test_profile_bucket_is_coarse_and_canonical() -> None:
+    similar: dict[str, Any] = {
+        **PROFILE,
+        "who_i_am": ["First Time Home Buyer", "Veteran"],
+        "income": 79000.0,
+        "credit_score": 739,
+        "building_class": "A1",
+        "zip_code": "14202",
+    }
+    assert profile_bucket(state=PROFILE, local=False) == profile_bucket(
+        state=similar, local=False
+    )
+    assert profile_bucket(state=PROFILE, local=True) != profile_bucket(
+        state=similar, local=True
+    )
+    assert profile_bucket(state=PROFILE, local=False) != profile_bucket(
+        state={**PROFILE, "credit_score": 610}, local=False
+    )
+
+
+def test_decision_cache_round_trip_and_invalidation() -> None:
+    cache = EligibilityDecisionCache(model="gpt-test")
+    cache.set(program=LOCAL, state=PROFILE, eligible=True)
+    cache.set(program=STATEWIDE, state=PROFILE, eligible=False)
+
+    assert cache.get(program=LOCAL, state=PROFILE) is True
+    assert cache.get(program=STATEWIDE, state={**PROFILE, "zip_code": "10002"}) is False
+    # a local program's decision does not carry over to another zip
+    assert cache.get(program=LOCAL, state={**PROFILE, "zip_code": "14215"}) is None
+
+    edited: dict[str, Any] = {**STATEWIDE, "max_benefit": "$20,000"}
+    assert cache.get(program=edited, state=PROFILE) is None
+    assert (
+        EligibilityDecisionCache(model="other").get(program=STATEWIDE, state=PROFILE)
+        is None
+    )
@@ -0,0 +1,313 @@
+import asyncio
+import importlib
+import json
+import os
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+import pytest
+from agents.program_agent.decision_cache import EligibilityDecisionCache
+from agents.program_agent.eligibility import (
+    AMBIGUOUS,
+    ELIGIBLE,
+    INELIGIBLE,
+    evaluate_program,
+    parse_eligibility,
+)
+
+SONYMA: dict[str, Any] = {
+    "program_name": "SONYMA Low Interest Rate",
+    "jurisdiction": "Statewide NY",
+    "eligibility": "fit:statewide:ny;credit_overlay_min:620;job_gate:none;"
+    "veteran_only:false;voucher_hcv_required:false || sig:sonyma::ny::v3-fit",
+}
+VETERANS: dict[str, Any] = {
+    "program_name": "SONYMA Homes for Veterans",
+    "jurisdiction": "Statewide NY",
+    "eligibility": "fit:statewide:ny;job_gate:none;veteran_only:true;"
+    "voucher_hcv_required:false || sig:veterans::ny::v3-fit",
+}
+HOMEFIRST: dict[str, Any] = {
+    "program_name": "NYC HomeFirst Down Payment Assistance",
+    "jurisdiction": "NYC (5 boroughs)",
+    "eligibility": "fit:area:nyc_all_boroughs;income_cap_ami:120;"
+    "credit_overlay_min:620;job_gate:none;veteran_only:false || sig:hf::ny::v3-fit",
+}
+GOOD_NEIGHBOR: dict[str, Any] = {
+    "program_name": "Good Neighbor Next Door (HUD)",
+    "jurisdiction": "HUD revitalization areas (NY eligible)",
+    "eligibility": "fit:geo:hud_revitalization_area;job_gate:teacher|emt;"
+    "veteran_only:false || sig:gnnd::ny::v3-fit",
+}
+BUFFALO: dict[str, Any] = {
+    "program_name": "City of Buffalo Down Payment",
+    "jurisdiction": "City of Buffalo",
+    "eligibility": "fit:geo:city_buffalo;job_gate:none || sig:buffalo::ny::v3-fit",
+}
+
+PROGRAMS_FILE: Path = Path(__file__).parent.parent / "utils" / "ny_programs.json"
+
+PROFILE: dict[str, Any] = {
+    "who_i_am": ["First Time Home Buyer"],
+    "state": "New York",
+    "income": 60000.0,
+    "credit_score": 700,
+    "zip_code": "10002",
+    "building_class": "A1",
+    "current_debt": 0.0,
+    "residential_units": 1,
+}
+
+
+def test_parse_eligibility_reads_constraints() -> None:
+    rules = parse_eligibility(eligibility=HOMEFIRST["eligibility"])
+    assert (rules.area, rules.credit_min, rules.income_cap_ami) == ("nyc", 620, 120)
+    assert not rules.veteran_only and rules.job_gate is None
+
+    tiers = parse_eligibility(
+        eligibility="fit:dp_min:3.5%;credit_tiers:>=580_3.5%|500-579_10%"
+    )
+    assert tiers.credit_min == 500
+    assert parse_eligibility(eligibility=SONYMA["eligibility"]) is parse_eligibility(
+        eligibility=SONYMA["eligibility"]
+    )
+
+
+def test_evaluate_program_decides_by_rules() -> None:
+    assert evaluate_program(program=SONYMA, state=PROFILE).status == ELIGIBLE
+    assert evaluate_program(program=HOMEFIRST, state=PROFILE).status == ELIGIBLE
+
+    low_credit = evaluate_program(
+        program=SONYMA, state={**PROFILE, "credit_score": 600}
+    )
+    assert low_credit.status == INELIGIBLE
+    assert "below the 620 minimum" in low_credit.reason
+
+    assert evaluate_program(program=VETERANS, state=PROFILE).status == INELIGIBLE
+    assert evaluate_program(program=BUFFALO, state=PROFILE).status == INELIGIBLE
+    assert (
+        evaluate_program(
+            program=SONYMA, state={**PROFILE, "state": "New Jersey"}
+        ).status
+        == INELIGIBLE
+    )
+    assert (
+        evaluate_program(
+            program=HOMEFIRST, state={**PROFILE, "income": 400000.0}
+        ).status
+        == INELIGIBLE
+    )
+
+    assert evaluate_program(program=GOOD_NEIGHBOR, state=PROFILE).status == AMBIGUOUS
+    assert (
+        evaluate_program(program=BUFFALO, state={**PROFILE, "zip_code": "14201"}).status
+        == AMBIGUOUS
+    )
+
+
+def test_evaluate_program_defers_unchecked_corpus_constraints() -> None:
+    with open(file=PROGRAMS_FILE, mode="r", encoding="utf-8") as f:
+        programs: dict[str, dict[str, Any]] = {
+            program["Program Name"]: {
+                "program_name": program["Program Name"],
+                "jurisdiction": program["Jurisdiction"],
+                "eligibility": program["Eligibility"],
+            }
+            for program in json.load(f)
+        }
+    wealthy: dict[str, Any] = {**PROFILE, "income": 900000.0, "credit_score": 800}
+
+    for name in (
+        "SONYMA Low Interest Rate",
+        "SONYMA Achieving the Dream",
+        "SONYMA Down Payment Assistance Loan (DPAL)",
+    ):
+        decision = evaluate_program(program=programs[name], state=wealthy)
+        assert decision.status == AMBIGUOUS, name
+    dpal = evaluate_program(
+        program=programs["SONYMA Down Payment Assistance Loan (DPAL)"], state=wealthy
+    )
+    assert "requires:sonyma_first_mortgage" in dpal.reason
+    # a failed rule still rules the program out without the LLM
+    assert (
+        evaluate_program(
+            program=programs["SONYMA Low Interest Rate"],
+            state={**wealthy, "credit_score": 600},
+        ).status
+        == INELIGIBLE
+    )
+
+
+def program_nodes(monkeypatch: pytest.MonkeyPatch) -> ModuleType:
+    # the node module resolves its model name at import time
+    monkeypatch.setenv("OPENAI_MODEL", os.environ.get("OPENAI_MODEL", "gpt-4o-mini"))
+    nodes: ModuleType = importlib.import_module(name="agents.program_agent.nodes")
+    monkeypatch.setattr(nodes, "decision_cache", EligibilityDecisionCache())
+    return nodes
+
+
+class FakeChat:
+    def __init__(self, content: str) -> None:
+        self.content: str = content
+        self.prompts: list[str] = []
+
+    async def ainvoke(self, input: str) -> Any:
+        self.prompts.append(input)
+        return type(
+            "Response",
+            (),
+            {
+                "content": self.content,
+                "usage_metadata": {
+                    "input_tokens": 10,
+                    "output_tokens": 5,
+                    "total_tokens": 15,
+                },
+            },
+        )()
+
+
+@pytest.mark.anyio
+async def test_filter_programs_node_sends_only_ambiguous_programs(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    chat = FakeChat(
+        content=json.dumps(
+            [{"program_name": GOOD_NEIGHBOR["program_name"], "eligible": True}]
+        )
+    )
+    nodes = program_nodes(monkeypatch=monkeypatch)
+    monkeypatch.setattr(nodes, "get_openai_chat", lambda **kwargs: chat)
+
+    state: dict[str, Any] = {
+        **PROFILE,
+        "program_matcher_results": [SONYMA, VETERANS, GOOD_NEIGHBOR],
+    }
+    result = await nodes.filter_programs_node(state=state)
+
+    assert len(chat.prompts) == 1
+    assert GOOD_NEIGHBOR["program_name"] in chat.prompts[0]
+    assert SONYMA["program_name"] not in chat.prompts[0]
+    assert [p["program_name"] for p in json.loads(result["filtered_programs"])] == [
+        SONYMA["program_name"],
+        GOOD_NEIGHBOR["program_name"],
+    ]
+
+
+@pytest.mark.anyio
+async def test_filter_programs_node_skips_llm_when_rules_decide(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    chat = FakeChat(content="[]")
+    nodes = program_nodes(monkeypatch=monkeypatch)
+    monkeypatch.setattr(nodes, "get_openai_chat", lambda **kwargs: chat)
+
+    result = await nodes.filter_programs_node(
+        state={**PROFILE, "program_matcher_results": [SONYMA, VETERANS]}
+    )
+
+    assert chat.prompts == []
+    assert [p["program_name"] for p in json.loads(result["filtered_programs"])] == [
+        SONYMA["program_name"]
+    ]
+
+
+@pytest.mark.anyio
+async def test_filter_programs_node_reuses_cached_llm_decisions(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    chat = FakeChat(
+        content=json.dumps(
+            [{"program_name": GOOD_NEIGHBOR["program_name"], "eligible": False}]
+        )
+    )
+    nodes = program_nodes(monkeypatch=monkeypatch)
+    monkeypatch.setattr(nodes, "get_openai_chat", lambda **kwargs: chat)
+
+    for income in (60000.0, 61000.0):
+        result = await nodes.filter_programs_node(
+            state={
+                **PROFILE,
+                "income": income,
+                "program_matcher_results": [SONYMA, GOOD_NEIGHBOR],
+            }
+        )
+        assert [p["program_name"] for p in json.loads(result["filtered_programs"])] == [
+            SONYMA["program_name"]
+        ]
+
+    # same income band: the second profile's ambiguous program is a cache hit
+    assert len(chat.prompts) == 1
+    assert nodes.decision_cache.stats()["hits"] == 1
+
+
+@pytest.mark.anyio
+async def test_concurrent_profiles_share_overlapping_llm_decisions(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    teacher: dict[str, Any] = {**GOOD_NEIGHBOR, "program_name": "Teacher Next Door"}
+    officer: dict[str, Any] = {**GOOD_NEIGHBOR, "program_name": "Officer Next Door"}
+    chat = FakeChat(
+        content=json.dumps(
+            [
+                {"program_name": program["program_name"], "eligible": True}
+                for program in (GOOD_NEIGHBOR, teacher, officer)
+            ]
+        )
+    )
+    ainvoke = chat.ainvoke
+
+    async def slow_ainvoke(input: str) -> Any:
+        await asyncio.sleep(0.01)
+        return await ainvoke(input=input)
+
+    chat.ainvoke = slow_ainvoke
+    nodes = program_nodes(monkeypatch=monkeypatch)
+    monkeypatch.setattr(nodes, "get_openai_chat", lambda **kwargs: chat)
+
+    await asyncio.gather(
+        nodes.filter_programs_node(
+            state={**PROFILE, "program_matcher_results": [GOOD_NEIGHBOR, teacher]}
+        ),
+        nodes.filter_programs_node(
+            state={**PROFILE, "program_matcher_results": [GOOD_NEIGHBOR, officer]}
+        ),
+    )
+
+    # the pending sets differ, yet the shared program is decided only once
+    assert len(chat.prompts) == 2
+    assert sum(GOOD_NEIGHBOR["program_name"] in prompt for prompt in chat.prompts) == 1
+
+
+@pytest.mark.anyio
+async def test_filter_programs_node_caches_only_matched_verdicts(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    other: dict[str, Any] = {**GOOD_NEIGHBOR, "program_name": "Teacher Next Door"}
+    chat = FakeChat(
+        content=json.dumps(
+            [
+                {
+                    "program_name": " good neighbor next door (hud)",
+                    "eligible": True,
+                    "reason": "Income $60,000 and debt $0 qualify",
+                }
+            ]
+        )
+    )
+    nodes = program_nodes(monkeypatch=monkeypatch)
+    monkeypatch.setattr(nodes, "get_openai_chat", lambda **kwargs: chat)
+
+    await nodes.filter_programs_node(
+        state={**PROFILE, "program_matcher_results": [GOOD_NEIGHBOR, other]}
+    )
+    assert nodes.decision_cache.get(program=GOOD_NEIGHBOR, state=PROFILE) is True
+    # left out of the reply: not recorded as ineligible
+    assert nodes.decision_cache.get(program=other, state=PROFILE) is None
+
+    result = await nodes.filter_programs_node(
+        state={**PROFILE, "income": 61000.0, "program_matcher_results": [GOOD_NEIGHBOR]}
+    )
+    [entry] = json.loads(result["filtered_programs"])
+    assert len(chat.prompts) == 1
+    assert "$60,000" not in entry["reason"]
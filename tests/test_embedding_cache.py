@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+from pathlib import Path
+from utils.embedder import NYProgramsEmbedder
+from utils.embedding_cache import EmbeddingCache
+
+
+def test_embedding_cache_normalizes_query_text() -> None:
+    cache = EmbeddingCache(maxsize=8)
+    cache.set(model="text-embedding-3-small", text="Veteran  NY", embedding=[0.1])
+
+    assert cache.get(model="text-embedding-3-small", text=" veteran ny") == [0.1]
+    assert cache.get(model="text-embedding-3-large", text="veteran ny") is None
+
+
+def test_embedding_cache_persists_to_disk(tmp_path: Path) -> None:
+    path: str = str(tmp_path / "embeddings.sqlite")
+    cache = EmbeddingCache(maxsize=8, path=path)
+    cache.set(model="text-embedding-3-small", text="first-time buyer", embedding=[0.5])
+    cache.close()
+
+    reopened = EmbeddingCache(maxsize=8, path=path)
+    assert reopened.get(model="text-embedding-3-small", text="First-time buyer") == [
+        0.5
+    ]
+    assert reopened.stats()["disk_hits"] == 1
+    reopened.close()
+
+
+@pytest.mark.anyio
+async def test_async_embedding_is_served_from_cache(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    cache = EmbeddingCache(maxsize=8)
+    embedder = NYProgramsEmbedder(cache=cache)
+    cache.set(model=embedder.embedding_model, text="veteran ny", embedding=[0.25])
+
+    assert await embedder.agenerate_embedding(text="Veteran NY") == [0.25]
+
+
+@pytest.mark.anyio
+async def test_async_cache_reads_and_writes_disk_off_the_event_loop(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = EmbeddingCache(maxsize=8, path=str(tmp_path / "embeddings.sqlite"))
+    offloaded: list[str] = []
+    to_thread = asyncio.to_thread
+
+    async def recording_to_thread(func, *args):
+        offloaded.append(func.__name__)
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr(asyncio, "to_thread", recording_to_thread)
+    await cache.aset(model="text-embedding-3-small", text="veteran", embedding=[0.5])
+    cache.memory.clear()
+
+    assert await cache.aget(model="text-embedding-3-small", text="Veteran") == [0.5]
+    assert offloaded == ["_write_disk", "_read_disk"]
+    cache.close()
@@ -0,0 +1,100 @@
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from utils import embedding_pipeline
+from utils.embedder import NYProgramsEmbedder
+from utils.embedding_pipeline import EmbeddingPipeline
+
+
+class FakeEmbeddings:
+    def __init__(self) -> None:
+        self.requests: list[list[str]] = []
+
+    async def create(self, model: str, input: list[str]) -> Any:
+        self.requests.append(input)
+        return SimpleNamespace(
+            data=[
+                SimpleNamespace(index=i, embedding=[float(len(text)), 1.0])
+                for i, text in enumerate(input)
+            ]
+        )
+
+
+@pytest.mark.anyio
+async def test_pipeline_batches_and_only_reembeds_changed_programs(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    embeddings = FakeEmbeddings()
+    monkeypatch.setattr(
+        embedding_pipeline,
+        "get_async_openai",
+        lambda **_: SimpleNamespace(embeddings=embeddings),
+    )
+    programs: list[dict[str, str]] = [
+        {"Program Name": name, "Jurisdiction": "NY"} for name in ("A", "B", "C")
+    ]
+    checkpoint: Path = tmp_path / "checkpoint.jsonl"
+
+    def make_pipeline() -> EmbeddingPipeline:
+        return EmbeddingPipeline(
+            embedder=NYProgramsEmbedder(),
+            checkpoint_path=str(checkpoint),
+            batch_size=2,
+            requests_per_minute=0,
+        )
+
+    first = await make_pipeline().run(programs=programs)
+    assert [len(batch) for batch in embeddings.requests] == [2, 1]
+    assert [p["program_id"] for p in first] == [1, 2, 3]
+
+    programs[1]["Jurisdiction"] = "Statewide NY"
+    rerun = make_pipeline()
+    second = await rerun.run(programs=programs)
+
+    assert len(embeddings.requests) == 3
+    assert rerun.stats == {"reused": 2, "embedded": 1, "failed": 0}
+    assert second[0]["embedding_vector"] == first[0]["embedding_vector"]
+    assert len(checkpoint.read_text().splitlines()) == 3
+
+
+def test_main_keeps_output_when_a_batch_fails(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    out: Path = tmp_path / "programs.csv"
+    out.write_text("previous corpus")
+
+    class FailingEmbeddings:
+        async def create(self, model: str, input: list[str]) -> Any:
+            raise RuntimeError("rate limited")
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(
+        embedding_pipeline,
+        "get_async_openai",
+        lambda **_: SimpleNamespace(embeddings=FailingEmbeddings()),
+    )
+    monkeypatch.setattr(
+        NYProgramsEmbedder,
+        "load_programs",
+        lambda self, json_file_path: [{"Program Name": "A", "Jurisdiction": "NY"}],
+    )
+    monkeypatch.setattr(
+        "sys.argv",
+        [
+            "embedding_pipeline",
+            "--out",
+            str(out),
+            "--checkpoint",
+            str(tmp_path / "checkpoint.jsonl"),
+            "--rpm",
+            "0",
+        ],
+    )
+
+    with pytest.raises(SystemExit) as exit_info:
+        embedding_pipeline.main()
+
+    assert exit_info.value.code != 0
+    assert out.read_text() == "previous corpus"
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from pathlib import Path
+from utils.embedding_store import EmbeddingStore, write_embedding_store
+
+
+def test_float32_store_is_memory_mapped(tmp_path: Path) -> None:
+    vectors: np.ndarray = np.arange(12, dtype=np.float32).reshape(3, 4)
+    path: str = str(tmp_path / "programs.bin")
+    write_embedding_store(path=path, vectors=vectors, metadata={"programs": ["a"]})
+
+    store = EmbeddingStore(path=path)
+
+    assert isinstance(store.vectors(), np.memmap)
+    np.testing.assert_array_equal(store.vectors(), vectors)
+    assert store.metadata()["programs"] == ["a"]
+    assert store.metadata()["count"] == 3
+
+
+@pytest.mark.parametrize("dtype,tolerance", [("float16", 1e-3), ("int8", 1e-2)])
+def test_quantized_stores_round_trip(
+    tmp_path: Path, dtype: str, tolerance: float
+) -> None:
+    rng = np.random.default_rng(seed=11)
+    vectors: np.ndarray = rng.normal(size=(20, 64)).astype(np.float32)
+    path: str = str(tmp_path / f"{dtype}.bin")
+    write_embedding_store(path=path, vectors=vectors, dtype=dtype)
+
+    restored: np.ndarray = EmbeddingStore(path=path).vectors()
+
+    assert restored.dtype == np.float32
+    relative_error: float = np.abs(restored - vectors).max() / np.abs(vectors).max()
+    assert relative_error < tolerance
+    assert Path(path).stat().st_size < vectors.nbytes
@@ -0,0 +1,125 @@
+import asyncio
+import importlib
+import os
+from types import ModuleType
+from typing import Any
+import pytest
+from utils.cache import MemoryBackend, ResultCache
+
+SUMMARY: dict[str, Any] = {
+    "zip_code": "10002",
+    "transit_score": 90,
+    "transit_summary": "Excellent subway access",
+    "crime_summary": "Average",
+    "crime_score": 6,
+    "school_summary": "Good",
+    "school_score": 7,
+    "total_summary": "Lively, well connected neighborhood",
+}
+
+
+def geoscout_modules(monkeypatch: pytest.MonkeyPatch) -> tuple[ModuleType, ModuleType]:
+    # the node module resolves its model name at import time
+    monkeypatch.setenv("GEMINI_MODEL", os.environ.get("GEMINI_MODEL", "gemini-test"))
+    graph: ModuleType = importlib.import_module(name="agents.geoscout_agent.graph")
+    warm: ModuleType = importlib.import_module(name="agents.geoscout_agent.warm")
+    cache = ResultCache(namespace="geoscout", backend=MemoryBackend())
+    monkeypatch.setattr(graph, "geoscout_cache", cache)
+    monkeypatch.setattr(warm, "geoscout_cache", cache)
+    return graph, warm
+
+
+@pytest.mark.anyio
+async def test_run_geoscout_agent_serves_cached_zip(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    graph, _ = geoscout_modules(monkeypatch=monkeypatch)
+    graph.geoscout_cache.set(
+        key=graph.zip_cache_key(model=graph.gemini_model, zip_code="10002"),
+        value=SUMMARY,
+    )
+
+    def unexpected(name: str) -> Any:
+        raise AssertionError("a cached zip must not run the graph")
+
+    monkeypatch.setattr(graph.graph_registry, "get", unexpected)
+    result: dict[str, Any] = await graph.run_geoscout_agent(
+        user_data={"zip_code": " 10002"}
+    )
+
+    assert result["total_summary"] == SUMMARY["total_summary"]
+    assert result["usage_metadata"] == {}
+
+
+@pytest.mark.anyio
+async def test_warm_zip_codes_skips_cached_zips(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    graph, warm = geoscout_modules(monkeypatch=monkeypatch)
+    warm.geoscout_cache.set(
+        key=graph.zip_cache_key(model=graph.gemini_model, zip_code="10002"),
+        value=SUMMARY,
+    )
+    ran: list[str] = []
+
+    async def fake_run(user_data: dict[str, Any], refresh: bool = False) -> Any:
+        ran.append(user_data["zip_code"])
+        if user_data["zip_code"] == "99999":
+            raise RuntimeError("no data")
+        return {**SUMMARY, "zip_code": user_data["zip_code"]}
+
+    monkeypatch.setattr(warm, "run_geoscout_agent", fake_run)
+    stats: dict[str, int] = await warm.warm_zip_codes(
+        zip_codes=["10002", "10009", "99999"]
+    )
+
+    assert sorted(ran) == ["10009", "99999"]
+    assert stats == {"warmed": 1, "cached": 1, "failed": 1}
+
+
+@pytest.mark.anyio
+async def test_concurrent_profiles_in_one_zip_share_a_geoscout_run(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    graph, _ = geoscout_modules(monkeypatch=monkeypatch)
+    runs: list[str] = []
+
+    class FakeAgent:
+        async def ainvoke(self, input: dict[str, Any]) -> dict[str, Any]:
+            runs.append(input["zip_code"])
+            await asyncio.sleep(0.01)
+            return {**SUMMARY, "zip_code": input["zip_code"], "usage_metadata": {}}
+
+    monkeypatch.setattr(graph.graph_registry, "get", lambda name: FakeAgent())
+    results: list[dict[str, Any]] = await asyncio.gather(
+        *[
+            graph.run_geoscout_agent(user_data={"zip_code": zip_code})
+            for zip_code in ("10002", "10002", "10009", "10002")
+        ]
+    )
+
+    assert sorted(runs) == ["10002", "10009"]
+    assert [result.get("current_step") for result in results].count("cached") == 2
+
+
+@pytest.mark.anyio
+async def test_degraded_summaries_are_not_cached(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    graph, warm = geoscout_modules(monkeypatch=monkeypatch)
+
+    class DegradedAgent:
+        async def ainvoke(self, input: dict[str, Any]) -> dict[str, Any]:
+            return {**SUMMARY, "zip_code": input["zip_code"], "error_count": 1}
+
+    monkeypatch.setattr(graph.graph_registry, "get", lambda name: DegradedAgent())
+    monkeypatch.setattr(warm, "run_geoscout_agent", graph.run_geoscout_agent)
+    stats: dict[str, int] = await warm.warm_zip_codes(zip_codes=["10002"])
+
+    assert stats == {"warmed": 0, "cached": 0, "failed": 1}
+    assert (
+        graph.geoscout_cache.get(
+            key=graph.zip_cache_key(model=graph.gemini_model, zip_code="10002")
+        )
+        is None
+    )
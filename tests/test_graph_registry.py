@@ -0,0 +1,21 @@
+from concurrent.futures import ThreadPoolExecutor
+from agents.graph_registry import GraphRegistry
+
+
+def test_graph_is_compiled_once_and_shared() -> None:
+    registry = GraphRegistry()
+    compiled: list[object] = []
+
+    def compile_fn() -> object:
+        compiled.append(object())
+        return compiled[-1]
+
+    registry.register(name="budgeting", compile_fn=compile_fn)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        graphs = list(pool.map(lambda _: registry.get(name="budgeting"), range(16)))
+
+    assert len(compiled) == 1
+    assert all(graph is compiled[0] for graph in graphs)
+    assert set(registry.compile_all()) == {"budgeting"}
+    assert len(compiled) == 1
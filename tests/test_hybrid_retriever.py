@@ -0,0 +1,53 @@
+import json
+import numpy as np
+from pathlib import Path
+from utils.hybrid_retriever import HybridRetriever, query_tokens
+from utils.vector_index import ProgramVectorIndex
+
+PROGRAMS_FILE: Path = Path(__file__).parent.parent / "utils" / "ny_programs.json"
+
+
+def make_retriever(vector_weight: float) -> HybridRetriever:
+    with open(file=PROGRAMS_FILE, mode="r", encoding="utf-8") as f:
+        programs: list[dict[str, str]] = json.load(f)
+    rng = np.random.default_rng(seed=0)
+    index = ProgramVectorIndex()
+    index.load_rows(
+        rows=[
+            {
+                "program_name": program["Program Name"],
+                "jurisdiction": program["Jurisdiction"],
+                "assistance_type": program["Assistance Type"],
+                "eligibility": program["Eligibility"],
+                "embedding_vector": rng.normal(size=8).tolist(),
+            }
+            for program in programs
+        ],
+        source="test",
+    )
+    return HybridRetriever(index=index, vector_weight=vector_weight)
+
+
+def test_lexical_match_ignores_negative_flags() -> None:
+    retriever = make_retriever(vector_weight=0.0)
+
+    result = retriever.search(
+        embedding=[0.0] * 8, query_terms=["Veteran"], state="New York", limit=3
+    )
+
+    assert query_tokens(terms=["Recent Graduate"]) == ["recent", "grad", "graduate"]
+    assert result["programs"][0]["program_name"] == "SONYMA Homes for Veterans"
+    assert result["programs"][0]["lexical_score"] > 0
+    assert result["programs"][1]["lexical_score"] == 0
+
+
+def test_state_prefilter_keeps_only_nationwide_programs() -> None:
+    retriever = make_retriever(vector_weight=0.5)
+
+    result = retriever.search(
+        embedding=[1.0] * 8, query_terms=[], state="New Jersey", limit=10
+    )
+
+    assert [p["jurisdiction"] for p in result["programs"]] == [
+        "Nationwide (NY eligible)"
+    ]
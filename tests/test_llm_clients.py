@@ -0,0 +1,31 @@
+import asyncio
+import pytest
+from utils.llm_clients import close_llm_clients, get_gemini_chat, get_openai_chat
+
+
+@pytest.fixture
+def llm_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+
+
+@pytest.mark.anyio
+async def test_clients_are_shared_per_configuration(llm_env: None) -> None:
+    first = get_openai_chat(model="gpt-4o-mini", timeout=30, max_retries=2)
+    second = get_openai_chat(model="gpt-4o-mini", timeout=30, max_retries=2)
+    deterministic = get_openai_chat(model="gpt-4o-mini", temperature=0)
+
+    assert first is second
+    assert deterministic is not first
+    assert first.http_async_client is deterministic.http_async_client
+    assert get_gemini_chat(model="gemini-2.0-flash", stream_usage=True) is (
+        get_gemini_chat(model="gemini-2.0-flash", stream_usage=True)
+    )
+    await close_llm_clients()
+
+
+def test_clients_are_not_shared_across_event_loops(llm_env: None) -> None:
+    async def build():
+        return get_openai_chat(model="gpt-4o-mini")
+
+    assert asyncio.run(build()) is not asyncio.run(build())
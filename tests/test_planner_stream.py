@@ -0,0 +1,149 @@
+import importlib
+import os
+from types import ModuleType
+from typing import Any
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+from utils.cache import MemoryBackend, ResultCache
+
+PROFILE: dict[str, Any] = {
+    "income": 90000.0,
+    "credit_score": 720,
+    "zip_code": "10002",
+    "residential_units": 1,
+    "who_i_am": ["First Time Home Buyer"],
+    "state": "New York",
+    "what_looking_for": [],
+    "building_class": "A1",
+    "current_debt": 0.0,
+}
+USAGE: dict[str, int] = {"input_tokens": 10, "output_tokens": 5, "total_tokens": 15}
+ANALYSIS: str = "You can afford a one bedroom in 10002."
+
+
+class UsageFakeChat(GenericFakeChatModel):
+    """Streams like the real client: usage arrives on a closing empty chunk."""
+
+    def _stream(self, *args: Any, **kwargs: Any) -> Any:
+        yield from super()._stream(*args, **kwargs)
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(content="", usage_metadata=USAGE)
+        )
+
+
+def planner_modules(monkeypatch: pytest.MonkeyPatch) -> tuple[ModuleType, ModuleType]:
+    # the node modules resolve their model names at import time
+    monkeypatch.setenv("OPENAI_MODEL", os.environ.get("OPENAI_MODEL", "gpt-4o-mini"))
+    monkeypatch.setenv("GEMINI_MODEL", os.environ.get("GEMINI_MODEL", "gemini-test"))
+    graph: ModuleType = importlib.import_module(name="agents.planner_agent.graph")
+    nodes: ModuleType = importlib.import_module(name="agents.planner_agent.nodes")
+    for module, name in ((graph, "planner_cache"), (nodes, "budgeting_cache")):
+        monkeypatch.setattr(
+            module, name, ResultCache(namespace=name, backend=MemoryBackend())
+        )
+    monkeypatch.setattr(
+        nodes,
+        "program_cache",
+        ResultCache(namespace="programs", backend=MemoryBackend()),
+    )
+
+    async def budgeting(user_data: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "monthly_budget": 2500,
+            "max_loan": 400000,
+            "price_data": {"median": 650000},
+            "usage_metadata": USAGE,
+        }
+
+    async def programs(user_data: dict[str, Any]) -> dict[str, Any]:
+        return {"filtered_programs": "[]", "usage_metadata": USAGE}
+
+    async def geoscout(user_data: dict[str, Any]) -> dict[str, Any]:
+        return {"zip_code": "10002", "total_summary": "Lively", "usage_metadata": USAGE}
+
+    monkeypatch.setattr(nodes, "run_budgeting_agent", budgeting)
+    monkeypatch.setattr(nodes, "run_program_agent", programs)
+    monkeypatch.setattr(nodes, "run_geoscout_agent", geoscout)
+    monkeypatch.setattr(
+        nodes,
+        "get_openai_chat",
+        lambda **kwargs: UsageFakeChat(messages=iter([AIMessage(content=ANALYSIS)])),
+    )
+    return graph, nodes
+
+
+@pytest.mark.anyio
+async def test_stream_planner_agent_emits_agents_then_tokens(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    graph, _ = planner_modules(monkeypatch=monkeypatch)
+
+    events: list[dict[str, Any]] = [
+        event async for event in graph.stream_planner_agent(user_data=PROFILE)
+    ]
+    kinds: list[str] = [event["event"] for event in events]
+
+    assert sorted(kinds[:3]) == ["budgeting", "geoscout", "programs"]
+    assert set(kinds[3:-1]) == {"token"}
+    assert kinds[-1] == "final"
+    assert events[kinds.index("budgeting")]["data"]["max_loan"] == 400000
+    assert events[kinds.index("geoscout")]["data"]["total_summary"] == "Lively"
+
+    final: dict[str, Any] = events[-1]["data"]
+    assert "".join(event["data"] for event in events[3:-1]) == ANALYSIS
+    assert final["final_analysis"] == ANALYSIS
+    # three agents plus the synthesis, summed across the parallel branches
+    assert final["usage_metadata"]["total_tokens"] == 60
+
+
+@pytest.mark.anyio
+async def test_stream_planner_agent_replays_cached_analysis(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    graph, _ = planner_modules(monkeypatch=monkeypatch)
+    [event async for event in graph.stream_planner_agent(user_data=PROFILE)]
+
+    def unexpected(name: str) -> Any:
+        raise AssertionError("a cached analysis must not run the graph")
+
+    monkeypatch.setattr(graph.graph_registry, "get", unexpected)
+    events: list[dict[str, Any]] = [
+        event async for event in graph.stream_planner_agent(user_data=PROFILE)
+    ]
+
+    assert [event["event"] for event in events] == [
+        "budgeting",
+        "programs",
+        "geoscout",
+        "final",
+    ]
+    assert events[-1]["data"] == {"final_analysis": ANALYSIS, "usage_metadata": {}}
+
+
+@pytest.mark.anyio
+async def test_failed_agent_results_are_not_cached(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    graph, nodes = planner_modules(monkeypatch=monkeypatch)
+    calls: list[int] = []
+
+    async def budgeting(user_data: dict[str, Any]) -> dict[str, Any]:
+        calls.append(1)
+        return {"price_data": {"error": "Supabase MCP server unavailable"}}
+
+    monkeypatch.setattr(nodes, "run_budgeting_agent", budgeting)
+    for _ in range(2):
+        await nodes.run_budgeting_agent_node(state=PROFILE)
+
+    assert len(calls) == 2
+    assert not graph.is_cacheable_analysis(
+        result={
+            "final_analysis": ANALYSIS,
+            "budgeting_agent_results": {"price_data": {"error": "down"}},
+        }
+    )
+    assert graph.is_cacheable_analysis(
+        result={"final_analysis": ANALYSIS, "budgeting_agent_results": {}}
+    )
@@ -0,0 +1,30 @@
+from utils.semantic_cache import SemanticCache, analysis_fingerprint
+
+
+def test_semantic_cache_serves_near_duplicates_within_an_analysis() -> None:
+    cache = SemanticCache(threshold=0.9)
+    analysis: str = analysis_fingerprint(analysis_context="Max loan $300,000 ...")
+    other: str = analysis_fingerprint(analysis_context="Max loan $450,000 ...")
+    cache.set(fingerprint=analysis, embedding=[1.0, 0.0, 0.0], answer="FHA is ...")
+
+    hit = cache.get(fingerprint=analysis, embedding=[0.95, 0.1, 0.0])
+    assert hit is not None and hit[0] == "FHA is ..."
+    assert cache.get(fingerprint=analysis, embedding=[0.0, 1.0, 0.0]) is None
+    assert cache.get(fingerprint=other, embedding=[1.0, 0.0, 0.0]) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_semantic_cache_evicts_least_recently_used() -> None:
+    cache = SemanticCache(threshold=0.99, maxsize=2, max_per_analysis=2)
+    cache.set(fingerprint="a", embedding=[1.0, 0.0], answer="first")
+    cache.set(fingerprint="b", embedding=[0.0, 1.0], answer="second")
+    assert cache.get(fingerprint="a", embedding=[1.0, 0.0]) is not None
+    cache.set(fingerprint="c", embedding=[1.0, 1.0], answer="third")
+
+    assert cache.get(fingerprint="b", embedding=[0.0, 1.0]) is None
+    assert cache.get(fingerprint="a", embedding=[1.0, 0.0])[0] == "first"
+
+    cache.set(fingerprint="a", embedding=[0.0, 1.0], answer="fourth")
+    cache.set(fingerprint="a", embedding=[1.0, 1.0], answer="fifth")
+    assert len(cache) == 2
+    assert cache.stats()["evictions"] == 3
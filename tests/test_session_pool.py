@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+import anyio
+from mcp_kit.pool import PoolConfig, SessionPool, is_transport_error
+
+
+@pytest.mark.anyio
+async def test_pool_grows_under_concurrent_load(finance_transport) -> None:
+    pool = SessionPool(
+        name="Finance",
+        transport_factory=finance_transport,
+        config=PoolConfig(min_sessions=1, max_sessions=3, max_in_flight_per_session=1),
+    )
+    await pool.start()
+    try:
+        assert pool.size == 1
+
+        async def call(income: float) -> str:
+            async with pool.session() as session:
+                result = await session.call_tool(
+                    name="calculate_budget", arguments={"income": income}
+                )
+                await asyncio.sleep(0.05)
+                return result.content[0].text
+
+        results = await asyncio.gather(*[call(income=1000.0 * i) for i in range(6)])
+
+        assert [float(text) for text in results] == [300.0 * i for i in range(6)]
+        assert 1 < pool.size <= 3
+        assert pool.stats()["total_calls"] == 6
+    finally:
+        await pool.close()
+
+
+@pytest.mark.anyio
+async def test_pool_reaps_idle_sessions_down_to_minimum(finance_transport) -> None:
+    pool = SessionPool(
+        name="Finance",
+        transport_factory=finance_transport,
+        config=PoolConfig(
+            min_sessions=2,
+            max_sessions=4,
+            max_in_flight_per_session=1,
+            idle_timeout=0.0,
+        ),
+    )
+    await pool.start()
+    try:
+        async with pool.session(), pool.session(), pool.session():
+            assert pool.size == 3
+        await pool._reap_idle()
+        assert pool.size == 2
+        await pool._check_health()
+        assert pool.size == 2
+    finally:
+        await pool.close()
+    assert pool.size == 0
+
+    with pytest.raises(RuntimeError):
+        async with pool.session():
+            pass
+
+
+def test_timeouts_do_not_count_as_transport_errors() -> None:
+    assert is_transport_error(error=ConnectionResetError())
+    assert is_transport_error(error=anyio.ClosedResourceError())
+    assert not is_transport_error(error=TimeoutError())
+    assert not is_transport_error(error=ValueError())
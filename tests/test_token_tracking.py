@@ -0,0 +1,13 @@
+from utils.token_tracking import merge_token_usage
+
+
+def test_merge_token_usage_sums_parallel_updates_without_mutating() -> None:
+    left = {"input_tokens": 10, "output_tokens": 5, "total_tokens": 15}
+    right = {"input_tokens": 1, "output_tokens": 2, "total_tokens": 3}
+
+    merged = merge_token_usage(left=left, right=right)
+
+    assert merged == {"input_tokens": 11, "output_tokens": 7, "total_tokens": 18}
+    assert left["total_tokens"] == 15
+    assert merge_token_usage(left={}, right=right) == right
+    assert merge_token_usage(left=left, right=None) is left
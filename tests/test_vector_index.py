@@ -0,0 +1,166 @@
+import json
+import numpy as np
+import pytest
+from pathlib import Path
+from mcp.types import CallToolResult, TextContent
+from mcp_kit.clients.supabase_client import SupabaseClient
+from utils.ann import ExactBackend, IVFBackend
+from utils.embedder import NYProgramsEmbedder
+from utils.vector_index import ProgramVectorIndex
+
+
+def make_rows(vectors: np.ndarray) -> list[dict[str, str]]:
+    return [
+        {
+            "program_name": f"Program {i}",
+            "jurisdiction": "NY",
+            "embedding_vector": json.dumps(vector.tolist()),
+        }
+        for i, vector in enumerate(vectors)
+    ]
+
+
+def test_l2_search_matches_brute_force() -> None:
+    rng = np.random.default_rng(seed=7)
+    vectors: np.ndarray = rng.normal(size=(50, 16)).astype(np.float32)
+    query: np.ndarray = rng.normal(size=16).astype(np.float32)
+    index = ProgramVectorIndex(metric="l2")
+    index.load_rows(rows=make_rows(vectors=vectors), source="test")
+
+    result = index.search(embedding=query.tolist(), limit=5)
+
+    distances: np.ndarray = np.linalg.norm(vectors - query, axis=1)
+    expected: list[str] = [f"Program {i}" for i in np.argsort(distances)[:5]]
+    assert [p["program_name"] for p in result["programs"]] == expected
+    assert result["programs"][0]["rank"] == 1
+    assert result["programs"][0]["similarity_score"] == pytest.approx(
+        1 - distances.min(), abs=1e-4
+    )
+
+
+def test_cosine_search_and_dimension_mismatch() -> None:
+    index = ProgramVectorIndex(metric="cosine")
+    index.load_rows(
+        rows=make_rows(vectors=np.array([[1.0, 0.0], [0.0, 2.0], [1.0, 1.0]])),
+        source="test",
+    )
+
+    result = index.search(embedding=[0.0, 5.0], limit=2)
+
+    assert [p["program_name"] for p in result["programs"]] == ["Program 1", "Program 2"]
+    assert result["programs"][0]["similarity_score"] == pytest.approx(1.0)
+    assert "error" in index.search(embedding=[1.0, 0.0, 0.0])
+
+
+def test_index_loads_embedder_csv(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    path: str = str(tmp_path / "programs.csv")
+    NYProgramsEmbedder().save_to_csv(
+        processed_programs=[
+            {
+                "program_id": 1,
+                "program_name": "SONYMA Achieving the Dream",
+                "formatted_text": "Program: SONYMA Achieving the Dream",
+                "embedding_vector": [0.1, 0.2, 0.3],
+                "original_data": {"Jurisdiction": "NY", "Eligibility": "fit:low"},
+            }
+        ],
+        output_file=path,
+    )
+    index = ProgramVectorIndex()
+
+    assert index.load_csv(path=path) == 1
+    program = index.search(embedding=[0.1, 0.2, 0.3], limit=3)["programs"][0]
+    assert program["program_name"] == "SONYMA Achieving the Dream"
+    assert program["eligibility"] == "fit:low"
+
+
+def test_supabase_snapshot_parses_embedding_arrays() -> None:
+    rows: str = json.dumps(
+        [{"program_name": "A", "embedding_vector": "[0.1,0.2]"}]
+    ).replace('"', '\\"')
+    text: str = f"Result <untrusted-data-1>\n{rows}\n</untrusted-data-1> done"
+    result = CallToolResult(content=[TextContent(type="text", text=text)])
+
+    snapshot = SupabaseClient()._parse_programs_snapshot(result=result)
+
+    assert snapshot["programs"] == [
+        {"program_name": "A", "embedding_vector": "[0.1,0.2]"}
+    ]
+
+
+def test_ivf_backend_matches_exact_when_probing_every_list() -> None:
+    rng = np.random.default_rng(seed=3)
+    vectors: np.ndarray = rng.normal(size=(400, 8)).astype(np.float32)
+    exact = ExactBackend()
+    exact.build(matrix=vectors)
+    ivf = IVFBackend(n_lists=10, n_probe=10)
+    ivf.build(matrix=vectors)
+
+    for query in vectors[:20] + 0.05:
+        assert ivf.search(query=query, k=5)[0].tolist() == (
+            exact.search(query=query, k=5)[0].tolist()
+        )
+
+
+def test_ivf_backend_does_not_copy_a_memory_mapped_matrix(tmp_path: Path) -> None:
+    rng = np.random.default_rng(seed=4)
+    path: Path = tmp_path / "vectors.npy"
+    np.save(file=path, arr=rng.normal(size=(300, 8)).astype(np.float32))
+    mapped: np.ndarray = np.load(file=path, mmap_mode="r")
+    ivf = IVFBackend(n_lists=6, n_probe=6)
+    ivf.build(matrix=mapped)
+
+    assert ivf.matrix is mapped
+    exact = ExactBackend()
+    exact.build(matrix=mapped)
+    assert ivf.search(query=mapped[3] + 0.05, k=5)[0].tolist() == (
+        exact.search(query=mapped[3] + 0.05, k=5)[0].tolist()
+    )
+
+
+def test_saved_index_round_trips(tmp_path: Path) -> None:
+    rng = np.random.default_rng(seed=5)
+    vectors: np.ndarray = rng.normal(size=(200, 8)).astype(np.float32)
+    index = ProgramVectorIndex(
+        metric="cosine", backend_factory=lambda: IVFBackend(n_probe=4)
+    )
+    index.load_rows(rows=make_rows(vectors=vectors), source="test")
+    index.save(directory=str(tmp_path / "index"))
+
+    reloaded = ProgramVectorIndex()
+    assert reloaded.load_path(path=str(tmp_path / "index")) == 200
+    assert reloaded.stats()["backend"] == "ivf"
+    assert reloaded.metric == "cosine"
+    assert reloaded.search(embedding=vectors[7].tolist(), limit=3) == index.search(
+        embedding=vectors[7].tolist(), limit=3
+    )
+
+
+def test_index_loads_embedder_store(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    path: str = str(tmp_path / "programs.bin")
+    NYProgramsEmbedder().save_embedding_store(
+        processed_programs=[
+            {
+                "program_id": i,
+                "program_name": f"Program {i}",
+                "formatted_text": "",
+                "embedding_vector": vector,
+                "original_data": {"Jurisdiction": "NY"},
+            }
+            for i, vector in enumerate([[1.0, 0.0], [0.0, 1.0]])
+        ],
+        output_file=path,
+        dtype="int8",
+    )
+    index = ProgramVectorIndex()
+
+    assert index.load_path(path=path) == 2
+    program = index.search(embedding=[0.0, 0.9], limit=1)["programs"][0]
+    assert program["program_name"] == "Program 1"
+    assert program["jurisdiction"] == "NY"
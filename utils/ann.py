@@ -0,0 +1,349 @@
+import json
+import os
+import time
+from logging import Logger
+from pathlib import Path
+from typing import Any
+import numpy as np
+from utils.convenience import get_logger
+
+try:
+    import hnswlib
+except ImportError:  # optional dependency, only needed for the hnsw backend
+    hnswlib = None
+
+logger: Logger = get_logger(name=__name__)
+
+EXACT: str = "exact"
+IVF: str = "ivf"
+HNSW: str = "hnsw"
+
+
+def squared_distances(
+    matrix: np.ndarray, sq_norms: np.ndarray, query: np.ndarray
+) -> np.ndarray:
+    return np.maximum(sq_norms - 2.0 * (matrix @ query) + query @ query, 0.0)
+
+
+def top_k(distances: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k smallest distances, nearest first."""
+    k = min(k, len(distances))
+    if k <= 0:
+        return np.empty(shape=(0,), dtype=np.int64)
+    nearest: np.ndarray = np.argpartition(distances, k - 1)[:k]
+    return nearest[np.argsort(distances[nearest], kind="stable")]
+
+
+class ExactBackend:
+    """Brute-force scan; the reference every approximate backend is measured against."""
+
+    name: str = EXACT
+
+    def __init__(self) -> None:
+        self.matrix: np.ndarray = np.empty(shape=(0, 0), dtype=np.float32)
+        self.sq_norms: np.ndarray = np.empty(shape=(0,), dtype=np.float32)
+
+    def build(self, matrix: np.ndarray) -> None:
+        self.matrix = matrix
+        self.sq_norms = np.einsum("ij,ij->i", matrix, matrix)
+
+    def search(self, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return (row ids, squared L2 distances) of the k nearest rows."""
+        distances: np.ndarray = squared_distances(
+            matrix=self.matrix, sq_norms=self.sq_norms, query=query
+        )
+        ids: np.ndarray = top_k(distances=distances, k=k)
+        return ids, distances[ids]
+
+    def save(self, directory: Path) -> None:
+        pass
+
+    def load(self, directory: Path, matrix: np.ndarray) -> None:
+        self.build(matrix=matrix)
+
+    def params(self) -> dict[str, Any]:
+        return {}
+
+
+class IVFBackend:
+    """Inverted-file index: k-means partitions, scanning only the `n_probe` closest lists.
+
+    Only the partition of each row id is kept; probed rows are gathered from
+    the shared (typically memory-mapped) matrix per query, so the index adds
+    no copy of the embeddings to a worker's resident memory.
+
+    Args:
+        n_lists (int | None): Number of k-means partitions, defaults to ~sqrt(n)
+        n_probe (int): Partitions scanned per query; higher trades speed for recall
+        iterations (int): Lloyd iterations when training the centroids
+        train_per_list (int): Training sample size per partition
+        seed (int): Seed for sampling the training set and initial centroids
+    """
+
+    name: str = IVF
+
+    def __init__(
+        self,
+        n_lists: int | None = None,
+        n_probe: int = 8,
+        iterations: int = 15,
+        train_per_list: int = 64,
+        seed: int = 0,
+    ) -> None:
+        self.n_lists: int | None = n_lists
+        self.n_probe: int = n_probe
+        self.iterations: int = iterations
+        self.train_per_list: int = train_per_list
+        self.seed: int = seed
+        self.centroids: np.ndarray = np.empty(shape=(0, 0), dtype=np.float32)
+        self.centroid_norms: np.ndarray = np.empty(shape=(0,), dtype=np.float32)
+        self.list_ids: np.ndarray = np.empty(shape=(0,), dtype=np.int64)
+        self.list_offsets: np.ndarray = np.zeros(shape=(1,), dtype=np.int64)
+        self.matrix: np.ndarray = np.empty(shape=(0, 0), dtype=np.float32)
+        self.sq_norms: np.ndarray = np.empty(shape=(0,), dtype=np.float32)
+
+    def build(self, matrix: np.ndarray) -> None:
+        n: int = len(matrix)
+        if n == 0:
+            self._set_lists(
+                centroids=np.empty(shape=(0, matrix.shape[1]), dtype=np.float32),
+                assignments=np.empty(shape=(0,), dtype=np.int64),
+                matrix=matrix,
+            )
+            return
+        n_lists: int = min(self.n_lists or max(int(np.sqrt(n)), 1), n)
+        rng = np.random.default_rng(seed=self.seed)
+        train: np.ndarray = matrix[
+            np.sort(
+                rng.choice(n, size=min(n, n_lists * self.train_per_list), replace=False)
+            )
+        ]
+        centroids: np.ndarray = train[
+            rng.choice(len(train), size=n_lists, replace=False)
+        ].copy()
+        for _ in range(self.iterations):
+            assignments: np.ndarray = self._assign(matrix=train, centroids=centroids)
+            # one-hot matmul sums every partition in a single BLAS call
+            members: np.ndarray = np.zeros(
+                shape=(n_lists, len(train)), dtype=np.float32
+            )
+            members[assignments, np.arange(len(train))] = 1.0
+            counts: np.ndarray = members.sum(axis=1)
+            filled: np.ndarray = counts > 0
+            centroids[filled] = (members[filled] @ train) / counts[filled, None]
+        self._set_lists(
+            centroids=centroids,
+            assignments=self._assign(matrix=matrix, centroids=centroids),
+            matrix=matrix,
+        )
+
+    def _assign(
+        self, matrix: np.ndarray, centroids: np.ndarray, chunk: int = 8192
+    ) -> np.ndarray:
+        centroid_norms: np.ndarray = np.einsum("ij,ij->i", centroids, centroids)
+        assignments: list[np.ndarray] = [
+            np.argmin(
+                centroid_norms - 2.0 * (matrix[start : start + chunk] @ centroids.T),
+                axis=1,
+            )
+            for start in range(0, len(matrix), chunk)
+        ]
+        return np.concatenate(assignments) if assignments else np.empty(0, np.int64)
+
+    def _set_lists(
+        self, centroids: np.ndarray, assignments: np.ndarray, matrix: np.ndarray
+    ) -> None:
+        list_ids: np.ndarray = np.argsort(assignments, kind="stable").astype(np.int64)
+        counts: np.ndarray = np.bincount(assignments, minlength=len(centroids))
+        self._install(
+            centroids=centroids,
+            list_ids=list_ids,
+            list_offsets=np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+            matrix=matrix,
+        )
+
+    def _install(
+        self,
+        centroids: np.ndarray,
+        list_ids: np.ndarray,
+        list_offsets: np.ndarray,
+        matrix: np.ndarray,
+    ) -> None:
+        self.centroids = centroids
+        self.centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+        self.list_ids = list_ids
+        self.list_offsets = list_offsets
+        self.matrix = matrix
+        self.sq_norms = np.einsum("ij,ij->i", matrix, matrix)
+
+    def search(self, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        probes: np.ndarray = top_k(
+            distances=squared_distances(
+                matrix=self.centroids, sq_norms=self.centroid_norms, query=query
+            ),
+            k=self.n_probe,
+        )
+        spans: list[tuple[int, int]] = [
+            (int(self.list_offsets[p]), int(self.list_offsets[p + 1])) for p in probes
+        ]
+        if not spans:
+            return np.empty(0, np.int64), np.empty(0, np.float32)
+        # sorted ids make the gather read the memory-mapped store front to back
+        ids: np.ndarray = np.sort(
+            np.concatenate([self.list_ids[start:end] for start, end in spans])
+        )
+        distances: np.ndarray = squared_distances(
+            matrix=self.matrix[ids], sq_norms=self.sq_norms[ids], query=query
+        )
+        nearest: np.ndarray = top_k(distances=distances, k=k)
+        return ids[nearest], distances[nearest]
+
+    def save(self, directory: Path) -> None:
+        np.save(file=directory / "ivf_centroids.npy", arr=self.centroids)
+        np.save(file=directory / "ivf_list_ids.npy", arr=self.list_ids)
+        np.save(file=directory / "ivf_list_offsets.npy", arr=self.list_offsets)
+
+    def load(self, directory: Path, matrix: np.ndarray) -> None:
+        self._install(
+            centroids=np.load(file=directory / "ivf_centroids.npy"),
+            list_ids=np.load(file=directory / "ivf_list_ids.npy"),
+            list_offsets=np.load(file=directory / "ivf_list_offsets.npy"),
+            matrix=matrix,
+        )
+
+    def params(self) -> dict[str, Any]:
+        return {"n_lists": len(self.centroids), "n_probe": self.n_probe}
+
+
+class HNSWBackend:
+    """Graph index from the optional `hnswlib` package (pip install hnswlib).
+
+    Args:
+        m (int): Graph out-degree
+        ef_construction (int): Candidate list size while building
+        ef_search (int): Candidate list size per query; raised to k when smaller
+    """
+
+    name: str = HNSW
+
+    def __init__(
+        self, m: int = 16, ef_construction: int = 200, ef_search: int = 64
+    ) -> None:
+        if hnswlib is None:
+            raise ImportError("The hnsw index backend requires: pip install hnswlib")
+        self.m: int = m
+        self.ef_construction: int = ef_construction
+        self.ef_search: int = ef_search
+        self.index: Any = None
+
+    def build(self, matrix: np.ndarray) -> None:
+        self.index = hnswlib.Index(space="l2", dim=matrix.shape[1])
+        self.index.init_index(
+            max_elements=max(len(matrix), 1),
+            ef_construction=self.ef_construction,
+            M=self.m,
+        )
+        if len(matrix):
+            self.index.add_items(matrix, np.arange(len(matrix)))
+        self.index.set_ef(self.ef_search)
+
+    def search(self, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        k = min(k, self.index.get_current_count())
+        if k <= 0:
+            return np.empty(0, np.int64), np.empty(0, np.float32)
+        self.index.set_ef(max(self.ef_search, k))
+        labels, distances = self.index.knn_query(query, k=k)
+        return labels[0].astype(np.int64), distances[0]
+
+    def save(self, directory: Path) -> None:
+        self.index.save_index(str(directory / "hnsw.bin"))
+
+    def load(self, directory: Path, matrix: np.ndarray) -> None:
+        self.index = hnswlib.Index(space="l2", dim=matrix.shape[1])
+        self.index.load_index(
+            str(directory / "hnsw.bin"), max_elements=max(len(matrix), 1)
+        )
+        self.index.set_ef(self.ef_search)
+
+    def params(self) -> dict[str, Any]:
+        return {"m": self.m, "ef_search": self.ef_search}
+
+
+AnnBackend = ExactBackend | IVFBackend | HNSWBackend
+
+ANN_BACKENDS: dict[str, type[AnnBackend]] = {
+    EXACT: ExactBackend,
+    IVF: IVFBackend,
+    HNSW: HNSWBackend,
+}
+
+
+def make_backend(name: str, **params: Any) -> AnnBackend:
+    if name not in ANN_BACKENDS:
+        raise ValueError(
+            f"Unknown ANN backend '{name}', expected one of {tuple(ANN_BACKENDS)}"
+        )
+    return ANN_BACKENDS[name](**params)
+
+
+def backend_from_env() -> AnnBackend:
+    """Backend named by PROGRAMS_INDEX_BACKEND, tuned by its PROGRAMS_INDEX_* knobs."""
+    name: str = os.getenv("PROGRAMS_INDEX_BACKEND", EXACT).lower()
+    params: dict[str, Any] = {}
+    if name == IVF:
+        if os.getenv("PROGRAMS_INDEX_IVF_LISTS"):
+            params["n_lists"] = int(os.environ["PROGRAMS_INDEX_IVF_LISTS"])
+        params["n_probe"] = int(os.getenv("PROGRAMS_INDEX_IVF_PROBE", "8"))
+    elif name == HNSW:
+        params["ef_search"] = int(os.getenv("PROGRAMS_INDEX_HNSW_EF", "64"))
+    return make_backend(name=name, **params)
+
+
+def write_backend_meta(directory: Path, backend: AnnBackend) -> None:
+    with open(file=directory / "backend.json", mode="w", encoding="utf-8") as f:
+        json.dump({"name": backend.name, **backend.params()}, f)
+
+
+def read_backend_meta(directory: Path) -> dict[str, Any]:
+    with open(file=directory / "backend.json", mode="r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def benchmark_backends(
+    matrix: np.ndarray,
+    queries: np.ndarray,
+    backends: list[AnnBackend],
+    k: int = 10,
+) -> list[dict[str, Any]]:
+    """Build time, per-query latency and recall@k of each backend against exact search."""
+    exact = ExactBackend()
+    exact.build(matrix=matrix)
+    truth: list[set[int]] = [
+        set(exact.search(query=query, k=k)[0].tolist()) for query in queries
+    ]
+
+    report: list[dict[str, Any]] = []
+    for backend in backends:
+        started: float = time.perf_counter()
+        backend.build(matrix=matrix)
+        build_ms: float = (time.perf_counter() - started) * 1000
+
+        latencies: list[float] = []
+        recalls: list[float] = []
+        for query, expected in zip(queries, truth):
+            started = time.perf_counter()
+            ids, _ = backend.search(query=query, k=k)
+            latencies.append((time.perf_counter() - started) * 1000)
+            recalls.append(len(expected & set(ids.tolist())) / max(len(expected), 1))
+
+        report.append(
+            {
+                "backend": backend.name,
+                **backend.params(),
+                "build_ms": round(build_ms, 1),
+                "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+                "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+                f"recall@{k}": round(float(np.mean(recalls)), 4),
+            }
+        )
+    return report
@@ -0,0 +1,341 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import AsyncExitStack, asynccontextmanager
+from functools import lru_cache
+from logging import Logger
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, Iterable
+from utils.convenience import get_logger
+
+try:
+    import redis
+except ImportError:  # optional dependency, only needed for redis:// cache URLs
+    redis = None
+
+logger: Logger = get_logger(name=__name__)
+
+
+class TTLCache:
+    """Thread-safe in-memory LRU cache whose entries expire after `ttl` seconds.
+
+    Args:
+        maxsize (int): Maximum number of entries before the least recently used is evicted
+        ttl (float | None): Default time to live in seconds, None to never expire
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None) -> None:
+        self.maxsize: int = maxsize
+        self.ttl: float | None = ttl
+        self.hits: int = 0
+        self.misses: int = 0
+        self._data: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry: tuple[float | None, Any] | None = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at: float | None = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Any:
+        with self._lock:
+            entry: tuple[float | None, Any] | None = self._data.pop(key, None)
+        return entry[1] if entry else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        lookups: int = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class MemoryBackend:
+    """Process-local `TTLCache` holding serialized values."""
+
+    blocking: bool = False
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.memory = TTLCache(maxsize=maxsize)
+
+    def get(self, key: str) -> str | None:
+        return self.memory.get(key=key)
+
+    def set(self, key: str, value: str, ttl: float | None) -> None:
+        self.memory.set(key=key, value=value, ttl=ttl)
+
+    def close(self) -> None:
+        self.memory.clear()
+
+
+class SQLiteBackend:
+    """Cache table in a SQLite file, shared by the workers on one host."""
+
+    blocking: bool = True
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db: sqlite3.Connection = sqlite3.connect(
+            database=path, check_same_thread=False
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        self._db.commit()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row: tuple[str, float | None] | None = self._db.execute(
+                "SELECT value, expires_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        # wall clock, since entries outlive the process
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        return value
+
+    def set(self, key: str, value: str, ttl: float | None) -> None:
+        expires_at: float | None = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            self._db.execute(
+                "DELETE FROM results WHERE expires_at <= ?", (time.time(),)
+            )
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class RedisBackend:
+    """Any Redis-compatible server (pip install redis), shared across hosts."""
+
+    blocking: bool = True
+
+    def __init__(self, url: str) -> None:
+        if redis is None:
+            raise ImportError(
+                "redis:// cache URLs need the redis package: pip install redis"
+            )
+        self.client = redis.Redis.from_url(url=url)
+
+    def get(self, key: str) -> str | None:
+        value: bytes | None = self.client.get(name=key)
+        return value.decode(encoding="utf-8") if value is not None else None
+
+    def set(self, key: str, value: str, ttl: float | None) -> None:
+        self.client.set(
+            name=key, value=value, px=int(ttl * 1000) if ttl is not None else None
+        )
+
+    def close(self) -> None:
+        self.client.close()
+
+
+CacheBackend = MemoryBackend | SQLiteBackend | RedisBackend
+
+
+def make_cache_backend(url: str | None = None, maxsize: int = 1024) -> CacheBackend:
+    """Backend for `url`: memory (default), sqlite:///path/to/file.db or redis://host:port/db."""
+    if not url or url == "memory":
+        return MemoryBackend(maxsize=maxsize)
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(path=url.removeprefix("sqlite:///"))
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url=url)
+    raise ValueError(f"Unsupported cache URL '{url}'")
+
+
+def cache_key(namespace: str, data: Any) -> str:
+    """Stable key for JSON-able `data`: equal dicts hash equally whatever their key order."""
+    payload: str = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{namespace}:{hashlib.sha256(payload.encode(encoding='utf-8')).hexdigest()}"
+
+
+class ResultCache:
+    """JSON results in a `CacheBackend` under one namespace and TTL.
+
+    Backend errors are logged and treated as misses, so an unreachable cache
+    server slows requests down instead of failing them.
+
+    Args:
+        namespace (str): Key prefix separating this cache's entries
+        backend (CacheBackend): Where entries are stored
+        ttl (float | None): Seconds an entry is served for, None to never expire
+    """
+
+    def __init__(
+        self, namespace: str, backend: CacheBackend, ttl: float | None = None
+    ) -> None:
+        self.namespace: str = namespace
+        self.backend: CacheBackend = backend
+        self.ttl: float | None = ttl
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, key: Any) -> Any:
+        try:
+            value: str | None = self.backend.get(
+                key=cache_key(namespace=self.namespace, data=key)
+            )
+        except Exception as e:
+            logger.info(f"Cache {self.namespace} read failed: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    def set(self, key: Any, value: Any) -> None:
+        try:
+            self.backend.set(
+                key=cache_key(namespace=self.namespace, data=key),
+                value=json.dumps(value, default=str),
+                ttl=self.ttl,
+            )
+        except Exception as e:
+            logger.info(f"Cache {self.namespace} write failed: {e}")
+
+    async def aget(self, key: Any) -> Any:
+        if self.backend.blocking:
+            return await asyncio.to_thread(self.get, key)
+        return self.get(key=key)
+
+    async def aset(self, key: Any, value: Any) -> None:
+        if self.backend.blocking:
+            await asyncio.to_thread(self.set, key, value)
+        else:
+            self.set(key=key, value=value)
+
+    def stats(self) -> dict[str, Any]:
+        lookups: int = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+def ttl_from_env(name: str, default: float) -> float | None:
+    """Seconds from env var `name`; 0 or less means never expire."""
+    ttl: float = float(os.getenv(name, str(default)))
+    return ttl if ttl > 0 else None
+
+
+@lru_cache(maxsize=1)
+def shared_result_backend() -> CacheBackend:
+    """Process-wide backend from RESULT_CACHE_URL that every ResultCache shares."""
+    return make_cache_backend(
+        url=os.getenv("RESULT_CACHE_URL"),
+        maxsize=int(os.getenv("RESULT_CACHE_SIZE", "1024")),
+    )
+
+
+class KeyedLock:
+    """Per-key asyncio locks that collapse concurrent misses on one key.
+
+    The first caller computes under the key's lock while later callers wait,
+    then re-check the cache and find its result. A key's lock is dropped once
+    no caller holds or waits on it.
+    """
+
+    def __init__(self) -> None:
+        self._locks: dict[Hashable, tuple[asyncio.Lock, int]] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable) -> AsyncIterator[None]:
+        lock, waiters = self._locks.get(key) or (asyncio.Lock(), 0)
+        self._locks[key] = (lock, waiters + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, waiters = self._locks[key]
+            if waiters == 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, waiters - 1)
+
+    @asynccontextmanager
+    async def hold_all(self, keys: Iterable[Hashable]) -> AsyncIterator[None]:
+        """Hold the lock of every key in `keys`.
+
+        Locks are taken in one global order, so callers with overlapping key
+        sets queue up on the shared keys instead of deadlocking.
+        """
+        async with AsyncExitStack() as stack:
+            for key in sorted(set(keys), key=repr):
+                await stack.enter_async_context(self.hold(key=key))
+            yield
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+# shared by every cached_result call; keys are namespaced cache keys
+_in_flight = KeyedLock()
+
+
+async def cached_result(
+    cache: ResultCache,
+    key: Any,
+    compute: Callable[[], Awaitable[dict[str, Any]]],
+    cacheable: Callable[[dict[str, Any]], bool] = lambda result: True,
+) -> dict[str, Any]:
+    """`compute()` once per `key`; cached results report no token usage since none was spent.
+
+    Concurrent calls for a key wait for the first one instead of computing too.
+    """
+    async with _in_flight.hold(key=cache_key(namespace=cache.namespace, data=key)):
+        cached: dict[str, Any] | None = await cache.aget(key=key)
+        if cached is not None:
+            logger.info(f"Cache hit: {cache.namespace}")
+            return {**cached, "usage_metadata": {}}
+
+        result: dict[str, Any] = await compute()
+        if cacheable(result):
+            await cache.aset(key=key, value=result)
+        return result
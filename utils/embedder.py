@@ -5,12 +5,15 @@ import openai
 from typing import Any
 from openai.types.create_embedding_response import CreateEmbeddingResponse
 from utils.convenience import load_secrets
+from utils.embedding_cache import EmbeddingCache
+from utils.embedding_store import FLOAT32, write_embedding_store
+from utils.llm_clients import get_async_openai
 
 load_secrets()
 
 
 class NYProgramsEmbedder:
-    def __init__(self) -> None:
+    def __init__(self, cache: EmbeddingCache | None = None) -> None:
         self.api_key: str = os.getenv(key="OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError(
@@ -19,6 +22,9 @@ class NYProgramsEmbedder:
 
         openai.api_key = self.api_key
         self.embedding_model: str = "text-embedding-3-small"
+        self.cache: EmbeddingCache | None = cache
+        self.timeout: float = float(os.getenv("EMBEDDING_TIMEOUT", "10"))
+        self.max_retries: int = int(os.getenv("EMBEDDING_MAX_RETRIES", "2"))
 
     def format_program_for_embedding(self, program: dict[str, Any]) -> str:
         format_program_string: str = f"""Program: {program.get("Program Name", "")}
@@ -37,14 +43,42 @@ class NYProgramsEmbedder:
         return embedding_query_string
 
     def generate_embedding(self, text: str) -> list[float]:
+        if self.cache is not None:
+            cached: list[float] | None = self.cache.get(
+                model=self.embedding_model, text=text
+            )
+            if cached is not None:
+                return cached
         try:
             response: CreateEmbeddingResponse = openai.embeddings.create(
                 model=self.embedding_model, input=text
             )
-            return response.data[0].embedding
+            embedding: list[float] = response.data[0].embedding
         except Exception as e:
             print(f"Error generating embedding: {e}")
             raise
+        if self.cache is not None:
+            self.cache.set(model=self.embedding_model, text=text, embedding=embedding)
+        return embedding
+
+    async def agenerate_embedding(self, text: str) -> list[float]:
+        """Non-blocking `generate_embedding` on the shared async OpenAI client."""
+        if self.cache is not None:
+            cached: list[float] | None = await self.cache.aget(
+                model=self.embedding_model, text=text
+            )
+            if cached is not None:
+                return cached
+        client = get_async_openai(timeout=self.timeout, max_retries=self.max_retries)
+        response: CreateEmbeddingResponse = await client.embeddings.create(
+            model=self.embedding_model, input=text
+        )
+        embedding: list[float] = response.data[0].embedding
+        if self.cache is not None:
+            await self.cache.aset(
+                model=self.embedding_model, text=text, embedding=embedding
+            )
+        return embedding
 
     def load_programs(self, json_file_path: str) -> list[dict[str, Any]]:
         if not os.path.exists(json_file_path):
@@ -90,7 +124,7 @@ class NYProgramsEmbedder:
             writer = csv.writer(f)
 
             writer.writerow(
-                row=[
+                [
                     "program_id",
                     "program_name",
                     "formatted_text",
@@ -106,7 +140,7 @@ class NYProgramsEmbedder:
             for program in processed_programs:
                 original: dict[str, Any] = program["original_data"]
                 writer.writerow(
-                    row=[
+                    [
                         program["program_id"],
                         program["program_name"],
                         program["formatted_text"],
@@ -127,11 +161,43 @@ class NYProgramsEmbedder:
         with open(file=output_file, mode="w", newline="", encoding="utf-8") as f:
             writer = csv.writer(f)
 
-            writer.writerow(row=["program_id", "embedding_vector"])
+            writer.writerow(["program_id", "embedding_vector"])
 
             for program in processed_programs:
                 writer.writerow(
-                    row=[program["program_id"], json.dumps(program["embedding_vector"])]
+                    [program["program_id"], json.dumps(program["embedding_vector"])]
                 )
 
         print(f"Saved embeddings to {output_file}")
+
+    def save_embedding_store(
+        self,
+        processed_programs: list[dict[str, Any]],
+        output_file: str,
+        dtype: str = FLOAT32,
+    ) -> None:
+        """Binary, memory-mappable alternative to `save_to_csv` (float32, float16 or int8)."""
+        programs: list[dict[str, Any]] = []
+        for program in processed_programs:
+            original: dict[str, Any] = program["original_data"]
+            programs.append(
+                {
+                    "program_id": program["program_id"],
+                    "program_name": program["program_name"],
+                    "formatted_text": program["formatted_text"],
+                    "jurisdiction": original.get("Jurisdiction", ""),
+                    "assistance_type": original.get("Assistance Type", ""),
+                    "max_benefit": original.get("Max Benefit", ""),
+                    "eligibility": original.get("Eligibility", ""),
+                    "source": original.get("Source", ""),
+                }
+            )
+
+        write_embedding_store(
+            path=output_file,
+            vectors=[program["embedding_vector"] for program in processed_programs],
+            dtype=dtype,
+            metadata={"model": self.embedding_model, "programs": programs},
+        )
+
+        print(f"Saved {len(programs)} {dtype} embeddings to {output_file}")
@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from logging import Logger
+from pathlib import Path
+from typing import Any
+from utils.cache import TTLCache
+from utils.convenience import get_logger
+
+logger: Logger = get_logger(name=__name__)
+
+
+def normalize_embedding_text(text: str) -> str:
+    """Case- and whitespace-insensitive form of a query, so equal profiles share an entry."""
+    return re.sub(pattern=r"\s+", repl=" ", string=text).strip().lower()
+
+
+def embedding_cache_key(model: str, text: str) -> str:
+    payload: str = f"{model}\x00{normalize_embedding_text(text=text)}"
+    return hashlib.sha256(payload.encode(encoding="utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """LRU cache of embeddings keyed on model and normalized text.
+
+    Entries live in memory and, when `path` is given, in a SQLite file as well,
+    so the cache survives restarts and is shared by workers on the same host.
+
+    Args:
+        maxsize (int): Maximum number of embeddings kept in memory
+        path (str | None): SQLite file backing the cache, None for memory only
+    """
+
+    def __init__(self, maxsize: int = 1024, path: str | None = None) -> None:
+        self.memory = TTLCache(maxsize=maxsize)
+        self.path: str | None = path
+        self.disk_hits: int = 0
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(database=path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, model TEXT NOT NULL, embedding TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls) -> "EmbeddingCache":
+        return cls(
+            maxsize=int(os.getenv("EMBEDDING_CACHE_SIZE", "1024")),
+            path=os.getenv("EMBEDDING_CACHE_PATH") or None,
+        )
+
+    def get(self, model: str, text: str) -> list[float] | None:
+        key: str = embedding_cache_key(model=model, text=text)
+        embedding: list[float] | None = self.memory.get(key=key)
+        if embedding is not None or self._db is None:
+            return embedding
+        return self._read_disk(key=key)
+
+    async def aget(self, model: str, text: str) -> list[float] | None:
+        """`get` that reads SQLite on a worker thread, off the event loop."""
+        key: str = embedding_cache_key(model=model, text=text)
+        embedding: list[float] | None = self.memory.get(key=key)
+        if embedding is not None or self._db is None:
+            return embedding
+        return await asyncio.to_thread(self._read_disk, key)
+
+    def _read_disk(self, key: str) -> list[float] | None:
+        with self._lock:
+            row: tuple[str] | None = self._db.execute(
+                "SELECT embedding FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        embedding: list[float] = json.loads(row[0])
+        self.disk_hits += 1
+        self.memory.set(key=key, value=embedding)
+        return embedding
+
+    def set(self, model: str, text: str, embedding: list[float]) -> None:
+        key: str = embedding_cache_key(model=model, text=text)
+        self.memory.set(key=key, value=embedding)
+        if self._db is not None:
+            self._write_disk(key=key, model=model, embedding=embedding)
+
+    async def aset(self, model: str, text: str, embedding: list[float]) -> None:
+        """`set` that writes SQLite on a worker thread, off the event loop."""
+        key: str = embedding_cache_key(model=model, text=text)
+        self.memory.set(key=key, value=embedding)
+        if self._db is not None:
+            await asyncio.to_thread(self._write_disk, key, model, embedding)
+
+    def _write_disk(self, key: str, model: str, embedding: list[float]) -> None:
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, model, embedding) VALUES (?, ?, ?)",
+                    (key, model, json.dumps(embedding)),
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.info(f"Could not persist embedding to {self.path}: {e}")
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+            self._db = None
+
+    def stats(self) -> dict[str, Any]:
+        return {**self.memory.stats(), "disk_hits": self.disk_hits}
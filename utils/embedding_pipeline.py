@@ -0,0 +1,248 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from logging import Logger
+from pathlib import Path
+from typing import Any, TextIO
+from openai.types.create_embedding_response import CreateEmbeddingResponse
+from utils.convenience import get_logger
+from utils.embedder import NYProgramsEmbedder
+from utils.embedding_store import DTYPES, FLOAT32
+from utils.llm_clients import get_async_openai
+
+logger: Logger = get_logger(name=__name__)
+
+
+def content_hash(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\x00{text}".encode()).hexdigest()
+
+
+class AsyncRateLimiter:
+    """Spaces request starts so no more than `requests_per_minute` begin per minute."""
+
+    def __init__(self, requests_per_minute: float) -> None:
+        self.interval: float = 60.0 / requests_per_minute if requests_per_minute else 0
+        self._next_start: float = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now: float = time.monotonic()
+            wait: float = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class EmbeddingPipeline:
+    """Embed the program corpus in batched, concurrent, resumable passes.
+
+    Every embedded text is appended to a JSONL checkpoint keyed by a hash of
+    the model and the `format_program_for_embedding` text. A rerun, after a
+    crash or after editing the corpus, only sends the programs whose text is
+    not in the checkpoint yet.
+
+    Args:
+        embedder (NYProgramsEmbedder): Formats programs and names the model
+        checkpoint_path (str): JSONL file of {"hash", "embedding"} lines
+        batch_size (int): Texts per embeddings request
+        concurrency (int): Batches in flight at once
+        requests_per_minute (float): Request start rate limit, 0 for none
+    """
+
+    def __init__(
+        self,
+        embedder: NYProgramsEmbedder,
+        checkpoint_path: str,
+        batch_size: int = 100,
+        concurrency: int = 4,
+        requests_per_minute: float = 500,
+    ) -> None:
+        self.embedder: NYProgramsEmbedder = embedder
+        self.checkpoint_path: Path = Path(checkpoint_path)
+        self.batch_size: int = max(batch_size, 1)
+        self.concurrency: int = max(concurrency, 1)
+        self.limiter = AsyncRateLimiter(requests_per_minute=requests_per_minute)
+        self.stats: dict[str, int] = {"reused": 0, "embedded": 0, "failed": 0}
+        # batches append from worker threads; one write at a time keeps lines whole
+        self._checkpoint_lock = asyncio.Lock()
+
+    def _load_checkpoint(self) -> dict[str, list[float]]:
+        done: dict[str, list[float]] = {}
+        if not self.checkpoint_path.exists():
+            return done
+        with open(file=self.checkpoint_path, mode="r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry: dict[str, Any] = json.loads(line)
+                    done[entry["hash"]] = entry["embedding"]
+                except (json.JSONDecodeError, KeyError):
+                    # a crash can leave a half-written last line behind
+                    continue
+        return done
+
+    def _compact_checkpoint(self, keep: dict[str, list[float]]) -> None:
+        """Rewrite the checkpoint with only the current corpus' entries."""
+        staging: Path = self.checkpoint_path.with_name(
+            f"{self.checkpoint_path.name}.tmp"
+        )
+        with open(file=staging, mode="w", encoding="utf-8") as f:
+            f.writelines(
+                json.dumps({"hash": key, "embedding": embedding}) + "\n"
+                for key, embedding in keep.items()
+            )
+        os.replace(src=staging, dst=self.checkpoint_path)
+
+    @staticmethod
+    def _append_checkpoint(checkpoint: TextIO, entries: dict[str, list[float]]) -> None:
+        checkpoint.writelines(
+            json.dumps({"hash": key, "embedding": embedding}) + "\n"
+            for key, embedding in entries.items()
+        )
+        checkpoint.flush()
+
+    async def _embed_batch(
+        self,
+        batch: list[tuple[str, str]],
+        semaphore: asyncio.Semaphore,
+        done: dict[str, list[float]],
+        checkpoint: TextIO,
+    ) -> None:
+        async with semaphore:
+            await self.limiter.acquire()
+            client = get_async_openai(
+                timeout=self.embedder.timeout, max_retries=self.embedder.max_retries
+            )
+            try:
+                response: CreateEmbeddingResponse = await client.embeddings.create(
+                    model=self.embedder.embedding_model,
+                    input=[text for _, text in batch],
+                )
+            except Exception as e:
+                logger.info(f"Embedding batch of {len(batch)} failed: {e}")
+                self.stats["failed"] += len(batch)
+                return
+
+        entries: dict[str, list[float]] = {
+            batch[item.index][0]: item.embedding for item in response.data
+        }
+        done.update(entries)
+        async with self._checkpoint_lock:
+            await asyncio.to_thread(self._append_checkpoint, checkpoint, entries)
+        self.stats["embedded"] += len(batch)
+        logger.info(f"Embedded {self.stats['embedded']} programs")
+
+    async def run(self, programs: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Embed `programs`, returning rows shaped like `process_programs` output.
+
+        Programs whose batch failed are left out and counted in `stats["failed"]`.
+        """
+        model: str = self.embedder.embedding_model
+        texts: list[str] = [
+            self.embedder.format_program_for_embedding(program=program)
+            for program in programs
+        ]
+        keys: list[str] = [content_hash(model=model, text=text) for text in texts]
+        done: dict[str, list[float]] = await asyncio.to_thread(self._load_checkpoint)
+
+        pending: dict[str, str] = {
+            key: text for key, text in zip(keys, texts) if key not in done
+        }
+        self.stats["reused"] = len(set(keys)) - len(pending)
+        items: list[tuple[str, str]] = list(pending.items())
+        batches: list[list[tuple[str, str]]] = [
+            items[start : start + self.batch_size]
+            for start in range(0, len(pending), self.batch_size)
+        ]
+        logger.info(
+            f"{len(programs)} programs: {self.stats['reused']} unchanged, "
+            f"{len(pending)} to embed in {len(batches)} batches"
+        )
+
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        checkpoint: TextIO = await asyncio.to_thread(
+            open, self.checkpoint_path, "a", encoding="utf-8"
+        )
+        try:
+            await asyncio.gather(
+                *[
+                    self._embed_batch(
+                        batch=batch,
+                        semaphore=semaphore,
+                        done=done,
+                        checkpoint=checkpoint,
+                    )
+                    for batch in batches
+                ]
+            )
+        finally:
+            await asyncio.to_thread(checkpoint.close)
+        await asyncio.to_thread(
+            self._compact_checkpoint,
+            keep={key: done[key] for key in keys if key in done},
+        )
+
+        return [
+            {
+                "program_id": i + 1,
+                "program_name": program.get("Program Name", ""),
+                "formatted_text": text,
+                "embedding_vector": done[key],
+                "original_data": program,
+            }
+            for i, (program, text, key) in enumerate(zip(programs, texts, keys))
+            if key in done
+        ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Embed the program corpus")
+    parser.add_argument(
+        "--programs", default=str(Path(__file__).parent / "ny_programs.json")
+    )
+    parser.add_argument("--out", required=True, help=".bin store or .csv to write")
+    parser.add_argument("--dtype", default=FLOAT32, choices=tuple(DTYPES))
+    parser.add_argument("--checkpoint", default=".cache/program_embeddings.jsonl")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rpm", type=float, default=500)
+    args = parser.parse_args()
+
+    embedder = NYProgramsEmbedder()
+    pipeline = EmbeddingPipeline(
+        embedder=embedder,
+        checkpoint_path=args.checkpoint,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+    )
+    started: float = time.perf_counter()
+    processed: list[dict[str, Any]] = asyncio.run(
+        main=pipeline.run(programs=embedder.load_programs(json_file_path=args.programs))
+    )
+    stats: str = json.dumps(
+        {**pipeline.stats, "seconds": round(time.perf_counter() - started, 2)}
+    )
+    if pipeline.stats["failed"]:
+        # an index built from a partial corpus would silently lose programs;
+        # the checkpoint keeps every finished batch, so a rerun only retries these
+        print(stats)
+        sys.exit(
+            f"{pipeline.stats['failed']} programs failed to embed, {args.out} left unchanged"
+        )
+    if args.out.endswith(".csv"):
+        embedder.save_to_csv(processed_programs=processed, output_file=args.out)
+    else:
+        embedder.save_embedding_store(
+            processed_programs=processed, output_file=args.out, dtype=args.dtype
+        )
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
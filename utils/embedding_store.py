@@ -0,0 +1,137 @@
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any
+import numpy as np
+
+MAGIC: bytes = b"MAREAEMB"
+VERSION: int = 1
+HEADER: struct.Struct = struct.Struct("<8sHBxQII")
+ALIGNMENT: int = 64
+
+FLOAT32: str = "float32"
+FLOAT16: str = "float16"
+INT8: str = "int8"
+DTYPES: dict[str, int] = {FLOAT32: 0, FLOAT16: 1, INT8: 2}
+DTYPE_NAMES: dict[int, str] = {code: name for name, code in DTYPES.items()}
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def quantize_int8(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 codes and the float32 scale that restores each row."""
+    scales: np.ndarray = np.abs(vectors).max(axis=1) / 127.0
+    scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+    codes: np.ndarray = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(
+        np.int8
+    )
+    return codes, scales
+
+
+def write_embedding_store(
+    path: str,
+    vectors: np.ndarray,
+    dtype: str = FLOAT32,
+    metadata: dict[str, Any] | None = None,
+) -> None:
+    """Write an (n, dim) matrix as a binary embedding store.
+
+    Layout: a 64-byte header (magic, version, dtype, n, dim, data offset),
+    the row-major vectors at the data offset and, for int8, one float32 scale
+    per row at the next 64-byte boundary. `metadata` (e.g. the program rows
+    the vectors belong to) goes to a `<path>.json` sidecar.
+    """
+    if dtype not in DTYPES:
+        raise ValueError(
+            f"Unknown embedding store dtype '{dtype}', expected one of {tuple(DTYPES)}"
+        )
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim != 2:
+        vectors = (
+            vectors.reshape(len(vectors), -1) if vectors.size else vectors.reshape(0, 0)
+        )
+    n, dim = vectors.shape
+    scales: np.ndarray | None = None
+    if dtype == INT8:
+        codes, scales = quantize_int8(vectors=vectors)
+    else:
+        codes = vectors.astype(dtype)
+
+    target: Path = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # other processes may have the old file mapped, so never rewrite it in place
+    staging: Path = target.with_name(f"{target.name}.tmp")
+    data_offset: int = ALIGNMENT
+    with open(file=staging, mode="wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, DTYPES[dtype], n, dim, data_offset))
+        f.write(b"\0" * (data_offset - HEADER.size))
+        f.write(np.ascontiguousarray(codes).tobytes())
+        if scales is not None:
+            f.write(b"\0" * (_aligned(f.tell()) - f.tell()))
+            f.write(scales.tobytes())
+
+    with open(file=f"{staging}.json", mode="w", encoding="utf-8") as f:
+        json.dump({"dtype": dtype, "count": n, "dim": dim, **(metadata or {})}, f)
+    os.replace(src=staging, dst=target)
+    os.replace(src=f"{staging}.json", dst=f"{target}.json")
+
+
+class EmbeddingStore:
+    """Read-only view of a store written by `write_embedding_store`.
+
+    The vectors are a `numpy.memmap`, so opening is instant and every process
+    mapping the same file shares one page-cached copy. float32 stores are
+    used in place; float16 and int8 stores trade a dequantizing copy at load
+    for a 2x / 4x smaller file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        with open(file=path, mode="rb") as f:
+            header: bytes = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path} is not an embedding store (truncated header)")
+        magic, version, dtype_code, n, dim, data_offset = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an embedding store")
+        if version != VERSION:
+            raise ValueError(f"{path} has unsupported store version {version}")
+
+        self.dtype: str = DTYPE_NAMES[dtype_code]
+        self.count: int = n
+        self.dim: int = dim
+        self.codes: np.ndarray = self._map(
+            dtype=np.dtype(self.dtype), offset=data_offset, shape=(n, dim)
+        )
+        self.scales: np.ndarray | None = None
+        if self.dtype == INT8:
+            self.scales = self._map(
+                dtype=np.dtype(np.float32),
+                offset=_aligned(data_offset + self.codes.nbytes),
+                shape=(n,),
+            )
+
+    def _map(self, dtype: np.dtype, offset: int, shape: tuple[int, ...]) -> np.ndarray:
+        if 0 in shape:
+            return np.empty(shape=shape, dtype=dtype)
+        return np.memmap(
+            filename=self.path, dtype=dtype, mode="r", offset=offset, shape=shape
+        )
+
+    def vectors(self) -> np.ndarray:
+        """float32 (n, dim) matrix: the mapping itself for float32 stores."""
+        if self.dtype == FLOAT32:
+            return self.codes
+        if self.scales is not None:
+            return self.codes.astype(np.float32) * self.scales[:, None]
+        return self.codes.astype(np.float32)
+
+    def metadata(self) -> dict[str, Any]:
+        sidecar: Path = Path(f"{self.path}.json")
+        if not sidecar.exists():
+            return {}
+        with open(file=sidecar, mode="r", encoding="utf-8") as f:
+            return json.load(f)
@@ -0,0 +1,240 @@
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any
+import numpy as np
+from utils.vector_index import ProgramVectorIndex, program_index
+
+# field -> weight; a field counts `weight` times towards term frequency
+LEXICAL_FIELDS: dict[str, int] = {
+    "program_name": 2,
+    "assistance_type": 2,
+    "eligibility": 1,
+    "jurisdiction": 1,
+}
+
+# the UI's checkbox values, spelled the way the corpus spells them
+QUERY_EXPANSIONS: dict[str, str] = {
+    "veteran": "veteran veterans",
+    "recent graduate": "recent grad graduate",
+    "first time home buyer": "first time homebuyer buyer",
+    "low income": "low income ami",
+    "senior citizen": "senior",
+    "disabled": "disabled disability",
+    "down payment assistance": "down payment dpa assistance closing cost",
+    "low interest rate": "low interest rate below market discounted",
+    "mortgage assistance": "mortgage assistance subsidy",
+    "renovation programs": "renovation rehab remodel improve",
+    "affordable housing": "affordable housing",
+}
+
+STATE_CODES: dict[str, str] = {
+    "new york": "ny",
+    "new jersey": "nj",
+    "connecticut": "ct",
+    "pennsylvania": "pa",
+}
+
+# "veteran_only:false" must not make a program match a veteran query
+NEGATIVE_FLAG = re.compile(pattern=r"[a-z_/]+:(?:false|none)\b")
+PROGRAM_STATE = re.compile(pattern=r"::([a-z]{2})::")
+NATIONWIDE = re.compile(pattern=r"\b(?:nationwide|federal)\b", flags=re.IGNORECASE)
+
+
+def tokenize(text: str) -> list[str]:
+    tokens: list[str] = re.findall(pattern=r"[a-z0-9]+", string=text.lower())
+    return [
+        token[:-1] if len(token) > 3 and token.endswith("s") else token
+        for token in tokens
+    ]
+
+
+def query_tokens(terms: list[str]) -> list[str]:
+    return tokenize(
+        text=" ".join(QUERY_EXPANSIONS.get(term.lower(), term) for term in terms)
+    )
+
+
+def program_state(program: dict[str, Any]) -> str | None:
+    match = PROGRAM_STATE.search(str(program.get("eligibility", "")))
+    return match.group(1) if match else None
+
+
+def matches_state(program: dict[str, Any], state: str | None) -> bool:
+    """Structured pre-filter: the program serves `state`, nationwide, or is untagged."""
+    if not state:
+        return True
+    wanted: str = STATE_CODES.get(state.lower(), state.lower())
+    if NATIONWIDE.search(str(program.get("jurisdiction", ""))):
+        return True
+    code: str | None = program_state(program=program)
+    return code is None or code == wanted
+
+
+class BM25:
+    """Okapi BM25 over the program fields in `LEXICAL_FIELDS`."""
+
+    def __init__(
+        self, programs: list[dict[str, Any]], k1: float = 1.5, b: float = 0.75
+    ) -> None:
+        self.k1: float = k1
+        self.b: float = b
+        self.size: int = len(programs)
+        lengths: list[int] = []
+        postings: dict[str, list[tuple[int, int]]] = {}
+        for doc_id, program in enumerate(programs):
+            counts: Counter[str] = Counter()
+            for field, weight in LEXICAL_FIELDS.items():
+                text: str = NEGATIVE_FLAG.sub(
+                    repl=" ", string=str(program.get(field) or "")
+                )
+                for token in tokenize(text=text):
+                    counts[token] += weight
+            lengths.append(sum(counts.values()))
+            for token, tf in counts.items():
+                postings.setdefault(token, []).append((doc_id, tf))
+
+        self.doc_lengths: np.ndarray = np.asarray(lengths, dtype=np.float32)
+        average: float = float(self.doc_lengths.mean()) if lengths else 0.0
+        self.length_norm: np.ndarray = k1 * (
+            1 - b + b * self.doc_lengths / max(average, 1e-9)
+        )
+        self.postings: dict[str, tuple[np.ndarray, np.ndarray, float]] = {}
+        for token, entries in postings.items():
+            ids, tfs = zip(*entries)
+            idf: float = math.log(1 + (self.size - len(ids) + 0.5) / (len(ids) + 0.5))
+            self.postings[token] = (
+                np.asarray(ids, dtype=np.int64),
+                np.asarray(tfs, dtype=np.float32),
+                idf,
+            )
+
+    def scores(self, tokens: list[str]) -> np.ndarray:
+        scores: np.ndarray = np.zeros(shape=(self.size,), dtype=np.float32)
+        for token in set(tokens):
+            posting: tuple[np.ndarray, np.ndarray, float] | None = self.postings.get(
+                token
+            )
+            if posting is None:
+                continue
+            ids, tfs, idf = posting
+            scores[ids] += idf * tfs * (self.k1 + 1) / (tfs + self.length_norm[ids])
+        return scores
+
+
+def _normalized(values: np.ndarray) -> np.ndarray:
+    if len(values) == 0:
+        return values
+    low, high = float(values.min()), float(values.max())
+    if high - low < 1e-9:
+        return np.ones_like(values) if high > 0 else np.zeros_like(values)
+    return (values - low) / (high - low)
+
+
+class HybridRetriever:
+    """Program search mixing BM25 over program fields with vector similarity.
+
+    Candidates are the union of the `candidate_pool` nearest programs by
+    vector and the `candidate_pool` best by BM25, minus those failing the
+    state pre-filter. Both scores are min-max normalized over the candidates
+    and blended with `vector_weight`.
+
+    Args:
+        index (ProgramVectorIndex): Loaded program index the BM25 index mirrors
+        vector_weight (float): Share of the vector score in the hybrid score
+        candidate_pool (int): Candidates taken from each retriever
+    """
+
+    def __init__(
+        self,
+        index: ProgramVectorIndex,
+        vector_weight: float = 0.5,
+        candidate_pool: int = 50,
+    ) -> None:
+        self.index: ProgramVectorIndex = index
+        self.vector_weight: float = vector_weight
+        self.candidate_pool: int = candidate_pool
+        self._bm25: BM25 | None = None
+        self._built_for: float | None = None
+        self._lock = threading.Lock()
+
+    def _lexical(self) -> BM25:
+        with self._lock:
+            if self._bm25 is None or self._built_for != self.index.loaded_at:
+                self._bm25 = BM25(programs=self.index.programs)
+                self._built_for = self.index.loaded_at
+            return self._bm25
+
+    def search(
+        self,
+        embedding: list[float],
+        query_terms: list[str],
+        state: str | None = None,
+        limit: int = 10,
+    ) -> dict[str, Any]:
+        programs: list[dict[str, Any]] = self.index.programs
+        try:
+            vector_ids, _ = self.index.nearest(
+                embedding=embedding, k=self.candidate_pool
+            )
+        except ValueError as e:
+            return {"error": str(e)}
+
+        lexical_scores: np.ndarray = self._lexical().scores(
+            tokens=query_tokens(terms=query_terms)
+        )
+        lexical_ids: np.ndarray = np.argsort(-lexical_scores, kind="stable")[
+            : self.candidate_pool
+        ]
+        lexical_ids = lexical_ids[lexical_scores[lexical_ids] > 0]
+
+        candidates: np.ndarray = np.asarray(
+            [
+                i
+                for i in dict.fromkeys(vector_ids.tolist() + lexical_ids.tolist())
+                if matches_state(program=programs[i], state=state)
+            ],
+            dtype=np.int64,
+        )
+        if len(candidates) == 0:
+            return {"programs": [], "total_found": 0}
+
+        vector_scores: np.ndarray = self.index.similarity(
+            embedding=embedding, ids=candidates
+        )
+        hybrid: np.ndarray = self.vector_weight * _normalized(values=vector_scores) + (
+            1 - self.vector_weight
+        ) * _normalized(values=lexical_scores[candidates])
+        order: np.ndarray = np.argsort(-hybrid, kind="stable")[: max(limit, 0)]
+
+        results: list[dict[str, Any]] = [
+            {
+                "rank": rank + 1,
+                **programs[int(candidates[i])],
+                "similarity_score": float(vector_scores[i]),
+                "lexical_score": float(lexical_scores[candidates[i]]),
+                "hybrid_score": float(hybrid[i]),
+            }
+            for rank, i in enumerate(order.tolist())
+        ]
+        return {"programs": results, "total_found": len(results)}
+
+
+def filter_by_state(result: dict[str, Any], state: str | None) -> dict[str, Any]:
+    """Apply the state pre-filter to a plain vector search result (Supabase path)."""
+    if "programs" not in result or not state:
+        return result
+    programs: list[dict[str, Any]] = [
+        program
+        for program in result["programs"]
+        if matches_state(program=program, state=state)
+    ]
+    return {"programs": programs, "total_found": len(programs)}
+
+
+hybrid_retriever = HybridRetriever(
+    index=program_index,
+    vector_weight=float(os.getenv("HYBRID_VECTOR_WEIGHT", "0.5")),
+)
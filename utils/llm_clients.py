@@ -0,0 +1,116 @@
+import asyncio
+import threading
+from logging import Logger
+from typing import Any, Callable
+from weakref import WeakKeyDictionary
+import httpx
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_openai import ChatOpenAI
+from openai import AsyncOpenAI
+from utils.convenience import get_gemini_model, get_logger, get_openai_model
+
+logger: Logger = get_logger(name=__name__)
+
+HTTP_MAX_CONNECTIONS: int = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+HTTP_KEEPALIVE_EXPIRY: float = 120.0
+
+# Async HTTP/gRPC clients are bound to the event loop they were first used on,
+# so instances are shared per running loop and dropped together with it.
+_registry: WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple[Any, ...], Any]] = (
+    WeakKeyDictionary()
+)
+_registry_lock = threading.Lock()
+
+
+def _loop_clients() -> dict[tuple[Any, ...], Any]:
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    with _registry_lock:
+        clients: dict[tuple[Any, ...], Any] | None = _registry.get(loop)
+        if clients is None:
+            clients = {}
+            _registry[loop] = clients
+    return clients
+
+
+def _get_or_create(key: tuple[Any, ...], factory: Callable[[], Any]) -> Any:
+    clients: dict[tuple[Any, ...], Any] = _loop_clients()
+    client: Any = clients.get(key)
+    if client is None:
+        client = factory()
+        clients[key] = client
+        logger.info(f"Created shared LLM client {key}")
+    return client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Keep-alive connection pool shared by every OpenAI model on this loop."""
+    return _get_or_create(
+        key=("httpx",),
+        factory=lambda: httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(timeout=60.0, connect=10.0),
+        ),
+    )
+
+
+def get_async_openai(timeout: float = 30, max_retries: int = 2) -> AsyncOpenAI:
+    """Shared raw async OpenAI client (embeddings) on the common connection pool."""
+    return _get_or_create(
+        key=("openai-async", timeout, max_retries),
+        factory=lambda: AsyncOpenAI(
+            timeout=timeout,
+            max_retries=max_retries,
+            http_client=get_async_http_client(),
+        ),
+    )
+
+
+def get_openai_chat(
+    model: str | None = None,
+    temperature: float | None = None,
+    timeout: float = 30,
+    max_retries: int = 2,
+    stream_usage: bool = False,
+) -> ChatOpenAI:
+    """Shared ChatOpenAI for this model/temperature; must be called inside a running loop.
+
+    With `stream_usage`, streamed responses end with a chunk carrying token usage.
+    """
+    model = model or get_openai_model()
+    return _get_or_create(
+        key=("openai", model, temperature, timeout, max_retries, stream_usage),
+        factory=lambda: ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            timeout=timeout,
+            max_retries=max_retries,
+            stream_usage=stream_usage,
+            http_async_client=get_async_http_client(),
+        ),
+    )
+
+
+def get_gemini_chat(
+    model: str | None = None, stream_usage: bool = False
+) -> ChatGoogleGenerativeAI:
+    """Shared ChatGoogleGenerativeAI; its gRPC channel is opened once and kept."""
+    model = model or get_gemini_model()
+    return _get_or_create(
+        key=("gemini", model, stream_usage),
+        factory=lambda: ChatGoogleGenerativeAI(model=model, stream_usage=stream_usage),
+    )
+
+
+async def close_llm_clients() -> None:
+    """Close the HTTP connections shared on the running loop (app shutdown)."""
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    with _registry_lock:
+        clients: dict[tuple[Any, ...], Any] = _registry.pop(loop, {})
+    http_client: httpx.AsyncClient | None = clients.get(("httpx",))
+    if http_client is not None:
+        await http_client.aclose()
@@ -0,0 +1,36 @@
+import argparse
+from typing import Any
+
+
+def run_server(server: Any) -> None:
+    """Run a FastMCP server over stdio (default) or as a network daemon.
+
+    `python server.py` keeps the stdio behaviour used by `docker exec -i`,
+    while `python server.py --transport http --port 8001` serves streamable
+    HTTP on `/mcp` (or SSE on `/sse`) so many app replicas can share one
+    long-running server.
+    """
+    parser = argparse.ArgumentParser(description=f"{server.name} MCP server")
+    parser.add_argument(
+        "--transport", choices=["stdio", "http", "sse"], default="stdio"
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--stateful",
+        action="store_true",
+        help="keep per-client HTTP sessions (default is stateless for load balancing)",
+    )
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.transport == "stdio":
+        server.run(transport="stdio")
+    elif args.transport == "http":
+        server.run(
+            transport="http",
+            host=args.host,
+            port=args.port,
+            stateless_http=not args.stateful,
+        )
+    else:
+        server.run(transport="sse", host=args.host, port=args.port)
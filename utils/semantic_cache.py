@@ -0,0 +1,110 @@
+import hashlib
+import itertools
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
+import numpy as np
+
+
+def analysis_fingerprint(analysis_context: Any) -> str:
+    """Identifies the analysis a chat is about; answers never cross analyses."""
+    return hashlib.sha256(str(analysis_context).encode(encoding="utf-8")).hexdigest()
+
+
+class SemanticCache:
+    """Chat answers reused for near-duplicate questions about the same analysis.
+
+    Each entry is a unit-normalized question embedding and its answer, scoped
+    to an analysis fingerprint. A lookup returns the answer of the most
+    similar cached question when its cosine similarity reaches `threshold`.
+    Entries are evicted least recently used first once `maxsize` is reached,
+    and an analysis keeps only its `max_per_analysis` newest questions.
+
+    Args:
+        threshold (float): Minimum cosine similarity for a hit
+        maxsize (int): Entries kept across all analyses
+        max_per_analysis (int): Entries kept per analysis fingerprint
+    """
+
+    def __init__(
+        self, threshold: float = 0.92, maxsize: int = 2048, max_per_analysis: int = 64
+    ) -> None:
+        self.threshold: float = threshold
+        self.maxsize: int = maxsize
+        self.max_per_analysis: int = max_per_analysis
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._ids = itertools.count()
+        # entry id -> (fingerprint, vector, answer), in LRU order
+        self._entries: OrderedDict[int, tuple[str, np.ndarray, str]] = OrderedDict()
+        self._by_analysis: dict[str, list[int]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "SemanticCache":
+        return cls(
+            threshold=float(os.getenv("CHAT_CACHE_THRESHOLD", "0.92")),
+            maxsize=int(os.getenv("CHAT_CACHE_SIZE", "2048")),
+            max_per_analysis=int(os.getenv("CHAT_CACHE_PER_ANALYSIS", "64")),
+        )
+
+    @staticmethod
+    def _unit(embedding: list[float]) -> np.ndarray:
+        vector: np.ndarray = np.asarray(embedding, dtype=np.float32)
+        norm: float = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
+
+    def _evict(self, entry_id: int) -> None:
+        fingerprint, _, _ = self._entries.pop(entry_id)
+        ids: list[int] = self._by_analysis[fingerprint]
+        ids.remove(entry_id)
+        if not ids:
+            del self._by_analysis[fingerprint]
+        self.evictions += 1
+
+    def get(self, fingerprint: str, embedding: list[float]) -> tuple[str, float] | None:
+        """(answer, similarity) of the closest cached question, None below the threshold."""
+        query: np.ndarray = self._unit(embedding=embedding)
+        with self._lock:
+            ids: list[int] = self._by_analysis.get(fingerprint, [])
+            best_id: int | None = None
+            best: float = -1.0
+            if ids:
+                similarities: np.ndarray = (
+                    np.stack([self._entries[i][1] for i in ids]) @ query
+                )
+                position: int = int(np.argmax(similarities))
+                best_id, best = ids[position], float(similarities[position])
+            if best_id is None or best < self.threshold:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return self._entries[best_id][2], best
+
+    def set(self, fingerprint: str, embedding: list[float], answer: str) -> None:
+        vector: np.ndarray = self._unit(embedding=embedding)
+        with self._lock:
+            entry_id: int = next(self._ids)
+            self._entries[entry_id] = (fingerprint, vector, answer)
+            self._by_analysis.setdefault(fingerprint, []).append(entry_id)
+            if len(self._by_analysis[fingerprint]) > self.max_per_analysis:
+                self._evict(entry_id=self._by_analysis[fingerprint][0])
+            while len(self._entries) > self.maxsize:
+                self._evict(entry_id=next(iter(self._entries)))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, Any]:
+        lookups: int = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "analyses": len(self._by_analysis),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
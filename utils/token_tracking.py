@@ -1,3 +1,4 @@
+from copy import deepcopy
 from typing import Any
 
 
@@ -55,3 +56,22 @@ def token_usage_tracking(
         token_history["total_tokens"] += usage_data["total_tokens"]
 
     return token_history
+
+
+def merge_token_usage(
+    left: dict[str, Any] | None, right: dict[str, Any] | None
+) -> dict[str, Any]:
+    """LangGraph reducer that sums the token usage reported by parallel nodes.
+
+    Args:
+        left (dict[str, Any] | None): Usage accumulated so far in the state
+        right (dict[str, Any] | None): Usage returned by a node
+
+    Returns:
+        dict[str, Any]: Combined token usage, without mutating either input
+    """
+    if not right:
+        return left or {}
+    if not left:
+        return deepcopy(right)
+    return token_usage_tracking(token_history=deepcopy(left), usage_data=right)
@@ -0,0 +1,380 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from logging import Logger
+from pathlib import Path
+from typing import Any, Callable, Iterable
+import numpy as np
+from utils.ann import (
+    ANN_BACKENDS,
+    EXACT,
+    AnnBackend,
+    ExactBackend,
+    backend_from_env,
+    benchmark_backends,
+    make_backend,
+    read_backend_meta,
+    write_backend_meta,
+)
+from utils.convenience import get_logger
+from utils.embedding_store import DTYPES, FLOAT32, EmbeddingStore, write_embedding_store
+
+logger: Logger = get_logger(name=__name__)
+
+L2: str = "l2"
+COSINE: str = "cosine"
+METRICS: tuple[str, ...] = (L2, COSINE)
+
+PROGRAM_FIELDS: tuple[str, ...] = (
+    "program_name",
+    "formatted_text",
+    "jurisdiction",
+    "assistance_type",
+    "max_benefit",
+    "eligibility",
+    "source",
+)
+
+
+def parse_embedding(value: Any) -> list[float]:
+    """Embeddings arrive as JSON/pgvector text ("[0.1,0.2]") or as lists."""
+    if isinstance(value, str):
+        value = json.loads(value)
+    return [float(x) for x in value]
+
+
+def read_program_csv(path: str) -> list[dict[str, Any]]:
+    """Rows of the CSV written by `NYProgramsEmbedder.save_to_csv`."""
+    csv.field_size_limit(sys.maxsize)
+    with open(file=path, mode="r", newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+class ProgramVectorIndex:
+    """In-process nearest-neighbour index over the `nyc_programs_rag` corpus.
+
+    The embeddings are held in one contiguous float32 matrix and searched by a
+    pluggable ANN backend (see `utils.ann`): exact brute force by default, or
+    IVF / HNSW once the corpus is large enough for a full scan to matter.
+    Results have the same shape as `SupabaseClient.search_programs_rag`, with
+    `similarity_score` computed the way pgvector's `<->` ordering reports it
+    (1 - L2 distance) for the `l2` metric, or as the cosine similarity for
+    `cosine`.
+
+    Args:
+        metric (str): "l2" (matches the Supabase query) or "cosine"
+        backend_factory (Callable[[], AnnBackend]): Builds a fresh backend on every load
+    """
+
+    def __init__(
+        self,
+        metric: str = L2,
+        backend_factory: Callable[[], AnnBackend] = ExactBackend,
+    ) -> None:
+        if metric not in METRICS:
+            raise ValueError(
+                f"Unknown vector index metric '{metric}', expected one of {METRICS}"
+            )
+        self.metric: str = metric
+        self.backend_factory: Callable[[], AnnBackend] = backend_factory
+        self.source: str | None = None
+        self.loaded_at: float | None = None
+        self._programs: list[dict[str, Any]] = []
+        self._matrix: np.ndarray = np.empty(shape=(0, 0), dtype=np.float32)
+        self._backend: AnnBackend = ExactBackend()
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return len(self._programs) > 0
+
+    @property
+    def size(self) -> int:
+        return len(self._programs)
+
+    @property
+    def dim(self) -> int:
+        return int(self._matrix.shape[1]) if self._matrix.ndim == 2 else 0
+
+    def load_rows(self, rows: Iterable[dict[str, Any]], source: str) -> int:
+        """Build the index from rows carrying the program fields and `embedding_vector`."""
+        programs: list[dict[str, Any]] = []
+        vectors: list[list[float]] = []
+        for row in rows:
+            try:
+                vector: list[float] = parse_embedding(value=row["embedding_vector"])
+            except (KeyError, TypeError, ValueError) as e:
+                logger.info(f"Skipping program without a usable embedding: {e}")
+                continue
+            if vectors and len(vector) != len(vectors[0]):
+                logger.info(
+                    f"Skipping program '{row.get('program_name')}' with {len(vector)}-d embedding"
+                )
+                continue
+            programs.append({field: row.get(field) or "" for field in PROGRAM_FIELDS})
+            vectors.append(vector)
+
+        matrix: np.ndarray = np.ascontiguousarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2:
+            matrix = matrix.reshape(0, 0)
+        return self._load_matrix(programs=programs, matrix=matrix, source=source)
+
+    def load_csv(self, path: str) -> int:
+        return self.load_rows(rows=read_program_csv(path=path), source=path)
+
+    def load_store(self, path: str) -> int:
+        """Load an embedding store from `NYProgramsEmbedder.save_embedding_store`."""
+        store = EmbeddingStore(path=path)
+        programs: list[dict[str, Any]] = [
+            {field: program.get(field) or "" for field in PROGRAM_FIELDS}
+            for program in store.metadata().get("programs", [])
+        ]
+        if len(programs) != store.count:
+            raise ValueError(
+                f"{path} has {store.count} vectors but {len(programs)} programs"
+            )
+        return self._load_matrix(programs=programs, matrix=store.vectors(), source=path)
+
+    def load_path(self, path: str) -> int:
+        """Load a directory written by `save`, an embedding store, or else a program CSV."""
+        if os.path.isdir(path):
+            return self.load_saved(directory=path)
+        if path.endswith(".bin"):
+            return self.load_store(path=path)
+        return self.load_csv(path=path)
+
+    def _load_matrix(
+        self, programs: list[dict[str, Any]], matrix: np.ndarray, source: str
+    ) -> int:
+        if self.metric == COSINE and len(matrix):
+            norms: np.ndarray = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = matrix / np.maximum(norms, 1e-12)
+
+        backend: AnnBackend = self.backend_factory()
+        backend.build(matrix=matrix)
+        self._install(programs=programs, matrix=matrix, backend=backend, source=source)
+        return len(programs)
+
+    def save(self, directory: str, dtype: str = FLOAT32) -> None:
+        """Persist the corpus as an embedding store plus the trained backend for `load_saved`.
+
+        A float32 store is memory-mapped in place on load; float16 and int8
+        shrink the file at the cost of a dequantized copy per process.
+        """
+        with self._lock:
+            programs: list[dict[str, Any]] = self._programs
+            matrix: np.ndarray = self._matrix
+            backend: AnnBackend = self._backend
+        out: Path = Path(directory)
+        out.mkdir(parents=True, exist_ok=True)
+        write_embedding_store(
+            path=str(out / "embeddings.bin"),
+            vectors=matrix,
+            dtype=dtype,
+            metadata={"metric": self.metric, "programs": programs},
+        )
+        backend.save(directory=out)
+        write_backend_meta(directory=out, backend=backend)
+        logger.info(f"Saved {backend.name} program index ({len(programs)}) to {out}")
+
+    def load_saved(self, directory: str) -> int:
+        source: Path = Path(directory)
+        store = EmbeddingStore(path=str(source / "embeddings.bin"))
+        meta: dict[str, Any] = store.metadata()
+        matrix: np.ndarray = store.vectors()
+
+        backend: AnnBackend = make_backend(**read_backend_meta(directory=source))
+        backend.load(directory=source, matrix=matrix)
+        self.metric = meta["metric"]
+        self._install(
+            programs=meta["programs"],
+            matrix=matrix,
+            backend=backend,
+            source=str(source),
+        )
+        return len(meta["programs"])
+
+    def _install(
+        self,
+        programs: list[dict[str, Any]],
+        matrix: np.ndarray,
+        backend: AnnBackend,
+        source: str,
+    ) -> None:
+        with self._lock:
+            self._programs = programs
+            self._matrix = matrix
+            self._backend = backend
+            self.source = source
+            self.loaded_at = time.time()
+        logger.info(
+            f"Program vector index ({backend.name}) loaded {len(programs)} programs from {source}"
+        )
+
+    @property
+    def programs(self) -> list[dict[str, Any]]:
+        return self._programs
+
+    def _prepare_query(self, embedding: list[float]) -> np.ndarray:
+        if not self._programs:
+            raise ValueError("Program vector index is empty")
+        query: np.ndarray = np.asarray(embedding, dtype=np.float32)
+        if query.shape != (self.dim,):
+            raise ValueError(
+                f"Embedding has {query.size} dimensions, index expects {self.dim}"
+            )
+        if self.metric == COSINE:
+            query = query / max(float(np.linalg.norm(query)), 1e-12)
+        return query
+
+    def _scores(self, squared: np.ndarray) -> np.ndarray:
+        if self.metric == COSINE:
+            # for unit vectors |a - b|^2 = 2 - 2 cos(a, b)
+            return 1.0 - squared / 2.0
+        return 1.0 - np.sqrt(squared)
+
+    def nearest(self, embedding: list[float], k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Row ids and similarity scores of the k nearest programs, best first."""
+        with self._lock:
+            backend: AnnBackend = self._backend
+            query: np.ndarray = self._prepare_query(embedding=embedding)
+        ids, squared = backend.search(query=query, k=max(k, 0))
+        return ids, self._scores(squared=squared)
+
+    def similarity(self, embedding: list[float], ids: np.ndarray) -> np.ndarray:
+        """Exact similarity scores of the given rows."""
+        with self._lock:
+            matrix: np.ndarray = self._matrix
+            query: np.ndarray = self._prepare_query(embedding=embedding)
+        rows: np.ndarray = matrix[ids]
+        squared: np.ndarray = np.maximum(
+            np.einsum("ij,ij->i", rows, rows) - 2.0 * (rows @ query) + query @ query,
+            0.0,
+        )
+        return self._scores(squared=squared)
+
+    def search(self, embedding: list[float], limit: int = 10) -> dict[str, Any]:
+        programs: list[dict[str, Any]] = self._programs
+        try:
+            ids, scores = self.nearest(embedding=embedding, k=limit)
+        except ValueError as e:
+            return {"error": str(e)}
+
+        results: list[dict[str, Any]] = [
+            {
+                "rank": rank + 1,
+                **programs[i],
+                "similarity_score": float(score),
+            }
+            for rank, (i, score) in enumerate(zip(ids.tolist(), scores.tolist()))
+        ]
+        return {"programs": results, "total_found": len(results)}
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "size": self.size,
+            "dim": self.dim,
+            "metric": self.metric,
+            "backend": self._backend.name,
+            "source": self.source,
+        }
+
+
+program_index = ProgramVectorIndex(
+    metric=os.getenv("PROGRAMS_INDEX_METRIC", L2), backend_factory=backend_from_env
+)
+
+
+def _backend_params(args: argparse.Namespace, name: str) -> dict[str, Any]:
+    if name == "ivf":
+        return {"n_lists": args.n_lists, "n_probe": args.n_probe}
+    if name == "hnsw":
+        return {"ef_search": args.ef_search}
+    return {}
+
+
+def _synthetic_corpus(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Clustered vectors, closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed=seed)
+    centers: np.ndarray = rng.normal(size=(max(n // 100, 1), dim))
+    labels: np.ndarray = rng.integers(low=0, high=len(centers), size=n)
+    return (centers[labels] + 0.3 * rng.normal(size=(n, dim))).astype(np.float32)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Build and benchmark the program index"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser(name="build", help="Build and persist an index")
+    build.add_argument(
+        "--input",
+        "--csv",
+        dest="input",
+        required=True,
+        help="CSV from save_to_csv or .bin store from save_embedding_store",
+    )
+    build.add_argument("--out", required=True, help="Directory to write")
+    build.add_argument("--backend", default=EXACT, choices=tuple(ANN_BACKENDS))
+    build.add_argument("--dtype", default=FLOAT32, choices=tuple(DTYPES))
+
+    bench = commands.add_parser(name="benchmark", help="Recall/latency vs exact")
+    bench.add_argument(
+        "--input", "--csv", dest="input", help="CSV or .bin store (default: synthetic)"
+    )
+    bench.add_argument("--synthetic", type=int, default=20000)
+    bench.add_argument("--dim", type=int, default=1536)
+    bench.add_argument("--queries", type=int, default=200)
+    bench.add_argument("--k", type=int, default=10)
+    bench.add_argument("--backends", nargs="+", default=[EXACT, "ivf"])
+
+    for command in (build, bench):
+        command.add_argument("--metric", default=L2, choices=METRICS)
+        command.add_argument("--n-lists", type=int, default=None)
+        command.add_argument("--n-probe", type=int, default=8)
+        command.add_argument("--ef-search", type=int, default=64)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        index = ProgramVectorIndex(
+            metric=args.metric,
+            backend_factory=lambda: make_backend(
+                name=args.backend, **_backend_params(args=args, name=args.backend)
+            ),
+        )
+        index.load_path(path=args.input)
+        index.save(directory=args.out, dtype=args.dtype)
+        print(json.dumps(index.stats()))
+        return
+
+    if args.input:
+        index = ProgramVectorIndex(metric=args.metric)
+        index.load_path(path=args.input)
+        matrix: np.ndarray = index._matrix
+    else:
+        matrix = _synthetic_corpus(n=args.synthetic, dim=args.dim)
+    rng = np.random.default_rng(seed=1)
+    picks: np.ndarray = rng.integers(low=0, high=len(matrix), size=args.queries)
+    queries: np.ndarray = (
+        matrix[picks] + 0.1 * rng.normal(size=(args.queries, matrix.shape[1]))
+    ).astype(np.float32)
+
+    backends: list[AnnBackend] = [
+        make_backend(name=name, **_backend_params(args=args, name=name))
+        for name in args.backends
+    ]
+    print(f"corpus={matrix.shape[0]}x{matrix.shape[1]} queries={len(queries)}")
+    for row in benchmark_backends(
+        matrix=matrix, queries=queries, backends=backends, k=args.k
+    ):
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
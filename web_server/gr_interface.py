@@ -1,16 +1,33 @@
-import asyncio
 import gradio as gr
 from logging import Logger
 from pathlib import Path
-from typing import Any, Literal
-from langchain_core.messages.base import BaseMessage
-from langchain_openai import ChatOpenAI
-from agents.planner_agent.graph import run_planner_agent
+from typing import Any, AsyncIterator, Literal
+from agents.planner_agent.graph import stream_planner_agent
+from agents.program_agent.nodes import get_query_embedder
 from utils.convenience import get_logger, get_openai_model
+from utils.llm_clients import get_openai_chat
+from utils.semantic_cache import SemanticCache, analysis_fingerprint
 
 logger: Logger = get_logger(name=__name__)
 openai_model: str = get_openai_model()
 local_dir: Path = Path(__file__).parent
+# follow-ups repeat across users of the same analysis ("what does FHA mean?")
+chat_cache = SemanticCache.from_env()
+# planner stream event -> progress label shown until the synthesis starts
+AGENT_LABELS: dict[str, str] = {
+    "budgeting": "budget",
+    "programs": "programs",
+    "geoscout": "neighborhood",
+}
+
+
+async def embed_question(message: str) -> list[float] | None:
+    """Question embedding for the chat cache, None when embeddings are unavailable."""
+    try:
+        return await get_query_embedder().agenerate_embedding(text=message)
+    except Exception as e:
+        logger.info(f"Chat cache skipped, question not embedded: {e}")
+        return None
 
 
 def format_planner_results(result: Any) -> Any:
@@ -21,15 +38,33 @@ def format_planner_results(result: Any) -> Any:
         return "Analysis unavailable - please try again."
 
 
-async def chatbot_response(
+async def stream_chatbot_response(
     message: str, history: list[tuple[str, str]], analysis_context: Any
-):
-    """Generate chatbot response using the analysis context"""
+) -> AsyncIterator[str]:
+    """Stream the answer to `message` about the analysis context as text deltas"""
     if not analysis_context or analysis_context == "No analysis available":
-        return "I don't have access to your analysis results yet. Please run the analysis first."
+        yield "I don't have access to your analysis results yet. Please run the analysis first."
+        return
+
+    fingerprint: str = analysis_fingerprint(analysis_context=analysis_context)
+    # follow-ups ("why?", "the second one?") depend on the conversation so far,
+    # so only a conversation's opening question is answered from or stored in the cache
+    question_embedding: list[float] | None = (
+        None if history else await embed_question(message=message)
+    )
+    if question_embedding is not None:
+        cached: tuple[str, float] | None = chat_cache.get(
+            fingerprint=fingerprint, embedding=question_embedding
+        )
+        if cached is not None:
+            logger.info(
+                f"Chat cache hit (similarity {cached[1]:.3f}): {chat_cache.stats()}"
+            )
+            yield cached[0]
+            return
 
     try:
-        model = ChatOpenAI(model=openai_model, timeout=30, max_retries=2)
+        model = get_openai_chat(model=openai_model, timeout=30, max_retries=2)
 
         system_prompt: str = f"""You are a helpful real estate assistant. The user has just received an analysis with the following information:
 
@@ -46,11 +81,18 @@ async def chatbot_response(
 
         messages = [{"role": "system", "content": system_prompt}] + conversation_history
 
-        response: BaseMessage = await model.ainvoke(input=messages)
-        return response.content
+        answer: str = ""
+        async for chunk in model.astream(input=messages):
+            if chunk.content:
+                answer += chunk.content
+                yield chunk.content
+        if question_embedding is not None and answer:
+            chat_cache.set(
+                fingerprint=fingerprint, embedding=question_embedding, answer=answer
+            )
 
     except Exception as e:
-        return f"I'm sorry, I encountered an error: {str(e)}. Please try again."
+        yield f"I'm sorry, I encountered an error: {str(e)}. Please try again."
 
 
 async def run_planner_with_ui(
@@ -63,19 +105,26 @@ async def run_planner_with_ui(
     building_class: str,
     current_debt: int,
     analysis_context: Any,
-) -> tuple[Any, Any]:
+) -> AsyncIterator[tuple[Any, Any]]:
+    """Run the planner, rendering agent progress and then the synthesis into the
+    Markdown output token by token"""
     residential_units = 1
     try:
         if income is None or income == "":
-            return "Error: Gross Annual Income is required", analysis_context
+            yield "Error: Gross Annual Income is required", analysis_context
+            return
         if credit_score is None or credit_score == "":
-            return "Error: Credit Score is required", analysis_context
+            yield "Error: Credit Score is required", analysis_context
+            return
         if zip_code is None or zip_code == "":
-            return "Error: Zip Code is required", analysis_context
+            yield "Error: Zip Code is required", analysis_context
+            return
         if building_class is None or building_class == "":
-            return "Error: Building Class is required", analysis_context
+            yield "Error: Building Class is required", analysis_context
+            return
         if current_debt is None or current_debt == "":
-            return "Error: Current Debt is required", analysis_context
+            yield "Error: Current Debt is required", analysis_context
+            return
 
         try:
             income_val = float(income)
@@ -83,14 +132,18 @@ async def run_planner_with_ui(
             residential_units_val = int(residential_units)
             current_debt_val = float(current_debt)
         except (ValueError, TypeError):
-            return "Error: Invalid numeric values provided", analysis_context
+            yield "Error: Invalid numeric values provided", analysis_context
+            return
 
         if income_val <= 0:
-            return "Error: Annual Income must be greater than 0", analysis_context
+            yield "Error: Annual Income must be greater than 0", analysis_context
+            return
         if credit_score_val < 300 or credit_score_val > 850:
-            return "Error: Credit Score must be between 300 and 850", analysis_context
+            yield "Error: Credit Score must be between 300 and 850", analysis_context
+            return
         if current_debt_val < 0:
-            return "Error: Current Debt must be 0 or greater", analysis_context
+            yield "Error: Current Debt must be 0 or greater", analysis_context
+            return
 
         user_data: dict[str, Any] = {
             "income": income_val,
@@ -106,27 +159,36 @@ async def run_planner_with_ui(
 
         logger.info(f"[MAREA] User input received: {user_data}")
 
-        result: Any = await run_planner_agent(user_data=user_data)
-        formatted_result: Any = format_planner_results(result=result)
-
-        analysis_context = formatted_result
+        completed: list[str] = []
+        analysis: str = ""
+        async for event in stream_planner_agent(user_data=user_data):
+            if event["event"] in AGENT_LABELS:
+                completed.append(AGENT_LABELS[event["event"]])
+                yield f"*Analyzing... {', '.join(completed)} ready*", analysis_context
+            elif event["event"] == "token":
+                analysis += event["data"]
+                yield analysis, analysis_context
+            elif event["event"] == "final":
+                analysis_context = format_planner_results(result=event["data"])
 
         logger.info("Analysis complete. Chatbot is now available in the 'Chat' tab.")
 
-        return formatted_result, analysis_context
+        yield analysis_context, analysis_context
     except Exception as e:
         import traceback
 
         traceback.print_exc()
-        return f"Error: {str(e)}", analysis_context
+        yield f"Error: {str(e)}", analysis_context
 
 
-def handle_chatbot(
+async def handle_chatbot(
     message: str, history: list[dict[str, str]], analysis_context: Any
-) -> tuple[list[dict[str, str]], Literal[""], Any]:
-    """Handle chatbot interactions with analysis context"""
+) -> AsyncIterator[tuple[list[dict[str, str]], Literal[""], Any]]:
+    """Handle chatbot interactions with analysis context, streaming the reply
+    into the Chatbot on the app's event loop"""
     if not message.strip():
-        return history, "", analysis_context
+        yield history, "", analysis_context
+        return
 
     if not analysis_context or analysis_context == "No analysis available":
         history.append({"role": "user", "content": message})
@@ -136,33 +198,35 @@ def handle_chatbot(
                 "content": "I don't have access to your analysis results yet. Please run the analysis first.",
             }
         )
-        return history, "", analysis_context
+        yield history, "", analysis_context
+        return
 
     history.append({"role": "user", "content": message})
 
-    try:
-        old_format_history: list[tuple[str, str]] = []
-        for msg in history[:-1]:
-            if msg["role"] == "user":
-                old_format_history.append((msg["content"], ""))
-            elif msg["role"] == "assistant" and old_format_history:
-                old_format_history[-1] = (
-                    old_format_history[-1][0],
-                    msg["content"],
-                )
-
-        response: Any = asyncio.run(
-            main=chatbot_response(
-                message=message,
-                history=old_format_history,
-                analysis_context=analysis_context,
+    old_format_history: list[tuple[str, str]] = []
+    for msg in history[:-1]:
+        if msg["role"] == "user":
+            old_format_history.append((msg["content"], ""))
+        elif msg["role"] == "assistant" and old_format_history:
+            old_format_history[-1] = (
+                old_format_history[-1][0],
+                msg["content"],
             )
-        )
-        history.append({"role": "assistant", "content": response})
-    except Exception as e:
-        history.append({"role": "assistant", "content": f"Error: {str(e)}"})
 
-    return history, "", analysis_context
+    reply: dict[str, str] = {"role": "assistant", "content": ""}
+    history.append(reply)
+    yield history, "", analysis_context
+    try:
+        async for delta in stream_chatbot_response(
+            message=message,
+            history=old_format_history,
+            analysis_context=analysis_context,
+        ):
+            reply["content"] += delta
+            yield history, "", analysis_context
+    except Exception as e:
+        reply["content"] = f"Error: {str(e)}"
+        yield history, "", analysis_context
 
 
 def create_interface() -> gr.Blocks:
@@ -339,15 +403,19 @@ def create_interface() -> gr.Blocks:
                 )
                 chatbot_send: gr.Button = gr.Button(value="Send", variant="primary")
 
+                # the handler is async and awaits I/O only, so chats need not queue
+
                 chatbot_send.click(
                     fn=handle_chatbot,
                     inputs=[chatbot_input, chatbot, analysis_context],
                     outputs=[chatbot, chatbot_input, analysis_context],
+                    concurrency_limit=None,
                 )
 
                 chatbot_input.submit(
                     fn=handle_chatbot,
                     inputs=[chatbot_input, chatbot, analysis_context],
                     outputs=[chatbot, chatbot_input, analysis_context],
+                    concurrency_limit=None,
                 )
     return demo
@@ -1,10 +1,18 @@
+import json
+from collections.abc import AsyncIterator
 from contextlib import _AsyncGeneratorContextManager, asynccontextmanager
 from logging import Logger
-from typing import Any
-from fastapi import FastAPI
-from agents.planner_agent.graph import run_planner_agent
-from mcp_kit.tools import mcp_adapter
+from typing import Annotated, Any
+
+from fastapi import Body, FastAPI, Query
+from fastapi.responses import StreamingResponse
+
+from agents.graph_registry import graph_registry
+from agents.planner_agent.batch import stream_batch
+from agents.planner_agent.graph import run_planner_agent, stream_planner_agent
+from mcp_kit.tools import load_program_index, mcp_adapter
 from utils.convenience import get_logger
+from utils.llm_clients import close_llm_clients
 
 logger: Logger = get_logger(name=__name__)
 
@@ -14,24 +22,116 @@ async def lifespan(app: FastAPI) -> _AsyncGeneratorContextManager[Any, Any, Any]
     await mcp_adapter.connect_all()
     logger.info(await mcp_adapter.check_running())
     logger.info("MCP connections established")
+    graph_compile_ms: dict[str, float] = graph_registry.compile_all()
+    logger.info(f"Agent graphs compiled (ms): {graph_compile_ms}")
+    logger.info(f"Program vector index: {await load_program_index()}")
     yield
-    pass
+    await close_llm_clients()
 
 
 app = FastAPI(title="MAREA API", lifespan=lifespan)
 
 
+def profile_user_data(
+    income: float,
+    credit_score: int,
+    zip_code: str,
+    residential_units: int,
+    current_debt: float,
+    state: str | None,
+    building_class: str,
+    who_i_am: list[str],
+    what_looking_for: list[str],
+) -> dict[str, Any]:
+    return {
+        "income": income,
+        "credit_score": credit_score,
+        "zip_code": zip_code,
+        "residential_units": residential_units,
+        "current_debt": current_debt,
+        "state": state,
+        "building_class": building_class,
+        "who_i_am": who_i_am,
+        "what_looking_for": what_looking_for,
+    }
+
+
 @app.post(path="/analyze")
 async def analyze_endpoint(
-    income: float, credit_score: int, zip_code: str
+    income: float,
+    credit_score: int,
+    zip_code: str,
+    residential_units: int = 1,
+    current_debt: float = 0.0,
+    state: str | None = "New York",
+    building_class: str = "Any - All building types",
+    who_i_am: Annotated[list[str] | None, Query()] = None,
+    what_looking_for: Annotated[list[str] | None, Query()] = None,
 ) -> dict[str, str]:
     try:
-        user_data: dict[str, Any] = {
-            "income": income,
-            "credit_score": credit_score,
-            "zip_code": zip_code,
-        }
+        user_data: dict[str, Any] = profile_user_data(
+            income=income,
+            credit_score=credit_score,
+            zip_code=zip_code,
+            residential_units=residential_units,
+            current_debt=current_debt,
+            state=state,
+            building_class=building_class,
+            who_i_am=who_i_am or [],
+            what_looking_for=what_looking_for or [],
+        )
         result: Any = await run_planner_agent(user_data=user_data)
         return {"status": "success", "data": result}
     except Exception as e:
         return {"status": "error", "message": str(e)}
+
+
+@app.post(path="/analyze/stream")
+async def analyze_stream_endpoint(
+    income: float,
+    credit_score: int,
+    zip_code: str,
+    residential_units: int = 1,
+    current_debt: float = 0.0,
+    state: str | None = "New York",
+    building_class: str = "Any - All building types",
+    who_i_am: Annotated[list[str] | None, Query()] = None,
+    what_looking_for: Annotated[list[str] | None, Query()] = None,
+) -> StreamingResponse:
+    """NDJSON stream of planner events: "budgeting", "programs" and "geoscout"
+    as each agent completes, "token" deltas of the synthesis, then "final"."""
+    user_data: dict[str, Any] = profile_user_data(
+        income=income,
+        credit_score=credit_score,
+        zip_code=zip_code,
+        residential_units=residential_units,
+        current_debt=current_debt,
+        state=state,
+        building_class=building_class,
+        who_i_am=who_i_am or [],
+        what_looking_for=what_looking_for or [],
+    )
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event in stream_planner_agent(user_data=user_data):
+                yield json.dumps(event, default=str) + "\n"
+        except Exception as e:
+            yield json.dumps({"event": "error", "message": str(e)}) + "\n"
+
+    return StreamingResponse(content=events(), media_type="application/x-ndjson")
+
+
+@app.post(path="/analyze/batch")
+async def analyze_batch_endpoint(
+    profiles: Annotated[list[dict[str, Any]], Body()],
+    concurrency: Annotated[int, Query(ge=1, le=32)] = 8,
+) -> StreamingResponse:
+    """NDJSON stream of one {"index", "id", "status", "data" | "message"} record
+    per profile, in completion order; profiles take the /analyze fields."""
+
+    async def records() -> AsyncIterator[str]:
+        async for record in stream_batch(profiles=profiles, concurrency=concurrency):
+            yield json.dumps(record, default=str) + "\n"
+
+    return StreamingResponse(content=records(), media_type="application/x-ndjson")